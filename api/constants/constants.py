@@ -26,6 +26,9 @@ LEASE_STATUS_CHOICES = [
     ("terminated", "Terminated"),
 ]
 
+# Lease statuses which no longer count towards the active leases and rent roll of a building
+ENDED_LEASE_STATUSES = ["completed", "transferred", "terminated"]
+
 # Filter Types
 
 EXACT_FIELD_TYPE_FILTER = ["exact"]
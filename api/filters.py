@@ -1,7 +1,15 @@
 
+import operator
+from functools import reduce
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramSimilarity
+from django.db import connections
+from django.db.models import F, Q
+from django.db.models.functions import Greatest
 from django_filters import rest_framework as filters
-from api.models import ApartmentDetails, BuildingDetails, UserData, ParkingDetails
+from api.models import ApartmentDetails, BuildingDetails, UserData, ParkingDetails, LeaseDetails
 from api.constants import constants as constants
+from rest_framework import filters as drf_filters
 from rest_framework.exceptions import ValidationError
 
 
@@ -23,6 +31,90 @@ def filter_boolean_field(queryset, name, value):
         return queryset.none()  # Return an empty queryset for invalid values
 
 
+class FullTextSearchFilter(drf_filters.SearchFilter):
+    """
+    `?search=` backed by the view's `search_vector_field` (a trigger maintained tsvector
+    column with a GIN index) on PostgreSQL. The terms use the web search syntax
+    (`"quoted phrase"`, `or`, `-excluded`) and the results are ordered by rank unless
+    an `?ordering=` is given. Views without a search vector, and other databases,
+    fall back to the `icontains` lookups of the view's `search_fields`.
+    """
+    rank_annotation = "search_rank"
+
+    def filter_queryset(self, request, queryset, view):
+        search_vector_field = getattr(view, "search_vector_field", None)
+        if search_vector_field is None or connections[queryset.db].vendor != "postgresql":
+            return super().filter_queryset(request, queryset, view)
+
+        search_terms = request.query_params.get(self.search_param, "").replace("\x00", "").strip()
+        if not search_terms:
+            return queryset
+
+        query = SearchQuery(
+            search_terms, search_type="websearch", config=getattr(view, "search_config", "simple")
+        )
+        return queryset.filter(**{search_vector_field: query}).annotate(
+            **{self.rank_annotation: SearchRank(F(search_vector_field), query)}
+        ).order_by(f"-{self.rank_annotation}", *(queryset.query.order_by or queryset.model._meta.ordering))
+
+
+class TrigramSearchFilter(drf_filters.BaseFilterBackend):
+    """
+    Fuzzy `?fuzzy=` lookup over the view's `trigram_search_fields`, tolerant to typos and
+    partial values. On PostgreSQL the results are the rows whose best `pg_trgm` similarity
+    of any field reaches `?similarity=` (0 to 1, default 0.3), ordered by it unless an
+    `?ordering=` is given. Other databases fall back to `icontains` lookups.
+
+    The similarity operator `%` served by the GIN trigram indexes matches at the
+    `pg_trgm.similarity_threshold` setting, left to its default (`default_threshold`) as
+    the connections are shared: it narrows the rows down for the default and higher
+    thresholds, lower ones compare the similarity of every row.
+    """
+    search_param = "fuzzy"
+    threshold_param = "similarity"
+    default_threshold = 0.3
+    rank_annotation = "similarity"
+
+    def get_threshold(self, request):
+        threshold = request.query_params.get(self.threshold_param)
+        if threshold is None:
+            return self.default_threshold
+        try:
+            threshold = float(threshold)
+        except ValueError:
+            threshold = -1
+        if not 0 < threshold <= 1:
+            raise ValidationError({self.threshold_param: "Value must be a number greater than 0 and at most 1."})
+        return threshold
+
+    def filter_queryset(self, request, queryset, view):
+        fields = getattr(view, "trigram_search_fields", None)
+        search_terms = request.query_params.get(self.search_param, "").replace("\x00", "").strip()
+        if not fields or not search_terms:
+            return queryset
+        return self.search(queryset, fields, search_terms, self.get_threshold(request))
+
+    def search(self, queryset, fields, search_terms, threshold=None):
+        if threshold is None:
+            threshold = self.default_threshold
+        connection = connections[queryset.db]
+        if connection.vendor != "postgresql":
+            return queryset.filter(
+                reduce(operator.or_, (Q(**{f"{field}__icontains": search_terms}) for field in fields))
+            )
+
+        if threshold >= self.default_threshold:
+            queryset = queryset.filter(
+                reduce(operator.or_, (Q(**{f"{field}__trigram_similar": search_terms}) for field in fields))
+            )
+        similarities = [TrigramSimilarity(field, search_terms) for field in fields]
+        return queryset.annotate(
+            **{self.rank_annotation: Greatest(*similarities) if len(similarities) > 1 else similarities[0]}
+        ).filter(
+            **{f"{self.rank_annotation}__gte": threshold}
+        ).order_by(f"-{self.rank_annotation}", *(queryset.query.order_by or queryset.model._meta.ordering))
+
+
 class ApartmentDetailsFilter(filters.FilterSet):
 
     """
@@ -148,7 +240,34 @@ class ParkingDetailsFilter(filters.FilterSet):
         fields = {
             "parking_number": constants.EXACT_FIELD_TYPE_FILTER,
             "building_number": constants.EXACT_FIELD_TYPE_FILTER,
-            "apartment_number": constants.EXACT_FIELD_TYPE_FILTER,
+            "apartment": constants.EXACT_FIELD_TYPE_FILTER,
             "parking_type": constants.EXACT_FIELD_TYPE_FILTER,
             "parking_status": constants.EXACT_FIELD_TYPE_FILTER,
-        }
\ No newline at end of file
+        }
+
+
+class LeaseDetailsFilter(filters.FilterSet):
+    """
+    Below fields type is BooleanField but here we added it as CharFilter
+    in order to call the filter_boolean_field method to avoid unnecessary values.
+    """
+
+    lease_break_flag = filters.CharFilter(
+        field_name="lease_break_flag", method="filter_boolean_field", label="Lease Broken"
+    )
+
+    def filter_boolean_field(self, queryset, name, value):
+        return filter_boolean_field(queryset, name, value)
+
+    class Meta:
+        model = LeaseDetails
+        fields = {
+            "agreement_number": constants.EXACT_FIELD_TYPE_FILTER,
+            "apartment": constants.EXACT_FIELD_TYPE_FILTER,
+            "start_date": constants.NUMBER_TYPE_FILTER,
+            "end_date": constants.NUMBER_TYPE_FILTER,
+            "duration": constants.EXACT_FIELD_TYPE_FILTER,
+            "rent_amount": constants.NUMBER_TYPE_FILTER,
+            "payment_schedule": constants.EXACT_FIELD_TYPE_FILTER,
+            "lease_status": constants.EXACT_FIELD_TYPE_FILTER,
+        }
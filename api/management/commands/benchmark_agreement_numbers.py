@@ -0,0 +1,58 @@
+import multiprocessing
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from api.utils.utils import generate_unique_integer_number
+
+
+def generate_numbers(count):
+    """
+    Generate `count` agreement numbers in a worker process.
+    """
+    started = time.perf_counter()
+    numbers = [generate_unique_integer_number() for _ in range(count)]
+    elapsed = time.perf_counter() - started
+    connections.close_all()
+    return numbers, elapsed
+
+
+class Command(BaseCommand):
+    """
+    Uniqueness and throughput benchmark for the lease agreement number generator.
+    """
+    help = "Generate agreement numbers from several processes and check they never collide."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--processes", type=int, default=multiprocessing.cpu_count())
+        parser.add_argument("--count", type=int, default=200000, help="Numbers per process.")
+
+    def handle(self, *args, **options):
+        processes, count = options["processes"], options["count"]
+
+        # Worker processes are forked, they must not share the parent's connections
+        connections.close_all()
+        context = multiprocessing.get_context("fork")
+        started = time.perf_counter()
+        with context.Pool(processes) as pool:
+            results = pool.map(generate_numbers, [count] * processes)
+        wall_time = time.perf_counter() - started
+
+        all_numbers = set()
+        for numbers, elapsed in results:
+            if any(current <= previous for previous, current in zip(numbers, numbers[1:])):
+                raise CommandError("Agreement numbers are not monotonic within a process.")
+            all_numbers.update(numbers)
+            self.stdout.write(
+                f"Process: {len(numbers)} numbers in {elapsed:.3f}s "
+                f"({len(numbers) / elapsed / 1000:.0f} numbers/ms)"
+            )
+
+        total = processes * count
+        self.stdout.write(
+            f"Total: {total} numbers in {wall_time:.3f}s ({total / wall_time / 1000:.0f} numbers/ms)"
+        )
+        if len(all_numbers) != total:
+            raise CommandError(f"Found {total - len(all_numbers)} duplicate agreement numbers.")
+        self.stdout.write(self.style.SUCCESS("All agreement numbers are unique."))
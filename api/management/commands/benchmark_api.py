@@ -0,0 +1,418 @@
+import json
+import platform
+import threading
+import time
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from api.models import (
+    ApartmentDetails, ApartmentNumberCounter, BuildingDetails, LeaseDetails, ParkingDetails, Tenant, UserData
+)
+from bma_backend.authentication import USER_MODEL_CLAIM
+
+PASSWORD = "benchmark-password"
+BATCH_SIZE = 1000
+
+
+def percentile(values, fraction):
+    """
+    Nearest-rank percentile of the sorted `values`.
+    """
+    return values[min(len(values) - 1, max(0, int(len(values) * fraction + 0.5) - 1))]
+
+
+class Route:
+    """
+    Benchmarked request. `path` and `payload` are called with the index of the request
+    (0 to the number of requests of the route) so that every request can target other rows.
+    """
+
+    def __init__(self, name, method, path, payload=None, writes=False, anonymous=False):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.payload = payload
+        self.writes = writes
+        self.anonymous = anonymous
+
+
+class Command(BaseCommand):
+    """
+    Load benchmark of every API route: seeds synthetic buildings, apartments (numbered by
+    the apartment number counter), parking spaces, users, leases and tenants, drives each
+    route with concurrent clients through the whole Django stack and reports the latency
+    percentiles, the throughput and the queries per request.
+
+    `--output` saves the results as a JSON baseline, `--compare` fails when a route got
+    slower or runs more queries than in a saved baseline. Runs in-process against the
+    configured database (PostgreSQL or an SQLite stand-in), without any network.
+    """
+    help = "Benchmark every API route with concurrent clients and compare against a JSON baseline."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--buildings", type=int, default=10)
+        parser.add_argument("--floors", type=int, default=10, help="Floors per building.")
+        parser.add_argument("--apartments-per-floor", type=int, default=10)
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--leased", type=float, default=0.5, help="Fraction of the apartments with a lease.")
+        parser.add_argument("--clients", type=int, default=4, help="Concurrent clients per route.")
+        parser.add_argument("--requests", type=int, default=100, help="Requests per route.")
+        parser.add_argument("--routes", nargs="+", help="Only run these routes.")
+        parser.add_argument("--output", help="Save the results to this JSON baseline file.")
+        parser.add_argument("--compare", help="Compare the results against this JSON baseline file.")
+        parser.add_argument(
+            "--tolerance", type=float, default=0.2,
+            help="Relative p95 latency increase reported as a regression by --compare."
+        )
+        parser.add_argument(
+            "--min-delta", type=float, default=1.0,
+            help="Ignore p95 latency increases below this many milliseconds (noise)."
+        )
+        parser.add_argument(
+            "--query-tolerance", type=float, default=0.5,
+            help="Queries per request increase reported as a regression by --compare (cache misses vary a bit)."
+        )
+        parser.add_argument("--keep", action="store_true", help="Keep the generated data.")
+
+    def handle(self, *args, **options):
+        if not 1 <= options["apartments_per_floor"] <= 99:
+            raise CommandError("--apartments-per-floor must be between 1 and 99 (apartment number is floor * 100 + n).")
+        if connection.vendor == "sqlite":
+            self.stderr.write(self.style.WARNING(
+                "Running on SQLite: the routes writing to the database run with a single client."
+            ))
+
+        run_id = uuid.uuid4().hex[:8]
+        data = self.seed(run_id, options)
+        try:
+            routes = self.get_routes(data, options)
+            if options["routes"]:
+                unknown = set(options["routes"]) - {route.name for route in routes}
+                if unknown:
+                    raise CommandError(f"Unknown routes: {', '.join(sorted(unknown))}.")
+                routes = [route for route in routes if route.name in options["routes"]]
+
+            results = {}
+            for route in routes:
+                results[route.name] = self.run_route(route, data, options)
+                self.report(route.name, results[route.name])
+        finally:
+            if not options["keep"]:
+                self.cleanup(data)
+
+        baseline = {
+            "meta": {
+                "created": timezone.now().isoformat(),
+                "database": connection.vendor,
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                **{
+                    key: options[key]
+                    for key in ["buildings", "floors", "apartments_per_floor", "users", "leased", "clients", "requests"]
+                },
+            },
+            "routes": results,
+        }
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                json.dump(baseline, file, indent=2, sort_keys=True)
+            self.stdout.write(f"Results saved to {options['output']}")
+        if options["compare"]:
+            self.compare(baseline, options)
+
+    def seed(self, run_id, options):
+        """
+        Create the synthetic data of the run, all tagged with `run_id`.
+        """
+        started = time.perf_counter()
+        prefix = f"apibench_{run_id}_"
+        password = make_password(PASSWORD)  # Hashed once, shared by every user
+        leased = int(options["buildings"] * options["floors"] * options["apartments_per_floor"] * options["leased"])
+
+        def build_user(name, **kwargs):
+            return UserData(
+                username=f"{prefix}{name}", password=password, email=f"{prefix}{name}@example.com",
+                first_name="Bench", last_name=name, phone_number="+1 (513) 123-7890",
+                city="Cincinnati", state="OH", country="US", zip_code="45219", **kwargs
+            )
+
+        UserData.objects.bulk_create(
+            [build_user("admin", is_admin=True)]
+            + [build_user(str(index)) for index in range(max(options["users"], leased))]
+            # Distinct free users for the bookings, a user can only be the active tenant of one lease
+            + [build_user(f"booking{index}") for index in range(options["requests"])],
+            batch_size=BATCH_SIZE,
+        )
+        users = list(UserData.objects.filter(username__startswith=prefix).order_by("id"))
+        admin = users[0]
+        booking_users = [user for user in users if user.last_name.startswith("booking")]
+        users = [user for user in users[1:] if not user.last_name.startswith("booking")]
+
+        run_number = int(run_id, 16) % 10 ** 6 + 10
+        buildings = BuildingDetails.objects.bulk_create([
+            BuildingDetails(
+                building_number=f"{run_number}{index:04d}", street_name=f"Benchmark Street {index}",
+                city="Cincinnati", state="OH", country="US", zip_code="45219",
+                no_of_floors=options["floors"], is_constructed=True,
+            ) for index in range(options["buildings"])
+        ])
+
+        blocks = {
+            (building.pk, floor): options["apartments_per_floor"]
+            for building in buildings for floor in range(1, options["floors"] + 1)
+        }
+        apartments = []
+        for (building_number, floor_number), first_number in ApartmentNumberCounter.allocate(blocks).items():
+            for number in range(first_number, first_number + blocks[(building_number, floor_number)]):
+                apartments.append(ApartmentDetails(
+                    apartment_number=number, building_number_id=building_number, floor_number=floor_number,
+                    price=Decimal("1200.00") + number % 7 * 100, description=f"Benchmark apartment {number}",
+                    bedrooms=number % 4, bathrooms=1 + number % 2, stove=["Gas", "Electric"][number % 2],
+                    laundry="in_unit", pets=number % 3 == 0, is_available=True,
+                ))
+        apartments = ApartmentDetails.objects.bulk_create(apartments, batch_size=BATCH_SIZE)
+
+        ParkingDetails.objects.bulk_create([
+            ParkingDetails(
+                building_number_id=apartment.building_number_id, apartment=apartment,
+                parking_type=["covered", "uncovered", "garage"][index % 3], parking_status="occupied",
+            ) for index, apartment in enumerate(apartments)
+        ], batch_size=BATCH_SIZE)
+
+        start_date = date.today()
+        leases = LeaseDetails.objects.bulk_create([
+            LeaseDetails(
+                apartment=apartment, start_date=start_date, end_date=start_date + timedelta(days=365),
+                duration=12, rent_amount=apartment.price, security_deposit=Decimal("500.00"),
+                additional_charges=Decimal("0.00"), payment_schedule="monthly", lease_status="started",
+            ) for apartment in apartments[:leased]
+        ], batch_size=BATCH_SIZE)
+        Tenant.objects.bulk_create([
+            Tenant(
+                lease=lease, user=user, move_in_date=lease.start_date, move_out_date=lease.end_date,
+                application_fee=Decimal("25.00"),
+            ) for lease, user in zip(leases, users)
+        ], batch_size=BATCH_SIZE)
+        ApartmentDetails.objects.filter(pk__in=[apartment.pk for apartment in apartments[:leased]]).update(
+            is_available=False
+        )
+        UserData.objects.filter(pk__in=[user.pk for user in users[:leased]]).update(is_tenant=True)
+
+        self.stdout.write(
+            f"Seeded {len(buildings)} buildings, {len(apartments)} apartments and parking spaces, "
+            f"{len(users) + len(booking_users) + 1} users and {len(leases)} leases "
+            f"in {time.perf_counter() - started:.1f}s"
+        )
+        return {
+            "prefix": prefix,
+            "admin": admin,
+            "users": users,
+            "booking_users": booking_users,
+            "buildings": buildings,
+            "apartments": apartments,
+            "available_apartments": apartments[leased:],
+            "leases": leases,
+        }
+
+    def get_routes(self, data, options):
+        users, buildings, apartments, leases = data["users"], data["buildings"], data["apartments"], data["leases"]
+        available = data["available_apartments"]
+        booking_users = data["booking_users"]
+        tenants = list(Tenant.objects.filter(lease__in=leases[:options["requests"]]).values_list("pk", flat=True))
+
+        def pick(items, index):
+            return items[index % len(items)]
+
+        def apartments_payload(index):
+            building = pick(buildings, index)
+            return [{
+                "building_number": building.pk, "price": "1500.00", "description": "Bulk created apartment",
+                "floor_number": 1 + index % options["floors"], "is_available": True, "dishwasher": True,
+                "microwave": True, "carpet": False, "refrigerator": True, "air_condition": True, "bedrooms": 2,
+                "bathrooms": 1, "closets": 2, "no_of_occupants": 2, "stove": "Gas", "laundry": "floor",
+                "pets": False, "smoking": False,
+            }] * 10
+
+        def parkings_payload(index):
+            return [{
+                "building_number": pick(buildings, index).pk, "parking_type": "uncovered",
+                "parking_status": "available",
+            }] * 5
+
+        def booking_payload(index):
+            apartment, user = available[index], booking_users[index]
+            return {
+                "apartment": apartment.pk,
+                "start_date": str(date.today() + timedelta(days=1)),
+                "duration": 12,
+                "rent_amount": str(apartment.price),
+                "security_deposit": "500.00",
+                "additional_charges": "0.00",
+                "payment_schedule": "monthly",
+                "tenants_list": [{
+                    "first_name": user.first_name, "last_name": user.last_name,
+                    "email": user.email, "application_fee": "25.00",
+                }],
+            }
+
+        routes = [
+            Route("users-list", "get", lambda index: "/api/users/?limit=20"),
+            Route("users-filter", "get", lambda index: "/api/users/?is_tenant=True&city=Cincinnati&limit=20"),
+            Route("users-search", "get", lambda index: f"/api/users/?search={pick(users, index).last_name}"),
+            Route("users-detail", "get", lambda index: f"/api/users/{pick(users, index).pk}/"),
+            Route("buildings-list", "get", lambda index: "/api/buildings/?limit=20"),
+            Route("buildings-filter", "get", lambda index: "/api/buildings/?city=Cincinnati&is_constructed=True"),
+            Route("buildings-detail", "get", lambda index: f"/api/buildings/{pick(buildings, index).pk}/"),
+            Route("apartments-list", "get", lambda index: "/api/apartments/?limit=20"),
+            Route(
+                "apartments-filter", "get",
+                lambda index: f"/api/apartments/?building_number={pick(buildings, index).pk}&is_available=True&limit=20"
+            ),
+            Route("apartments-keyset", "get", lambda index: "/api/apartments/?cursor=&limit=20"),
+            Route(
+                "apartments-detail", "get", lambda index: f"/api/apartments/{pick(apartments, index).pk}/"
+            ),
+            Route("parkings-list", "get", lambda index: "/api/parkings/?parking_type=covered&limit=20"),
+            Route("tenants-list", "get", lambda index: "/api/tenants/?is_active=True&limit=20"),
+            Route("tenants-detail", "get", lambda index: f"/api/tenants/{pick(tenants, index)}/"),
+            Route("leases-list", "get", lambda index: "/api/leases/?lease_status=started&limit=20"),
+            Route("leases-detail", "get", lambda index: f"/api/leases/{pick(leases, index).pk}/"),
+            Route("apartments-bulk-create", "post", lambda index: "/api/apartments/", apartments_payload, writes=True),
+            Route("parkings-bulk-create", "post", lambda index: "/api/parkings/", parkings_payload, writes=True),
+            Route("bookapartment", "post", lambda index: "/api/bookapartment/", booking_payload, writes=True),
+            Route(
+                "login", "post", lambda index: "/api/login/",
+                lambda index: {"username": pick(users, index).username, "password": PASSWORD},
+                writes=True, anonymous=True,  # The session is saved
+            ),
+        ]
+        if len(available) < options["requests"]:
+            routes = [route for route in routes if route.name != "bookapartment"]
+            self.stderr.write(self.style.WARNING(
+                f"Skipping bookapartment: {len(available)} available apartments for {options['requests']} bookings."
+            ))
+        return routes
+
+    def run_route(self, route, data, options):
+        clients = 1 if route.writes and connection.vendor == "sqlite" else options["clients"]
+        refresh = RefreshToken.for_user(data["admin"])
+        refresh[USER_MODEL_CLAIM] = data["admin"]._meta.label_lower
+        token = str(refresh.access_token)
+        samples, failures = [], []
+        barrier = threading.Barrier(clients + 1)
+
+        def client(offset):
+            api_client = APIClient(SERVER_NAME="localhost")
+            if not route.anonymous:
+                api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+            queries = [0]
+
+            def count_query(execute, sql, params, many, context):
+                queries[0] += 1
+                return execute(sql, params, many, context)
+
+            try:
+                barrier.wait()
+                with connection.execute_wrapper(count_query):
+                    for index in range(offset, options["requests"], clients):
+                        path = route.path(index)
+                        kwargs = {"format": "json"} if route.payload else {}
+                        queries[0] = 0
+                        started = time.perf_counter()
+                        if route.payload:
+                            response = getattr(api_client, route.method)(path, route.payload(index), **kwargs)
+                        else:
+                            response = getattr(api_client, route.method)(path)
+                        samples.append((time.perf_counter() - started, queries[0]))
+                        if response.status_code >= 400:
+                            failures.append((response.status_code, getattr(response, "data", None)))
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=client, args=(offset,)) for offset in range(clients)]
+        for thread in threads:
+            thread.start()
+        barrier.wait()
+        started = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        wall_time = time.perf_counter() - started
+
+        if failures:
+            status_code, detail = failures[0]
+            self.stderr.write(self.style.WARNING(
+                f"{route.name}: {len(failures)} failed requests, first with status {status_code}: {str(detail)[:500]}"
+            ))
+        latencies = sorted(latency for latency, _ in samples)
+        return {
+            "requests": len(samples),
+            "clients": clients,
+            "errors": len(failures),
+            "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+            "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+            "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+            "throughput_rps": round(len(samples) / wall_time, 1),
+            "queries_per_request": round(sum(queries for _, queries in samples) / len(samples), 2),
+        }
+
+    def report(self, name, result):
+        self.stdout.write(
+            f"{name:<24} {result['requests']:>5} req  p50 {result['p50_ms']:>8.1f}ms  "
+            f"p95 {result['p95_ms']:>8.1f}ms  p99 {result['p99_ms']:>8.1f}ms  "
+            f"{result['throughput_rps']:>8.1f} req/s  {result['queries_per_request']:>6.1f} queries/req"
+            + (f"  {result['errors']} errors" if result["errors"] else "")
+        )
+
+    def compare(self, results, options):
+        try:
+            with open(options["compare"]) as file:
+                baseline = json.load(file)
+        except (OSError, ValueError) as exc:
+            raise CommandError(f"Cannot read the baseline {options['compare']}: {exc}")
+
+        changed = [
+            key for key, value in baseline["meta"].items()
+            if key not in ["created", "python", "django"] and results["meta"].get(key) != value
+        ]
+        if changed:
+            self.stderr.write(self.style.WARNING(
+                f"The baseline was run with other settings ({', '.join(changed)}), the results may not be comparable."
+            ))
+
+        regressions = []
+        for name, current in results["routes"].items():
+            previous = baseline["routes"].get(name)
+            if previous is None:
+                self.stdout.write(f"{name}: not in the baseline")
+                continue
+            delta = current["p95_ms"] - previous["p95_ms"]
+            self.stdout.write(
+                f"{name:<24} p95 {previous['p95_ms']:.1f} -> {current['p95_ms']:.1f}ms ({delta:+.1f}ms), "
+                f"queries/req {previous['queries_per_request']} -> {current['queries_per_request']}"
+            )
+            if current["p95_ms"] > previous["p95_ms"] * (1 + options["tolerance"]) and delta > options["min_delta"]:
+                regressions.append(f"{name}: p95 {previous['p95_ms']:.1f}ms -> {current['p95_ms']:.1f}ms")
+            if current["queries_per_request"] > previous["queries_per_request"] + options["query_tolerance"]:
+                regressions.append(
+                    f"{name}: {previous['queries_per_request']} -> {current['queries_per_request']} queries per request"
+                )
+            if current["errors"] > previous["errors"]:
+                regressions.append(f"{name}: {previous['errors']} -> {current['errors']} errors")
+
+        if regressions:
+            raise CommandError("Performance regressions:\n" + "\n".join(regressions))
+        self.stdout.write(self.style.SUCCESS("No regression against the baseline."))
+
+    def cleanup(self, data):
+        # Apartments, parking spaces, counters, leases and tenants cascade with the buildings
+        BuildingDetails.objects.filter(pk__in=[building.pk for building in data["buildings"]]).delete()
+        UserData.objects.filter(username__startswith=data["prefix"]).delete()
@@ -0,0 +1,118 @@
+import asyncio
+import statistics
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from api.models import ApartmentDetails, UserData
+from bma_backend.authentication import USER_MODEL_CLAIM
+
+
+async def fetch(host, port, path, token, timeout):
+    """
+    GET `path` on a new connection and return the response status code.
+    """
+    reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    try:
+        request = f"GET {path} HTTP/1.1\r\nHost: {host}\r\nAccept: application/json\r\nConnection: close\r\n"
+        if token:
+            request += f"Authorization: Bearer {token}\r\n"
+        writer.write(f"{request}\r\n".encode("latin-1"))
+        await writer.drain()
+        response = await asyncio.wait_for(reader.read(), timeout)
+    finally:
+        writer.close()
+    return int(response.split(b" ", 2)[1])
+
+
+class Command(BaseCommand):
+    """
+    Concurrency benchmark of the sync (WSGI) read endpoints against their async (ASGI)
+    variants under `/api/async/`. Both servers must already be running, e.g.:
+
+        gunicorn bma_backend.wsgi:application -b 127.0.0.1:8000 -w 4
+        gunicorn bma_backend.asgi:application -b 127.0.0.1:8001 -w 4 -k uvicorn.workers.UvicornWorker
+    """
+    help = "Compare the sync and async read endpoints under many concurrent clients."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--wsgi-url", default="http://127.0.0.1:8000", help="Base URL of the WSGI server.")
+        parser.add_argument("--asgi-url", default="http://127.0.0.1:8001", help="Base URL of the ASGI server.")
+        parser.add_argument("--clients", type=int, default=500, help="Number of concurrent clients.")
+        parser.add_argument("--requests", type=int, default=20, help="Requests per client.")
+        parser.add_argument("--timeout", type=float, default=30.0, help="Request timeout in seconds.")
+        parser.add_argument("--username", help="Authenticate the requests as this user (needed for buildings).")
+        parser.add_argument("--path", action="append", dest="paths", help="Endpoint under /api/, repeatable.")
+
+    def handle(self, *args, **options):
+        token = None
+        if options["username"]:
+            try:
+                user = UserData.objects.get(username=options["username"])
+            except UserData.DoesNotExist:
+                raise CommandError(f"User `{options['username']}` does not exist.")
+            refresh = RefreshToken.for_user(user)
+            refresh[USER_MODEL_CLAIM] = user._meta.label_lower
+            token = str(refresh.access_token)
+
+        paths = options["paths"]
+        if not paths:
+            paths = ["apartments/?limit=25", "buildings/?limit=25", "parkings/?limit=25"]
+            apartment_id = ApartmentDetails.objects.values_list("pk", flat=True).first()
+            if apartment_id is not None:
+                paths.append(f"apartments/{apartment_id}/")
+
+        results = {}
+        for name, base_url, prefix in [
+                ("sync", options["wsgi_url"], "/api/"),
+                ("async", options["asgi_url"], "/api/async/"),
+            ]:
+            if not base_url:
+                continue
+            url = urlsplit(base_url)
+            results[name] = asyncio.run(self.run_clients(
+                url.hostname, url.port or 80, [f"{url.path.rstrip('/')}{prefix}{path}" for path in paths],
+                token, options
+            ))
+            self.report(name, base_url, *results[name])
+
+        if len(results) == 2:
+            sync_throughput, async_throughput = results["sync"][2], results["async"][2]
+            self.stdout.write(f"Async/sync throughput: {async_throughput / sync_throughput:.2f}x")
+
+    async def run_clients(self, host, port, paths, token, options):
+        latencies, statuses = [], {}
+
+        async def client(index):
+            for number in range(options["requests"]):
+                path = paths[(index + number) % len(paths)]
+                started = time.perf_counter()
+                try:
+                    status = await fetch(host, port, path, token, options["timeout"])
+                except (OSError, asyncio.TimeoutError, IndexError, ValueError) as exc:
+                    status = type(exc).__name__
+                latencies.append(time.perf_counter() - started)
+                statuses[status] = statuses.get(status, 0) + 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(client(index) for index in range(options["clients"])))
+        elapsed = time.perf_counter() - started
+        return latencies, statuses, len(latencies) / elapsed
+
+    def report(self, name, base_url, latencies, statuses, throughput):
+        latencies = sorted(latencies)
+
+        def percentile(value):
+            return latencies[min(len(latencies) - 1, int(len(latencies) * value))] * 1000
+
+        self.stdout.write(
+            f"{name} ({base_url}): {len(latencies)} requests, {throughput:.0f} req/s, "
+            f"p50 {statistics.median(latencies) * 1000:.0f}ms, p95 {percentile(0.95):.0f}ms, "
+            f"p99 {percentile(0.99):.0f}ms, max {latencies[-1] * 1000:.0f}ms"
+        )
+        self.stdout.write(f"  Status codes: {', '.join(f'{status}: {count}' for status, count in statuses.items())}")
+        failed = sum(count for status, count in statuses.items() if status != 200)
+        if failed:
+            self.stdout.write(self.style.WARNING(f"  {failed} requests did not return 200."))
@@ -0,0 +1,132 @@
+import threading
+import time
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from api.models import ApartmentDetails, BuildingDetails, UserData
+
+
+class Command(BaseCommand):
+    """
+    Stress test for the booking API: fires N parallel bookings of the same apartment
+    and reports how many succeeded (must be exactly one) and the latency distribution.
+    """
+    help = "Fire parallel bookings of a single apartment and check that only one succeeds."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--clients", type=int, default=50, help="Number of parallel bookings.")
+        parser.add_argument(
+            "--max-latency", type=float, default=2.0,
+            help="Fail if any booking takes longer than this many seconds."
+        )
+        parser.add_argument("--keep", action="store_true", help="Keep the generated data.")
+
+    def handle(self, *args, **options):
+        clients = options["clients"]
+        run_id = uuid.uuid4().hex[:8]
+        building, apartment, users = self.seed(run_id, clients)
+
+        barrier = threading.Barrier(clients)
+        results = [None] * clients
+
+        def book(index):
+            client = APIClient(SERVER_NAME="localhost")
+            client.force_authenticate(users[index])
+            payload = {
+                "apartment": apartment.pk,
+                "start_date": str(date.today() + timedelta(days=1)),
+                "duration": 12,
+                "rent_amount": str(apartment.price),
+                "security_deposit": "500.00",
+                "additional_charges": "0.00",
+                "payment_schedule": "monthly",
+                "tenants_list": [{
+                    "first_name": users[index].first_name,
+                    "last_name": users[index].last_name,
+                    "email": users[index].email,
+                    "application_fee": "25.00",
+                }],
+            }
+            started = time.perf_counter()
+            try:
+                barrier.wait()
+                started = time.perf_counter()
+                response = client.post("/api/bookapartment/", payload, format="json")
+                results[index] = (response.status_code, time.perf_counter() - started)
+            except Exception as exc:
+                results[index] = (type(exc).__name__, time.perf_counter() - started)  # Reported as a failure
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=book, args=(index,)) for index in range(clients)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        try:
+            self.report(results, options["max_latency"])
+        finally:
+            if not options["keep"]:
+                building.delete()
+                UserData.objects.filter(pk__in=[user.pk for user in users]).delete()
+
+    def seed(self, run_id, clients):
+        building = BuildingDetails.objects.create(
+            building_number=str(int(run_id, 16) % 10 ** 9 + 10),
+            street_name="Benchmark Street",
+            city="Cincinnati",
+            state="OH",
+            country="US",
+            zip_code="45219",
+            no_of_floors=1,
+        )
+        apartment = ApartmentDetails.objects.create(
+            building_number=building,
+            price=Decimal("1200.00"),
+            description="Booking benchmark apartment",
+            floor_number=1,
+            stove="Gas",
+            laundry="in_unit",
+        )
+        users = UserData.objects.bulk_create([
+            UserData(
+                username=f"bench_{run_id}_{index}",
+                email=f"bench_{run_id}_{index}@example.com",
+                first_name="Bench",
+                last_name=str(index),
+                phone_number="+1 (513) 123-7890",
+            ) for index in range(clients)
+        ])
+        return building, apartment, list(UserData.objects.filter(pk__in=[user.pk for user in users]))
+
+    def report(self, results, max_latency):
+        latencies = sorted(latency for _, latency in results)
+        codes = {}
+        for code, _ in results:
+            codes[code] = codes.get(code, 0) + 1
+
+        def percentile(value):
+            return latencies[min(len(latencies) - 1, int(len(latencies) * value))]
+
+        self.stdout.write(f"Status codes: {dict(sorted(codes.items(), key=lambda item: str(item[0])))}")
+        self.stdout.write(
+            f"Latency p50={percentile(0.50) * 1000:.1f}ms p95={percentile(0.95) * 1000:.1f}ms "
+            f"max={latencies[-1] * 1000:.1f}ms"
+        )
+
+        errors = {code: count for code, count in codes.items() if isinstance(code, str)}
+        if errors:
+            raise CommandError(f"Bookings failed with exceptions: {errors}.")
+        winners = codes.get(status.HTTP_201_CREATED, 0)
+        if winners != 1:
+            raise CommandError(f"Expected exactly one successful booking, got {winners}.")
+        if latencies[-1] > max_latency:
+            raise CommandError(f"Slowest booking took {latencies[-1]:.3f}s (limit {max_latency}s).")
+        self.stdout.write(self.style.SUCCESS("Exactly one booking succeeded."))
@@ -0,0 +1,81 @@
+import time
+import uuid
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test.utils import override_settings
+
+from api.models import ApartmentDetails, BuildingDetails, ChangeLog, ParkingDetails
+
+
+class Command(BaseCommand):
+    """
+    Write overhead of the change log: the same writes, in one transaction, without the
+    change log, with it (every save writes its entry once committed), and with it buffered
+    as in the viewsets (one INSERT for all the entries, before the commit). Covers the
+    saves of single rows, bulk_create() and update().
+    """
+    help = "Measure the overhead of the change log on the saves, bulk creates and updates."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=500, help="Rows written per measure.")
+        parser.add_argument("--repeat", type=int, default=3, help="Measures per mode, the best one is kept.")
+        parser.add_argument("--keep", action="store_true", help="Keep the generated data.")
+
+    def handle(self, *args, **options):
+        rows = options["rows"]
+        run_id = uuid.uuid4().hex[:8]
+        building = BuildingDetails.objects.create(
+            building_number=str(int(run_id, 16) % 10 ** 9 + 10),
+            street_name="Benchmark Street",
+            city="Cincinnati",
+            state="OH",
+            country="US",
+            zip_code="45219",
+            no_of_floors=1,
+        )
+        last_entry = ChangeLog.objects.order_by("-id").values_list("id", flat=True).first() or 0
+        try:
+            apartments = [
+                ApartmentDetails.objects.create(
+                    building_number=building, price=Decimal("1200.00"), description="Change log benchmark apartment",
+                    floor_number=1, stove="Gas", laundry="in_unit",
+                ) for _ in range(rows)
+            ]
+            price = [Decimal("1200.00")]
+
+            def save():
+                price[0] += 1
+                for apartment in apartments:
+                    apartment.price = price[0]
+                    apartment.save()
+
+            def bulk_create():
+                ParkingDetails.objects.bulk_create([
+                    ParkingDetails(building_number=building, parking_type="covered") for _ in range(rows)
+                ])
+
+            def update():
+                price[0] += 1
+                ApartmentDetails.objects.filter(building_number=building).update(price=price[0])
+
+            for name, write in [("save", save), ("bulk_create", bulk_create), ("update", update)]:
+                timings = {}
+                for _ in range(options["repeat"]):
+                    for mode in ["off", "on", "buffered"]:
+                        with override_settings(CHANGE_LOG_ENABLED=mode != "off"):
+                            started = time.perf_counter()
+                            with ChangeLog.buffered() if mode == "buffered" else transaction.atomic():
+                                write()
+                            elapsed = time.perf_counter() - started
+                        timings[mode] = min(timings.get(mode, elapsed), elapsed)
+                self.stdout.write(f"{name} ({rows} rows): " + ", ".join(
+                    f"{mode} {rows / elapsed:,.0f} rows/s ({elapsed / timings['off'] - 1:+.0%})"
+                    for mode, elapsed in timings.items()
+                ))
+        finally:
+            if not options["keep"]:
+                with override_settings(CHANGE_LOG_ENABLED=False), transaction.atomic():
+                    building.delete()
+                    ChangeLog.objects.filter(id__gt=last_entry).delete()
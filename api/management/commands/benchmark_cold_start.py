@@ -0,0 +1,102 @@
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def get(url, timeout):
+    """
+    GET `url` and return the status code, or None if the server isn't accepting connections yet.
+    """
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            return response.status
+    except urllib.error.HTTPError as exc:
+        return exc.code
+    except (urllib.error.URLError, ConnectionError, socket.timeout):
+        return None
+
+
+class Command(BaseCommand):
+    """
+    Measures the time from starting the production server (gunicorn with gunicorn.conf.py)
+    to its first served request, then the slowest of one concurrent request per worker
+    (the workers' first requests), with and without the warm-up hook.
+    """
+    help = "Measure the production server's cold start to first request time."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--app", default="bma_backend.wsgi:application")
+        parser.add_argument("--path", default="/api/apartments/?limit=1", help="Path of the first request.")
+        parser.add_argument("--runs", type=int, default=5)
+        parser.add_argument("--workers", type=int, default=2)
+        parser.add_argument("--timeout", type=float, default=60.0, help="Seconds to wait for the server.")
+
+    def handle(self, *args, **options):
+        for warm_up in [True, False]:
+            startups, first_requests = [], []
+            for _ in range(options["runs"]):
+                startup, first_request = self.cold_start(warm_up, options)
+                startups.append(startup)
+                first_requests.append(first_request)
+            self.stdout.write(
+                f"Warm-up {'on' if warm_up else 'off'}: start to first response "
+                f"{statistics.median(startups) * 1000:.0f}ms, slowest worker first request "
+                f"{statistics.median(first_requests) * 1000:.0f}ms (medians of {options['runs']} runs)"
+            )
+
+    def cold_start(self, warm_up, options):
+        port = free_port()
+        url = f"http://127.0.0.1:{port}{options['path']}"
+        env = dict(
+            os.environ,
+            GUNICORN_BIND=f"127.0.0.1:{port}",
+            GUNICORN_WORKERS=str(options["workers"]),
+            GUNICORN_WARMUP=str(warm_up),
+            GUNICORN_ACCESSLOG="",
+        )
+        started = time.perf_counter()
+        server = subprocess.Popen(
+            [sys.executable, "-m", "gunicorn", "-c", str(settings.BASE_DIR / "gunicorn.conf.py"), options["app"]],
+            cwd=settings.BASE_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            while True:
+                if server.poll() is not None:
+                    raise CommandError(f"The server exited with code {server.returncode}.")
+                if time.perf_counter() - started > options["timeout"]:
+                    raise CommandError(f"The server didn't answer within {options['timeout']}s.")
+                status = get(url, options["timeout"])
+                if status is not None:
+                    break
+                time.sleep(0.01)
+            if status >= 500:
+                raise CommandError(f"The first request failed with status {status}.")
+            startup = time.perf_counter() - started
+
+            def timed_get(_):
+                request_started = time.perf_counter()
+                get(url, options["timeout"])
+                return time.perf_counter() - request_started
+
+            with ThreadPoolExecutor(options["workers"]) as executor:
+                first_request = max(executor.map(timed_get, range(options["workers"])))
+            return startup, first_request
+        finally:
+            server.send_signal(signal.SIGTERM)
+            server.wait()
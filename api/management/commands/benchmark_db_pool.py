@@ -0,0 +1,84 @@
+import copy
+import statistics
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from rest_framework.test import APIClient
+
+from bma_backend.db.postgresql.pool import pool_stats
+
+
+class Command(BaseCommand):
+    """
+    Request latency benchmark with a new connection per request, persistent connections
+    (CONN_MAX_AGE) and the connection pool. Requests go through the whole Django stack,
+    which releases the connection at the end of each request like in production.
+    """
+    help = "Compare request latency without pooling, with persistent connections and with the pool."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", default="/api/apartments/?limit=10")
+        parser.add_argument("--clients", type=int, default=8, help="Concurrent client threads.")
+        parser.add_argument("--requests", type=int, default=200, help="Requests per client.")
+        parser.add_argument("--pool-max-size", type=int, help="Defaults to the configured pool max_size.")
+
+    def handle(self, *args, **options):
+        settings_dict = connection.settings_dict
+        if settings_dict["ENGINE"] != "bma_backend.db.postgresql":
+            raise CommandError("The default database must use the `bma_backend.db.postgresql` engine.")
+
+        original = copy.deepcopy({key: settings_dict[key] for key in ["CONN_MAX_AGE", "OPTIONS"]})
+        pool_options = dict(original["OPTIONS"].get("pool") or {})
+        if options["pool_max_size"]:
+            pool_options["max_size"] = options["pool_max_size"]
+        options_without_pool = {key: value for key, value in original["OPTIONS"].items() if key != "pool"}
+
+        modes = [
+            ("No pooling", 0, options_without_pool),
+            ("Persistent connections", 600, options_without_pool),
+            ("Connection pool", 0, dict(options_without_pool, pool=pool_options)),
+        ]
+        try:
+            for name, conn_max_age, database_options in modes:
+                connections.close_all()
+                # The settings dict is shared by the connections of every thread
+                settings_dict["CONN_MAX_AGE"] = conn_max_age
+                settings_dict["OPTIONS"] = database_options
+                self.report(name, self.run_clients(options))
+            self.stdout.write(f"Pool statistics: {pool_stats()}")
+        finally:
+            connections.close_all()
+            settings_dict.update(original)
+
+    def run_clients(self, options):
+        latencies, failures = [], []
+
+        def client():
+            api_client = APIClient(SERVER_NAME="localhost")
+            try:
+                for _ in range(options["requests"]):
+                    started = time.perf_counter()
+                    response = api_client.get(options["path"])
+                    latencies.append(time.perf_counter() - started)
+                    if response.status_code != 200:
+                        failures.append(response.status_code)
+            finally:
+                connection.close()  # Persistent connections of the thread
+
+        threads = [threading.Thread(target=client) for _ in range(options["clients"])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if failures:
+            raise CommandError(f"{len(failures)} requests failed (status codes {sorted(set(failures))}).")
+        return sorted(latencies)
+
+    def report(self, name, latencies):
+        self.stdout.write(
+            f"{name}: {len(latencies)} requests, p50 {statistics.median(latencies) * 1000:.1f}ms, "
+            f"p95 {latencies[int(len(latencies) * 0.95) - 1] * 1000:.1f}ms, "
+            f"max {latencies[-1] * 1000:.1f}ms"
+        )
@@ -0,0 +1,129 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from api.filters import TrigramSearchFilter
+from api.models import UserData
+from api.restful.viewsets import UsersViewSet
+
+FIRST_NAMES = [
+    "James", "Mary", "Robert", "Patricia", "John", "Jennifer", "Michael", "Linda", "David", "Elizabeth",
+    "William", "Barbara", "Richard", "Susan", "Joseph", "Jessica", "Thomas", "Sarah", "Christopher", "Karen",
+    "Charles", "Lisa", "Daniel", "Nancy", "Matthew", "Betty", "Anthony", "Margaret", "Mark", "Sandra",
+]
+LAST_NAMES = [
+    "Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez", "Martinez",
+    "Hernandez", "Lopez", "Gonzalez", "Wilson", "Anderson", "Thomas", "Taylor", "Moore", "Jackson", "Martin",
+    "Lee", "Perez", "Thompson", "White", "Harris", "Sanchez", "Clark", "Ramirez", "Lewis", "Robinson",
+]
+USERNAME_PREFIX = "fuzzybench_"
+
+
+def misspell(value, rng):
+    """
+    Swap two neighbouring characters of `value`, like a typing mistake.
+    """
+    if len(value) < 3:
+        return value
+    index = rng.randrange(1, len(value) - 1)
+    return value[:index] + value[index + 1] + value[index] + value[index + 2:]
+
+
+class Command(BaseCommand):
+    """
+    Latency benchmark for the `?fuzzy=` trigram lookup of the users list.
+    """
+    help = "Fill a synthetic users table and time misspelled `?fuzzy=` lookups."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000000, help="Number of synthetic users.")
+        parser.add_argument("--queries", type=int, default=200, help="Number of lookups to time.")
+        parser.add_argument("--similarity", type=float, default=TrigramSearchFilter.default_threshold)
+        parser.add_argument("--page-size", type=int, default=25, help="Rows fetched per lookup.")
+        parser.add_argument(
+            "--max-p95", type=float, default=50.0,
+            help="Fail if the 95th percentile latency is above this many milliseconds."
+        )
+        parser.add_argument("--batch-size", type=int, default=10000)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--keep", action="store_true", help="Keep the synthetic users for the next run.")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            self.stderr.write(self.style.WARNING(
+                "Not running on PostgreSQL, the lookups fall back to unindexed `icontains` scans."
+            ))
+        rng = random.Random(options["seed"])
+
+        existing = UserData.objects.filter(username__startswith=USERNAME_PREFIX).count()
+        if existing < options["users"]:
+            self.seed(existing, options["users"], options["batch_size"])
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute(f"ANALYZE {connection.ops.quote_name(UserData._meta.db_table)}")
+
+        try:
+            self.run_lookups(rng, options)
+        finally:
+            if not options["keep"]:
+                UserData.objects.filter(username__startswith=USERNAME_PREFIX).delete()
+
+    def seed(self, start, total, batch_size):
+        self.stdout.write(f"Creating {total - start} synthetic users...")
+        started = time.perf_counter()
+        for offset in range(start, total, batch_size):
+            users = []
+            for number in range(offset, min(offset + batch_size, total)):
+                first_name = FIRST_NAMES[number % len(FIRST_NAMES)]
+                last_name = LAST_NAMES[number // len(FIRST_NAMES) % len(LAST_NAMES)]
+                users.append(UserData(
+                    username=f"{USERNAME_PREFIX}{first_name.lower()}{number}",
+                    password="!",  # Unusable password
+                    first_name=first_name,
+                    last_name=f"{last_name}{number // (len(FIRST_NAMES) * len(LAST_NAMES)) or ''}",
+                    email=f"{first_name}.{last_name}{number}@example.com".lower(),
+                    phone_number=f"+1 ({number // 10000000 % 1000:03d}) {number // 10000 % 1000:03d}-{number % 10000:04d}",
+                    current_address="1 Benchmark Street",
+                    city="Cincinnati",
+                    state="OH",
+                    country="US",
+                    zip_code="45220",
+                ))
+            UserData.objects.bulk_create(users)
+        self.stdout.write(f"Created in {time.perf_counter() - started:.1f}s")
+
+    def run_lookups(self, rng, options):
+        search = TrigramSearchFilter()
+        fields = UsersViewSet.trigram_search_fields
+        samples = list(
+            UserData.objects.filter(username__startswith=USERNAME_PREFIX).order_by("?").values_list(
+                "first_name", "last_name", "email", "phone_number"
+            )[:options["queries"]]
+        )
+        if not samples:
+            raise CommandError("No synthetic users to look up.")
+
+        queryset = UserData.objects.all().order_by("id")
+        timings, matched = [], 0
+        for first_name, last_name, email, phone_number in samples:
+            term = misspell(rng.choice([f"{first_name} {last_name}", last_name, email, phone_number]), rng)
+            started = time.perf_counter()
+            rows = list(search.search(queryset, fields, term, options["similarity"])[:options["page_size"]])
+            timings.append((time.perf_counter() - started) * 1000)
+            matched += bool(rows)
+
+        if connection.vendor == "postgresql":
+            self.stdout.write(search.search(queryset, fields, term, options["similarity"])[:options["page_size"]].explain())
+
+        timings.sort()
+        p95 = timings[int(len(timings) * 0.95) - 1] if len(timings) >= 20 else timings[-1]
+        self.stdout.write(
+            f"{len(timings)} lookups: p50 {statistics.median(timings):.1f}ms, p95 {p95:.1f}ms, "
+            f"max {timings[-1]:.1f}ms, {matched} with results"
+        )
+        if p95 > options["max_p95"]:
+            raise CommandError(f"95th percentile latency is above {options['max_p95']}ms.")
+        self.stdout.write(self.style.SUCCESS("Fuzzy lookups are within the latency budget."))
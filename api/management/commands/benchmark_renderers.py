@@ -0,0 +1,94 @@
+import time
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+from io import BytesIO
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from api.management.commands.benchmark_serializers import build_apartments, build_parkings, build_users
+from api.models import LeaseDetails, Tenant
+from api.restful.serializers import (
+    ApartmentDetailsSerializer, LeaseDetailsSerializer, ParkingDetailsSerializer, TenantSerializer, UserSerializer
+)
+from bma_backend.renderers import ORJSONParser, ORJSONRenderer
+
+
+def build_leases(rows):
+    start_date = date.today()
+    return [
+        LeaseDetails(
+            agreement_number=370204388934791168 + index, apartment_id=100 + index, start_date=start_date,
+            end_date=start_date + timedelta(days=365), duration=12, rent_amount=Decimal("1200.00"),
+            security_deposit=Decimal("500.00"), additional_charges=Decimal("25.50"), payment_schedule="monthly",
+            lease_status="started",
+        ) for index in range(rows)
+    ]
+
+
+def build_tenants(rows):
+    start_date = date.today()
+    return [
+        Tenant(
+            tenant_id=uuid.uuid4(), lease_id=370204388934791168 + index, user_id=1 + index,
+            move_in_date=start_date, move_out_date=start_date + timedelta(days=365),
+            application_fee=Decimal("25.00"),
+        ) for index in range(rows)
+    ]
+
+
+class Command(BaseCommand):
+    """
+    Render and parse benchmark of the orjson renderer/parser against DRF's stdlib json ones,
+    on list pages (`{"count", "next", "previous", "results"}`) of the serialized models.
+    Also checks that both renderers produce the same bytes.
+    """
+    help = "Compare the orjson renderer and parser with DRF's JSONRenderer and JSONParser."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=100, help="Rows per page.")
+        parser.add_argument("--pages", type=int, default=500, help="Pages rendered and parsed per measure.")
+
+    def handle(self, *args, **options):
+        rows, pages = options["rows"], options["pages"]
+        for serializer_class, build in [
+            (ApartmentDetailsSerializer, build_apartments),
+            (ParkingDetailsSerializer, build_parkings),
+            (UserSerializer, build_users),
+            (LeaseDetailsSerializer, build_leases),
+            (TenantSerializer, build_tenants),
+        ]:
+            data = {
+                "count": rows * 10,
+                "next": "http://localhost/api/?limit=100&offset=100",
+                "previous": None,
+                "results": serializer_class(build(rows), many=True).data,
+            }
+            rendered = {}
+            timings = {}
+            for name, renderer, parser in [
+                ("json", JSONRenderer(), JSONParser()),
+                ("orjson", ORJSONRenderer(), ORJSONParser()),
+            ]:
+                rendered[name] = renderer.render(data, "application/json")
+                started = time.perf_counter()
+                for _ in range(pages):
+                    renderer.render(data, "application/json")
+                render_time = time.perf_counter() - started
+                started = time.perf_counter()
+                for _ in range(pages):
+                    parser.parse(BytesIO(rendered[name]), "application/json", {})
+                timings[name] = (render_time, time.perf_counter() - started)
+
+            if rendered["json"] != rendered["orjson"]:
+                raise CommandError(f"{serializer_class.__name__}: the renderers produce different JSON.")
+            (json_render, json_parse), (orjson_render, orjson_parse) = timings["json"], timings["orjson"]
+            self.stdout.write(
+                f"{serializer_class.__name__} ({len(rendered['json']) // 1024}KB pages): "
+                f"render {rows * pages / json_render:,.0f} -> {rows * pages / orjson_render:,.0f} rows/s "
+                f"({json_render / orjson_render:.1f}x), "
+                f"parse {rows * pages / json_parse:,.0f} -> {rows * pages / orjson_parse:,.0f} rows/s "
+                f"({json_parse / orjson_parse:.1f}x)"
+            )
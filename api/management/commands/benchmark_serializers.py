@@ -0,0 +1,82 @@
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from api.models import ApartmentDetails, ParkingDetails, UserData
+from api.restful.serializers import ApartmentDetailsSerializer, ParkingDetailsSerializer, UserSerializer
+
+
+def build_apartments(rows):
+    now = timezone.now()
+    return [
+        ApartmentDetails(
+            id=100 + index, apartment_number=100 + index, building_number_id="10", price=Decimal("1200.00") + index,
+            description=f"Apartment {index} with a view", floor_number=1 + index // 100, bedrooms=index % 4,
+            stove="Gas", laundry="in_unit", pets=index % 2 == 0, created_on=now, modified_on=now,
+        ) for index in range(rows)
+    ]
+
+
+def build_parkings(rows):
+    now = timezone.now()
+    return [
+        ParkingDetails(
+            parking_number=1 + index, building_number_id="10", apartment_id=100 + index,
+            parking_type="covered", parking_status="occupied", created_on=now, modified_on=now,
+        ) for index in range(rows)
+    ]
+
+
+def build_users(rows):
+    now = timezone.now()
+    return [
+        UserData(
+            id=1 + index, username=f"user{index}", first_name="First", last_name=f"Last{index}",
+            email=f"user{index}@example.com", phone_number="+1 (513) 123-7890", current_address="1 Main Street",
+            city="Cincinnati", state="OH", country="US", zip_code="45219", created_at=now - timedelta(days=index),
+        ) for index in range(rows)
+    ]
+
+
+class Command(BaseCommand):
+    """
+    CPU benchmark of the list serialization: rows/sec of DRF's field by field
+    `to_representation` and of the compiled read path (CompiledRepresentationMixin), on
+    in-memory pages so that no query is timed. Also checks that both render the same JSON.
+    """
+    help = "Compare the rows/sec of the default and the compiled serializer read paths."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=100, help="Rows per page.")
+        parser.add_argument("--pages", type=int, default=200, help="Pages serialized per measure.")
+
+    def handle(self, *args, **options):
+        for serializer_class, build in [
+            (ApartmentDetailsSerializer, build_apartments),
+            (ParkingDetailsSerializer, build_parkings),
+            (UserSerializer, build_users),
+        ]:
+            default_class = type(f"Default{serializer_class.__name__}", (serializer_class,), {
+                "compiled_representation": False,
+            })
+            instances = build(options["rows"])
+
+            outputs = {}
+            rates = {}
+            for name, cls in [("default", default_class), ("compiled", serializer_class)]:
+                outputs[name] = JSONRenderer().render(cls(instances, many=True).data)  # Also warms up
+                started = time.perf_counter()
+                for _ in range(options["pages"]):
+                    cls(instances, many=True).data
+                rates[name] = options["rows"] * options["pages"] / (time.perf_counter() - started)
+
+            if outputs["default"] != outputs["compiled"]:
+                raise CommandError(f"{serializer_class.__name__}: the compiled read path renders other JSON.")
+            self.stdout.write(
+                f"{serializer_class.__name__}: default {rates['default']:,.0f} rows/s, "
+                f"compiled {rates['compiled']:,.0f} rows/s ({rates['compiled'] / rates['default']:.1f}x)"
+            )
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.models import BuildingStats
+
+
+class Command(BaseCommand):
+    """
+    Consistency check of the occupancy/rent roll/parking summary of the buildings against the
+    apartments, leases and parking spaces. Exits with an error when a building drifted.
+    """
+    help = "Compare the stats of the buildings with their apartments, leases and parking spaces."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--fix", action="store_true", help="Rebuild the stats of the buildings which drifted.")
+
+    def handle(self, *args, **options):
+        differences = BuildingStats.check_consistency()
+        for building_number, fields in sorted(differences.items()):
+            self.stderr.write(f"Building {building_number}: " + ", ".join(
+                f"{name} is {saved}, expected {expected}" for name, (saved, expected) in fields.items()
+            ))
+
+        if differences and options["fix"]:
+            BuildingStats.rebuild(list(differences))
+            self.stdout.write(f"Rebuilt the stats of {len(differences)} buildings.")
+        elif differences:
+            raise CommandError(f"The stats of {len(differences)} buildings are inconsistent, run with --fix.")
+        else:
+            self.stdout.write("The stats of all the buildings are consistent.")
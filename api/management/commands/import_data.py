@@ -0,0 +1,49 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.models import UserData
+from api.utils.bulk_import import IMPORTERS, IMPORT_FORMATS
+
+
+class Command(BaseCommand):
+    """
+    Bulk import of buildings, apartments and parking spaces from CSV/NDJSON files.
+    """
+    help = "Import buildings, apartments or parking spaces from a CSV or NDJSON file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("kind", choices=list(IMPORTERS), help="Type of the records in the file.")
+        parser.add_argument("path", help="Path of the CSV (with header) or NDJSON file.")
+        parser.add_argument(
+            "--format", choices=IMPORT_FORMATS, dest="file_format",
+            help="File format, guessed from the file extension by default."
+        )
+        parser.add_argument("--batch-size", type=int, help="Number of rows validated and loaded at once.")
+        parser.add_argument("--user", help="Username recorded as the creator of the rows.")
+        parser.add_argument("--report", help="Write the per-row error report to this JSON file.")
+
+    def handle(self, *args, **options):
+        file_format = options["file_format"] or options["path"].rsplit(".", 1)[-1].lower()
+        if file_format not in IMPORT_FORMATS:
+            raise CommandError(f"Cannot guess the format of `{options['path']}`, use --format.")
+
+        user = None
+        if options["user"]:
+            try:
+                user = UserData.objects.get(username=options["user"])
+            except UserData.DoesNotExist:
+                raise CommandError(f"User `{options['user']}` does not exist.")
+
+        importer = IMPORTERS[options["kind"]](user=user, batch_size=options["batch_size"])
+        with open(options["path"], encoding="utf-8-sig", newline="") as file:
+            report = importer.run(file, file_format)
+
+        if options["report"]:
+            with open(options["report"], "w") as file:
+                json.dump(report, file, indent=2)
+        else:
+            for error in report["errors"]:
+                self.stderr.write(f"Row {error['row']}: {json.dumps(error['errors'])}")
+
+        self.stdout.write(f"Created {report['created']} {options['kind']}, rejected {len(report['errors'])} rows.")
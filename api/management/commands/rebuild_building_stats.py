@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from api.models import BuildingStats
+
+
+class Command(BaseCommand):
+    """
+    Full recomputation of the occupancy/rent roll/parking summary of the buildings from the
+    apartments, leases and parking spaces.
+    """
+    help = "Recompute the stats of all the buildings, or of the given ones."
+
+    def add_arguments(self, parser):
+        parser.add_argument("building_numbers", nargs="*", help="Buildings to recompute, all of them by default.")
+
+    def handle(self, *args, **options):
+        stats = BuildingStats.rebuild(options["building_numbers"] or None)
+        self.stdout.write(f"Rebuilt the stats of {len(stats)} buildings.")
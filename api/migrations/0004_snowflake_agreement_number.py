@@ -0,0 +1,35 @@
+# Generated by Django 5.0.1 on 2026-10-18 10:00
+
+import api.utils.utils
+from django.db import migrations, models
+
+from api.utils.utils import SnowflakeGenerator
+
+
+def create_worker_id_sequence(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(
+            f"CREATE SEQUENCE IF NOT EXISTS {SnowflakeGenerator.WORKER_ID_SEQUENCE} "
+            f"MINVALUE 0 MAXVALUE {SnowflakeGenerator.MAX_WORKER_ID} START 0 CYCLE"
+        )
+
+
+def drop_worker_id_sequence(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(f"DROP SEQUENCE IF EXISTS {SnowflakeGenerator.WORKER_ID_SEQUENCE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_alter_leasedetails_agreement_number'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='leasedetails',
+            name='agreement_number',
+            field=models.BigAutoField(default=api.utils.utils.generate_unique_integer_number, editable=False, help_text='Unique agreement number (Snowflake id: timestamp, worker id and sequence)', primary_key=True, serialize=False),
+        ),
+        migrations.RunPython(create_worker_id_sequence, drop_worker_id_sequence),
+    ]
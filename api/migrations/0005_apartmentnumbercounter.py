@@ -0,0 +1,46 @@
+# Generated by Django 5.0.1 on 2026-10-18 13:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def backfill_counters(apps, schema_editor):
+    """
+    Start each floor counter after the highest apartment number already on the floor.
+    """
+    ApartmentDetails = apps.get_model("api", "ApartmentDetails")
+    ApartmentNumberCounter = apps.get_model("api", "ApartmentNumberCounter")
+    floors = ApartmentDetails.objects.values("building_number", "floor_number").annotate(
+        last_apartment_number=Max("apartment_number")
+    ).order_by()
+    ApartmentNumberCounter.objects.bulk_create([
+        ApartmentNumberCounter(
+            building_number_id=floor["building_number"],
+            floor_number=floor["floor_number"],
+            last_number=max(floor["last_apartment_number"] - floor["floor_number"] * 100, 0),
+        ) for floor in floors
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_snowflake_agreement_number'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApartmentNumberCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('floor_number', models.PositiveIntegerField(help_text='Floor number of the counter.')),
+                ('last_number', models.PositiveIntegerField(default=0, help_text='Last apartment number allocated on the floor (without the floor prefix).')),
+                ('building_number', models.ForeignKey(help_text='The building the counter belongs to.', on_delete=django.db.models.deletion.CASCADE, related_name='apartment_number_counters', to='api.buildingdetails')),
+            ],
+            options={
+                'unique_together': {('building_number', 'floor_number')},
+            },
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
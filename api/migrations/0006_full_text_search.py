@@ -0,0 +1,134 @@
+# Generated by Django 5.0.1 on 2026-10-18 13:20
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+# The search vectors are maintained by triggers so that every write path
+# (save, update, bulk_create, COPY) keeps them current.
+APARTMENT_SEARCH_VECTOR_SQL = """
+CREATE OR REPLACE FUNCTION api_apartment_search_vector(description text, building_number varchar)
+RETURNS tsvector AS $$
+    SELECT setweight(to_tsvector('english', coalesce(description, '')), 'A')
+        || setweight(to_tsvector('english', coalesce((
+            SELECT concat_ws(' ', street_name, city, state, zip_code)
+            FROM api_buildingdetails WHERE api_buildingdetails.building_number = $2
+        ), '')), 'B');
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE FUNCTION api_apartmentdetails_search_vector_trigger() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector := api_apartment_search_vector(NEW.description, NEW.building_number_id);
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER api_apartmentdetails_search_vector_update
+    BEFORE INSERT OR UPDATE OF description, building_number_id ON api_apartmentdetails
+    FOR EACH ROW EXECUTE FUNCTION api_apartmentdetails_search_vector_trigger();
+
+CREATE OR REPLACE FUNCTION api_buildingdetails_search_vector_trigger() RETURNS trigger AS $$
+BEGIN
+    UPDATE api_apartmentdetails
+    SET search_vector = api_apartment_search_vector(description, building_number_id)
+    WHERE building_number_id = NEW.building_number;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER api_buildingdetails_search_vector_update
+    AFTER UPDATE OF street_name, city, state, zip_code ON api_buildingdetails
+    FOR EACH ROW EXECUTE FUNCTION api_buildingdetails_search_vector_trigger();
+
+UPDATE api_apartmentdetails SET search_vector = api_apartment_search_vector(description, building_number_id);
+"""
+
+USER_SEARCH_VECTOR_SQL = """
+CREATE OR REPLACE FUNCTION api_userdata_search_vector_trigger() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('simple', concat_ws(' ', NEW.first_name, NEW.last_name, NEW.username)), 'A')
+        || setweight(to_tsvector('simple', coalesce(NEW.email, '')), 'B')
+        || setweight(to_tsvector('simple', concat_ws(
+            ' ', NEW.phone_number, regexp_replace(coalesce(NEW.phone_number, ''), '[^0-9]', '', 'g')
+        )), 'C');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER api_userdata_search_vector_update
+    BEFORE INSERT OR UPDATE OF first_name, last_name, username, email, phone_number ON api_userdata
+    FOR EACH ROW EXECUTE FUNCTION api_userdata_search_vector_trigger();
+
+UPDATE api_userdata SET first_name = first_name;
+"""
+
+DROP_SEARCH_VECTOR_SQL = """
+DROP TRIGGER IF EXISTS api_userdata_search_vector_update ON api_userdata;
+DROP FUNCTION IF EXISTS api_userdata_search_vector_trigger();
+DROP TRIGGER IF EXISTS api_buildingdetails_search_vector_update ON api_buildingdetails;
+DROP FUNCTION IF EXISTS api_buildingdetails_search_vector_trigger();
+DROP TRIGGER IF EXISTS api_apartmentdetails_search_vector_update ON api_apartmentdetails;
+DROP FUNCTION IF EXISTS api_apartmentdetails_search_vector_trigger();
+DROP FUNCTION IF EXISTS api_apartment_search_vector(text, varchar);
+"""
+
+
+def create_search_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(APARTMENT_SEARCH_VECTOR_SQL)
+        schema_editor.execute(USER_SEARCH_VECTOR_SQL)
+
+
+def drop_search_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(DROP_SEARCH_VECTOR_SQL)
+
+
+def create_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        for model_name, index in SEARCH_INDEXES:
+            schema_editor.add_index(apps.get_model("api", model_name), index)
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        for model_name, index in SEARCH_INDEXES:
+            schema_editor.remove_index(apps.get_model("api", model_name), index)
+
+
+SEARCH_INDEXES = [
+    ('apartmentdetails', django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='apartment_search_vector_idx')),
+    ('userdata', django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='userdata_search_vector_idx')),
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_apartmentnumbercounter'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='apartmentdetails',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, help_text='Full-text search document of the description and the building address (kept up to date by triggers).', null=True),
+        ),
+        migrations.AddField(
+            model_name='userdata',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, help_text='Full-text search document of the name, username, email and phone number (kept up to date by triggers).', null=True),
+        ),
+        # GIN indexes only exist on PostgreSQL
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(model_name=model_name, index=index) for model_name, index in SEARCH_INDEXES
+            ],
+            database_operations=[
+                migrations.RunPython(create_search_indexes, drop_search_indexes),
+            ],
+        ),
+        migrations.RunPython(create_search_triggers, drop_search_triggers),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.0.1 on 2026-10-18 13:23
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        for model_name, index in TRIGRAM_INDEXES:
+            schema_editor.add_index(apps.get_model("api", model_name), index)
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        for model_name, index in TRIGRAM_INDEXES:
+            schema_editor.remove_index(apps.get_model("api", model_name), index)
+
+
+TRIGRAM_INDEXES = [
+    ('userdata', django.contrib.postgres.indexes.GinIndex(fields=['username'], name='userdata_username_trgm_idx', opclasses=['gin_trgm_ops'])),
+    ('userdata', django.contrib.postgres.indexes.GinIndex(fields=['first_name'], name='userdata_first_name_trgm_idx', opclasses=['gin_trgm_ops'])),
+    ('userdata', django.contrib.postgres.indexes.GinIndex(fields=['last_name'], name='userdata_last_name_trgm_idx', opclasses=['gin_trgm_ops'])),
+    ('userdata', django.contrib.postgres.indexes.GinIndex(fields=['email'], name='userdata_email_trgm_idx', opclasses=['gin_trgm_ops'])),
+    ('userdata', django.contrib.postgres.indexes.GinIndex(fields=['phone_number'], name='userdata_phone_number_trgm_idx', opclasses=['gin_trgm_ops'])),
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_full_text_search'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        # Only runs on PostgreSQL
+        TrigramExtension(),
+        # GIN trigram indexes only exist on PostgreSQL
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(model_name=model_name, index=index) for model_name, index in TRIGRAM_INDEXES
+            ],
+            database_operations=[
+                migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+            ],
+        ),
+    ]
@@ -0,0 +1,216 @@
+# Generated by Django 5.0.1 on 2026-10-18 13:48
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import Count, F, Q, Sum
+
+# The stats are maintained by triggers so that every write path (save, update,
+# bulk_create, COPY) keeps them current. Each trigger adds the difference made by the
+# changed row to the stats of its building (of the building of its apartment for leases).
+BUILDING_STATS_SQL = """
+CREATE OR REPLACE FUNCTION api_buildingstats_add(
+    building varchar, apartments integer, available_apartments integer, leases integer, rent numeric,
+    parking integer, available_parking integer, reserved_parking integer, occupied_parking integer
+) RETURNS void AS $$
+    UPDATE api_buildingstats SET
+        apartment_count = apartment_count + apartments,
+        available_apartment_count = available_apartment_count + available_apartments,
+        active_lease_count = active_lease_count + leases,
+        rent_roll = rent_roll + rent,
+        parking_count = parking_count + parking,
+        available_parking_count = available_parking_count + available_parking,
+        reserved_parking_count = reserved_parking_count + reserved_parking,
+        occupied_parking_count = occupied_parking_count + occupied_parking
+    WHERE building_number_id = building;
+$$ LANGUAGE sql;
+
+CREATE OR REPLACE FUNCTION api_buildingdetails_stats_trigger() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO api_buildingstats (
+        building_number_id, apartment_count, available_apartment_count, active_lease_count, rent_roll,
+        parking_count, available_parking_count, reserved_parking_count, occupied_parking_count
+    ) VALUES (NEW.building_number, 0, 0, 0, 0, 0, 0, 0, 0)
+    ON CONFLICT (building_number_id) DO NOTHING;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER api_buildingdetails_stats_update
+    AFTER INSERT ON api_buildingdetails
+    FOR EACH ROW EXECUTE FUNCTION api_buildingdetails_stats_trigger();
+
+CREATE OR REPLACE FUNCTION api_apartmentdetails_stats_trigger() RETURNS trigger AS $$
+DECLARE
+    leases integer;
+    rent numeric;
+BEGIN
+    IF TG_OP = 'UPDATE' AND (OLD.building_number_id, OLD.is_available) = (NEW.building_number_id, NEW.is_available) THEN
+        RETURN NULL;  -- save() writes every column, skip the updates changing nothing
+    END IF;
+    IF TG_OP = 'UPDATE' AND OLD.building_number_id <> NEW.building_number_id THEN
+        -- The active leases of the apartment move to the new building
+        SELECT count(*), coalesce(sum(rent_amount), 0) INTO leases, rent FROM api_leasedetails
+        WHERE apartment_number_id = NEW.apartment_number
+            AND lease_status NOT IN ('completed', 'transferred', 'terminated');
+        PERFORM api_buildingstats_add(OLD.building_number_id, 0, 0, -leases, -rent, 0, 0, 0, 0);
+        PERFORM api_buildingstats_add(NEW.building_number_id, 0, 0, leases, rent, 0, 0, 0, 0);
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM api_buildingstats_add(OLD.building_number_id, -1, -OLD.is_available::integer, 0, 0, 0, 0, 0, 0);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM api_buildingstats_add(NEW.building_number_id, 1, NEW.is_available::integer, 0, 0, 0, 0, 0, 0);
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER api_apartmentdetails_stats_update
+    AFTER INSERT OR DELETE OR UPDATE OF building_number_id, is_available ON api_apartmentdetails
+    FOR EACH ROW EXECUTE FUNCTION api_apartmentdetails_stats_trigger();
+
+CREATE OR REPLACE FUNCTION api_leasedetails_stats_trigger() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND (OLD.apartment_number_id, OLD.lease_status, OLD.rent_amount)
+            = (NEW.apartment_number_id, NEW.lease_status, NEW.rent_amount) THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.lease_status NOT IN ('completed', 'transferred', 'terminated') THEN
+        PERFORM api_buildingstats_add(
+            (SELECT building_number_id FROM api_apartmentdetails WHERE apartment_number = OLD.apartment_number_id),
+            0, 0, -1, -OLD.rent_amount, 0, 0, 0, 0
+        );
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.lease_status NOT IN ('completed', 'transferred', 'terminated') THEN
+        PERFORM api_buildingstats_add(
+            (SELECT building_number_id FROM api_apartmentdetails WHERE apartment_number = NEW.apartment_number_id),
+            0, 0, 1, NEW.rent_amount, 0, 0, 0, 0
+        );
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER api_leasedetails_stats_update
+    AFTER INSERT OR DELETE OR UPDATE OF apartment_number_id, lease_status, rent_amount ON api_leasedetails
+    FOR EACH ROW EXECUTE FUNCTION api_leasedetails_stats_trigger();
+
+CREATE OR REPLACE FUNCTION api_parkingdetails_stats_trigger() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND (OLD.building_number_id, OLD.parking_status) = (NEW.building_number_id, NEW.parking_status) THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM api_buildingstats_add(
+            OLD.building_number_id, 0, 0, 0, 0, -1, -(OLD.parking_status = 'available')::integer,
+            -(OLD.parking_status = 'reserved')::integer, -(OLD.parking_status = 'occupied')::integer
+        );
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM api_buildingstats_add(
+            NEW.building_number_id, 0, 0, 0, 0, 1, (NEW.parking_status = 'available')::integer,
+            (NEW.parking_status = 'reserved')::integer, (NEW.parking_status = 'occupied')::integer
+        );
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER api_parkingdetails_stats_update
+    AFTER INSERT OR DELETE OR UPDATE OF building_number_id, parking_status ON api_parkingdetails
+    FOR EACH ROW EXECUTE FUNCTION api_parkingdetails_stats_trigger();
+"""
+
+DROP_BUILDING_STATS_SQL = """
+DROP TRIGGER IF EXISTS api_parkingdetails_stats_update ON api_parkingdetails;
+DROP FUNCTION IF EXISTS api_parkingdetails_stats_trigger();
+DROP TRIGGER IF EXISTS api_leasedetails_stats_update ON api_leasedetails;
+DROP FUNCTION IF EXISTS api_leasedetails_stats_trigger();
+DROP TRIGGER IF EXISTS api_apartmentdetails_stats_update ON api_apartmentdetails;
+DROP FUNCTION IF EXISTS api_apartmentdetails_stats_trigger();
+DROP TRIGGER IF EXISTS api_buildingdetails_stats_update ON api_buildingdetails;
+DROP FUNCTION IF EXISTS api_buildingdetails_stats_trigger();
+DROP FUNCTION IF EXISTS api_buildingstats_add(
+    varchar, integer, integer, integer, numeric, integer, integer, integer, integer
+);
+"""
+
+
+def create_stats_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(BUILDING_STATS_SQL)
+
+
+def drop_stats_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(DROP_BUILDING_STATS_SQL)
+
+
+def backfill_stats(apps, schema_editor):
+    """
+    Summarize the existing buildings (same computation as BuildingStats.compute()).
+    """
+    BuildingDetails = apps.get_model("api", "BuildingDetails")
+    BuildingStats = apps.get_model("api", "BuildingStats")
+    stats = {
+        building_number: BuildingStats(building_number_id=building_number)
+        for building_number in BuildingDetails.objects.values_list("pk", flat=True)
+    }
+    rows = [
+        apps.get_model("api", "ApartmentDetails").objects.values("building_number").annotate(
+            apartment_count=Count("pk"),
+            available_apartment_count=Count("pk", filter=Q(is_available=True)),
+        ),
+        apps.get_model("api", "LeaseDetails").objects.exclude(
+            lease_status__in=["completed", "transferred", "terminated"]
+        ).values(building_number=F("apartment_number__building_number")).annotate(
+            active_lease_count=Count("pk"),
+            rent_roll=Sum("rent_amount"),
+        ),
+        apps.get_model("api", "ParkingDetails").objects.values("building_number").annotate(
+            parking_count=Count("pk"),
+            available_parking_count=Count("pk", filter=Q(parking_status="available")),
+            reserved_parking_count=Count("pk", filter=Q(parking_status="reserved")),
+            occupied_parking_count=Count("pk", filter=Q(parking_status="occupied")),
+        ),
+    ]
+    for row in (row for queryset in rows for row in queryset.order_by()):
+        building = stats.get(row.pop("building_number"))
+        if building is not None:
+            for name, value in row.items():
+                setattr(building, name, value)
+    BuildingStats.objects.bulk_create(stats.values())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_trigram_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BuildingStats',
+            fields=[
+                ('building_number', models.OneToOneField(help_text='The building summarized.', on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='api.buildingdetails')),
+                ('apartment_count', models.PositiveIntegerField(default=0, help_text='Number of apartments.')),
+                ('available_apartment_count', models.PositiveIntegerField(default=0, help_text='Number of apartments available for rent.')),
+                ('active_lease_count', models.PositiveIntegerField(default=0, help_text='Number of leases which are not completed, transferred or terminated.')),
+                ('rent_roll', models.DecimalField(decimal_places=2, default=Decimal('0.00'), help_text='Monthly rent of the active leases.', max_digits=14)),
+                ('parking_count', models.PositiveIntegerField(default=0, help_text='Number of parking spaces.')),
+                ('available_parking_count', models.PositiveIntegerField(default=0, help_text='Number of available parking spaces.')),
+                ('reserved_parking_count', models.PositiveIntegerField(default=0, help_text='Number of reserved parking spaces.')),
+                ('occupied_parking_count', models.PositiveIntegerField(default=0, help_text='Number of occupied parking spaces.')),
+            ],
+            options={
+                'verbose_name': 'Building Stats',
+                'verbose_name_plural': 'Building Stats',
+                'ordering': ['building_number'],
+            },
+        ),
+        # Triggers first: creating them locks out the writers of the tables until the migration
+        # commits, so the backfill sees every row and no row is counted twice
+        migrations.RunPython(create_stats_triggers, drop_stats_triggers),
+        migrations.RunPython(backfill_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.0.1 on 2026-10-18 13:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_building_stats'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='apartmentdetails',
+            index=models.Index(fields=['modified_on', 'apartment_number'], name='apartment_sync_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='buildingdetails',
+            index=models.Index(fields=['modified_on', 'building_number'], name='building_sync_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leasedetails',
+            index=models.Index(fields=['modified_on', 'agreement_number'], name='lease_sync_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='parkingdetails',
+            index=models.Index(fields=['modified_on', 'parking_number'], name='parking_sync_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tenant',
+            index=models.Index(fields=['modified_on', 'tenant_id'], name='tenant_sync_idx'),
+        ),
+    ]
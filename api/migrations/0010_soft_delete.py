@@ -0,0 +1,213 @@
+# Generated by Django 5.0.1 on 2026-10-18 14:00
+
+import importlib
+
+from django.db import migrations, models
+from django.db.models import Count, F, Q, Sum
+
+building_stats = importlib.import_module("api.migrations.0008_building_stats")
+
+# The building stats only count the active rows: the triggers of 0008 also handle the
+# changes of `audit_status` (soft deletes), and the rows which aren't active add nothing.
+ACTIVE_BUILDING_STATS_SQL = """
+CREATE OR REPLACE FUNCTION api_apartmentdetails_stats_trigger() RETURNS trigger AS $$
+DECLARE
+    leases integer;
+    rent numeric;
+BEGIN
+    IF TG_OP = 'UPDATE' AND (OLD.building_number_id, OLD.is_available, OLD.audit_status)
+            = (NEW.building_number_id, NEW.is_available, NEW.audit_status) THEN
+        RETURN NULL;  -- save() writes every column, skip the updates changing nothing
+    END IF;
+    IF TG_OP = 'UPDATE' AND OLD.building_number_id <> NEW.building_number_id THEN
+        -- The active leases of the apartment move to the new building
+        SELECT count(*), coalesce(sum(rent_amount), 0) INTO leases, rent FROM api_leasedetails
+        WHERE apartment_number_id = NEW.apartment_number AND audit_status = 'active'
+            AND lease_status NOT IN ('completed', 'transferred', 'terminated');
+        PERFORM api_buildingstats_add(OLD.building_number_id, 0, 0, -leases, -rent, 0, 0, 0, 0);
+        PERFORM api_buildingstats_add(NEW.building_number_id, 0, 0, leases, rent, 0, 0, 0, 0);
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.audit_status = 'active' THEN
+        PERFORM api_buildingstats_add(OLD.building_number_id, -1, -OLD.is_available::integer, 0, 0, 0, 0, 0, 0);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.audit_status = 'active' THEN
+        PERFORM api_buildingstats_add(NEW.building_number_id, 1, NEW.is_available::integer, 0, 0, 0, 0, 0, 0);
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER api_apartmentdetails_stats_update ON api_apartmentdetails;
+CREATE TRIGGER api_apartmentdetails_stats_update
+    AFTER INSERT OR DELETE OR UPDATE OF building_number_id, is_available, audit_status ON api_apartmentdetails
+    FOR EACH ROW EXECUTE FUNCTION api_apartmentdetails_stats_trigger();
+
+CREATE OR REPLACE FUNCTION api_leasedetails_stats_trigger() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND (OLD.apartment_number_id, OLD.lease_status, OLD.rent_amount, OLD.audit_status)
+            = (NEW.apartment_number_id, NEW.lease_status, NEW.rent_amount, NEW.audit_status) THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.audit_status = 'active'
+            AND OLD.lease_status NOT IN ('completed', 'transferred', 'terminated') THEN
+        PERFORM api_buildingstats_add(
+            (SELECT building_number_id FROM api_apartmentdetails WHERE apartment_number = OLD.apartment_number_id),
+            0, 0, -1, -OLD.rent_amount, 0, 0, 0, 0
+        );
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.audit_status = 'active'
+            AND NEW.lease_status NOT IN ('completed', 'transferred', 'terminated') THEN
+        PERFORM api_buildingstats_add(
+            (SELECT building_number_id FROM api_apartmentdetails WHERE apartment_number = NEW.apartment_number_id),
+            0, 0, 1, NEW.rent_amount, 0, 0, 0, 0
+        );
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER api_leasedetails_stats_update ON api_leasedetails;
+CREATE TRIGGER api_leasedetails_stats_update
+    AFTER INSERT OR DELETE OR UPDATE OF apartment_number_id, lease_status, rent_amount, audit_status
+    ON api_leasedetails
+    FOR EACH ROW EXECUTE FUNCTION api_leasedetails_stats_trigger();
+
+CREATE OR REPLACE FUNCTION api_parkingdetails_stats_trigger() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND (OLD.building_number_id, OLD.parking_status, OLD.audit_status)
+            = (NEW.building_number_id, NEW.parking_status, NEW.audit_status) THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.audit_status = 'active' THEN
+        PERFORM api_buildingstats_add(
+            OLD.building_number_id, 0, 0, 0, 0, -1, -(OLD.parking_status = 'available')::integer,
+            -(OLD.parking_status = 'reserved')::integer, -(OLD.parking_status = 'occupied')::integer
+        );
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.audit_status = 'active' THEN
+        PERFORM api_buildingstats_add(
+            NEW.building_number_id, 0, 0, 0, 0, 1, (NEW.parking_status = 'available')::integer,
+            (NEW.parking_status = 'reserved')::integer, (NEW.parking_status = 'occupied')::integer
+        );
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER api_parkingdetails_stats_update ON api_parkingdetails;
+CREATE TRIGGER api_parkingdetails_stats_update
+    AFTER INSERT OR DELETE OR UPDATE OF building_number_id, parking_status, audit_status ON api_parkingdetails
+    FOR EACH ROW EXECUTE FUNCTION api_parkingdetails_stats_trigger();
+"""
+
+
+def count_active_rows(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(ACTIVE_BUILDING_STATS_SQL)
+
+
+def count_all_rows(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(building_stats.DROP_BUILDING_STATS_SQL)
+        schema_editor.execute(building_stats.BUILDING_STATS_SQL)
+
+
+def recompute_stats(apps, active_only):
+    """
+    Recompute the stats of every building (same computation as BuildingStats.compute(),
+    which only counts the active rows).
+    """
+    BuildingDetails = apps.get_model("api", "BuildingDetails")
+    BuildingStats = apps.get_model("api", "BuildingStats")
+    active = Q(audit_status="active") if active_only else Q()
+    stats = {
+        building_number: BuildingStats(building_number_id=building_number)
+        for building_number in BuildingDetails.objects.values_list("pk", flat=True)
+    }
+    rows = [
+        apps.get_model("api", "ApartmentDetails").objects.filter(active).values("building_number").annotate(
+            apartment_count=Count("pk"),
+            available_apartment_count=Count("pk", filter=Q(is_available=True)),
+        ),
+        apps.get_model("api", "LeaseDetails").objects.filter(active).exclude(
+            lease_status__in=["completed", "transferred", "terminated"]
+        ).values(building_number=F("apartment_number__building_number")).annotate(
+            active_lease_count=Count("pk"),
+            rent_roll=Sum("rent_amount"),
+        ),
+        apps.get_model("api", "ParkingDetails").objects.filter(active).values("building_number").annotate(
+            parking_count=Count("pk"),
+            available_parking_count=Count("pk", filter=Q(parking_status="available")),
+            reserved_parking_count=Count("pk", filter=Q(parking_status="reserved")),
+            occupied_parking_count=Count("pk", filter=Q(parking_status="occupied")),
+        ),
+    ]
+    for row in (row for queryset in rows for row in queryset.order_by()):
+        building = stats.get(row.pop("building_number"))
+        if building is not None:
+            for name, value in row.items():
+                setattr(building, name, value)
+    BuildingStats.objects.bulk_create(
+        stats.values(), update_conflicts=True, unique_fields=["building_number"], update_fields=[
+            "apartment_count", "available_apartment_count", "active_lease_count", "rent_roll",
+            "parking_count", "available_parking_count", "reserved_parking_count", "occupied_parking_count",
+        ],
+    )
+
+
+def recompute_active_stats(apps, schema_editor):
+    recompute_stats(apps, active_only=True)
+
+
+def recompute_all_stats(apps, schema_editor):
+    recompute_stats(apps, active_only=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_sync_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='apartmentdetails',
+            index=models.Index(condition=models.Q(('audit_status', 'active')), fields=['apartment_number'], name='apartment_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='apartmentdetails',
+            index=models.Index(condition=models.Q(('audit_status', 'active')), fields=['building_number', 'is_available'], name='apartment_active_building_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='buildingdetails',
+            index=models.Index(condition=models.Q(('audit_status', 'active')), fields=['building_number'], name='building_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leasedetails',
+            index=models.Index(condition=models.Q(('audit_status', 'active')), fields=['-start_date'], name='lease_active_start_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leasedetails',
+            index=models.Index(condition=models.Q(('audit_status', 'active')), fields=['apartment_number', 'lease_status'], name='lease_active_apartment_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='parkingdetails',
+            index=models.Index(condition=models.Q(('audit_status', 'active')), fields=['parking_number'], name='parking_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='parkingdetails',
+            index=models.Index(condition=models.Q(('audit_status', 'active')), fields=['building_number', 'parking_status'], name='parking_active_building_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tenant',
+            index=models.Index(condition=models.Q(('audit_status', 'active')), fields=['lease'], name='tenant_active_lease_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tenant',
+            index=models.Index(condition=models.Q(('audit_status', 'active')), fields=['user'], name='tenant_active_user_idx'),
+        ),
+        # Triggers first, like in 0008: replacing them locks out the writers of the tables
+        # until the migration commits, so the recomputation sees every row
+        migrations.RunPython(count_active_rows, count_all_rows),
+        migrations.RunPython(recompute_active_stats, recompute_all_stats),
+    ]
@@ -0,0 +1,85 @@
+# Generated by Django 5.0.1 on 2026-10-18 14:06
+
+import django.core.serializers.json
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_soft_delete'),
+        ('contenttypes', '0002_remove_content_type_name'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='apartmentdetails',
+            name='created_by',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='created_%(app_label)s_%(class)s_set', to='api.userdata'),
+        ),
+        migrations.AlterField(
+            model_name='apartmentdetails',
+            name='modified_by',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='modified_%(app_label)s_%(class)s_set', to='api.userdata'),
+        ),
+        migrations.AlterField(
+            model_name='buildingdetails',
+            name='created_by',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='created_%(app_label)s_%(class)s_set', to='api.userdata'),
+        ),
+        migrations.AlterField(
+            model_name='buildingdetails',
+            name='modified_by',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='modified_%(app_label)s_%(class)s_set', to='api.userdata'),
+        ),
+        migrations.AlterField(
+            model_name='leasedetails',
+            name='created_by',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='created_%(app_label)s_%(class)s_set', to='api.userdata'),
+        ),
+        migrations.AlterField(
+            model_name='leasedetails',
+            name='modified_by',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='modified_%(app_label)s_%(class)s_set', to='api.userdata'),
+        ),
+        migrations.AlterField(
+            model_name='parkingdetails',
+            name='created_by',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='created_%(app_label)s_%(class)s_set', to='api.userdata'),
+        ),
+        migrations.AlterField(
+            model_name='parkingdetails',
+            name='modified_by',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='modified_%(app_label)s_%(class)s_set', to='api.userdata'),
+        ),
+        migrations.AlterField(
+            model_name='tenant',
+            name='created_by',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='created_%(app_label)s_%(class)s_set', to='api.userdata'),
+        ),
+        migrations.AlterField(
+            model_name='tenant',
+            name='modified_by',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='modified_%(app_label)s_%(class)s_set', to='api.userdata'),
+        ),
+        migrations.CreateModel(
+            name='ChangeLog',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('object_id', models.CharField(help_text='Primary key of the changed row.', max_length=64)),
+                ('action', models.CharField(choices=[('create', 'Create'), ('update', 'Update'), ('delete', 'Delete')], help_text='What was done to the row.', max_length=6)),
+                ('changes', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder, help_text='Changed fields, as `{field: [old value, new value]}`.')),
+                ('changed_on', models.DateTimeField(default=django.utils.timezone.now, help_text='When the change was made.')),
+                ('changed_by', models.ForeignKey(db_constraint=False, help_text='User who made the change (the id is kept when the user is deleted).', null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='api.userdata')),
+                ('content_type', models.ForeignKey(help_text='Model of the changed row.', on_delete=django.db.models.deletion.CASCADE, related_name='+', to='contenttypes.contenttype')),
+            ],
+            options={
+                'verbose_name': 'Change Log',
+                'verbose_name_plural': 'Change Log',
+                'ordering': ['changed_on', 'id'],
+                'indexes': [models.Index(fields=['content_type', 'object_id', 'changed_on'], name='changelog_object_idx')],
+            },
+        ),
+    ]
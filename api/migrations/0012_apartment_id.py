@@ -0,0 +1,100 @@
+# Generated by Django 5.0.1 on 2026-10-18 14:22
+
+import importlib
+
+from django.db import migrations, models
+from django.db.models import F
+
+soft_delete = importlib.import_module("api.migrations.0010_soft_delete")
+
+# The apartment numbers are allocated per building and floor (every building has a 101),
+# so they can't be the primary key of the table. The primary key column is renamed to
+# `id`, which keeps the values referenced by the leases and parking spaces, and the
+# numbers are copied to a new `apartment_number` column unique within the building.
+
+# The stats triggers of 0010_soft_delete, looking the apartments up by the primary key
+STATS_TRIGGERS_SQL = soft_delete.ACTIVE_BUILDING_STATS_SQL.replace(
+    "= NEW.apartment_number AND", "= NEW.id AND"
+).replace(
+    "api_apartmentdetails WHERE apartment_number =", "api_apartmentdetails WHERE id ="
+)
+
+
+def replace_stats_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(STATS_TRIGGERS_SQL)
+
+
+def restore_stats_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(soft_delete.ACTIVE_BUILDING_STATS_SQL)
+
+
+def reset_apartment_id_sequence(apps, schema_editor):
+    # The ids were written explicitly, the sequence of the new identity column starts at 1
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(
+            "SELECT setval(pg_get_serial_sequence('api_apartmentdetails', 'id'), "
+            "coalesce(max(id), 1), max(id) IS NOT NULL) FROM api_apartmentdetails"
+        )
+
+
+def copy_apartment_numbers(apps, schema_editor):
+    apps.get_model("api", "ApartmentDetails")._base_manager.update(apartment_number=F("id"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_change_log'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='apartmentdetails',
+            options={'ordering': ['building_number', 'apartment_number']},
+        ),
+        migrations.RemoveIndex(
+            model_name='apartmentdetails',
+            name='apartment_sync_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='apartmentdetails',
+            name='apartment_active_idx',
+        ),
+        migrations.RenameField(
+            model_name='apartmentdetails',
+            old_name='apartment_number',
+            new_name='id',
+        ),
+        migrations.AlterField(
+            model_name='apartmentdetails',
+            name='id',
+            field=models.AutoField(help_text='Auto-incremented unique identifier for the apartment.', primary_key=True, serialize=False),
+        ),
+        migrations.RunPython(reset_apartment_id_sequence, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='apartmentdetails',
+            name='apartment_number',
+            field=models.PositiveIntegerField(editable=False, null=True),
+        ),
+        migrations.RunPython(copy_apartment_numbers, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='apartmentdetails',
+            name='apartment_number',
+            field=models.PositiveIntegerField(editable=False, help_text='Number of the apartment in its building: the floor number followed by its rank on the floor (e.g. 101).'),
+        ),
+        migrations.AddIndex(
+            model_name='apartmentdetails',
+            index=models.Index(fields=['modified_on', 'id'], name='apartment_sync_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='apartmentdetails',
+            index=models.Index(condition=models.Q(('audit_status', 'active')), fields=['building_number', 'apartment_number'], name='apartment_active_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='apartmentdetails',
+            constraint=models.UniqueConstraint(fields=('building_number', 'apartment_number'), name='apartment_number_per_building'),
+        ),
+        migrations.RunPython(replace_stats_triggers, restore_stats_triggers),
+    ]
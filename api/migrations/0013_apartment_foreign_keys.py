@@ -0,0 +1,56 @@
+# Generated by Django 5.0.1 on 2026-10-18 15:10
+
+import importlib
+
+from django.db import migrations, models
+
+apartment_id = importlib.import_module("api.migrations.0012_apartment_id")
+
+# The leases and parking spaces reference the apartments by id since 0012, not by their
+# number, so their `apartment_number` foreign keys are renamed to `apartment`.
+
+# The stats triggers of 0012_apartment_id, with the renamed column of the leases
+STATS_TRIGGERS_SQL = apartment_id.STATS_TRIGGERS_SQL.replace("apartment_number_id", "apartment_id")
+
+
+def replace_stats_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(STATS_TRIGGERS_SQL)
+
+
+def restore_stats_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(apartment_id.STATS_TRIGGERS_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_apartment_id'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='leasedetails',
+            name='lease_active_apartment_idx',
+        ),
+        migrations.RenameField(
+            model_name='leasedetails',
+            old_name='apartment_number',
+            new_name='apartment',
+        ),
+        migrations.RenameField(
+            model_name='parkingdetails',
+            old_name='apartment_number',
+            new_name='apartment',
+        ),
+        migrations.AlterModelOptions(
+            name='parkingdetails',
+            options={'ordering': ['parking_number', 'building_number', 'apartment'], 'verbose_name': 'Parking', 'verbose_name_plural': 'Parking Spaces'},
+        ),
+        migrations.AddIndex(
+            model_name='leasedetails',
+            index=models.Index(condition=models.Q(('audit_status', 'active')), fields=['apartment', 'lease_status'], name='lease_active_apartment_idx'),
+        ),
+        migrations.RunPython(replace_stats_triggers, restore_stats_triggers),
+    ]
@@ -2,8 +2,11 @@
 
 from .audit import Audit
 from .userdata import UserData
+from .change_log import ChangeLog, ChangeLogged
 from .building_details import BuildingDetails
+from .apartment_number_counter import ApartmentNumberCounter
 from .apartment_details import ApartmentDetails
 from .parking_details import ParkingDetails
 from .lease_details import LeaseDetails
 from .tenant import Tenant
+from .building_stats import BuildingStats
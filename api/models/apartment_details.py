@@ -1,17 +1,24 @@
-from django.db import models
+from django.db import models, transaction
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MinValueValidator
 
-from api.models.audit import Audit
+from api.models.audit import ACTIVE_CONDITION, Audit
+from api.models.change_log import ChangeLogged
 from api.models.building_details import BuildingDetails
+from api.models.apartment_number_counter import ApartmentNumberCounter
 
 
-class ApartmentDetails(Audit):
+class ApartmentDetails(ChangeLogged, Audit):
     """
     Apartment and its amenities in a Building.
     """
-    apartment_number = models.AutoField(
-        primary_key=True, unique=True,
-        help_text="Auto-incremented unique identifier for the apartment."
+    id = models.AutoField(
+        primary_key=True, help_text="Auto-incremented unique identifier for the apartment."
+    )
+    apartment_number = models.PositiveIntegerField(
+        editable=False,
+        help_text="Number of the apartment in its building: the floor number followed by its rank on the floor (e.g. 101)."
     )
     building_number = models.ForeignKey(
         BuildingDetails,
@@ -85,19 +92,40 @@ class ApartmentDetails(Audit):
     smoking = models.BooleanField(
         default=False, help_text="Indicates whether smoking is allowed in the apartment."
     )
+    search_vector = SearchVectorField(
+        null=True, editable=False,
+        help_text="Full-text search document of the description and the building address (kept up to date by triggers)."
+    )
 
     class Meta:
-        ordering = ["apartment_number"]
+        ordering = ["building_number", "apartment_number"]
+        constraints = [
+            # The apartment numbers are allocated per building and floor (see ApartmentNumberCounter)
+            models.UniqueConstraint(fields=["building_number", "apartment_number"], name="apartment_number_per_building"),
+        ]
+        indexes = [
+            GinIndex(fields=["search_vector"], name="apartment_search_vector_idx"),
+            # Change feed order (see SyncMixin)
+            models.Index(fields=["modified_on", "id"], name="apartment_sync_idx"),
+            # Default ordering and hot filters of the lists, on the live rows only (see Audit.objects)
+            models.Index(
+                fields=["building_number", "apartment_number"], name="apartment_active_idx", condition=ACTIVE_CONDITION,
+            ),
+            models.Index(
+                fields=["building_number", "is_available"], name="apartment_active_building_idx",
+                condition=ACTIVE_CONDITION,
+            ),
+        ]
 
     def save(self, *args, **kwargs):
         if not self.apartment_number:  # If apartment number is not set
-            # Get the count of existing apartments on the same floor
-            existing_apartments_count = ApartmentDetails.objects.filter(
-                building_number=self.building_number,
-                floor_number=self.floor_number
-            ).count()
-
-            # Generate the apartment number based on floor number and existing count
-            self.apartment_number = self.floor_number * 100 + existing_apartments_count + 1
+            # Allocate the next apartment number of the floor from the counter,
+            # in the same transaction as the insert so a failed insert doesn't leave a gap
+            with transaction.atomic():
+                key = (self.building_number_id, self.floor_number)
+                self.apartment_number = ApartmentNumberCounter.allocate({key: 1})[key]
+                kwargs.setdefault("force_insert", True)  # Skip the UPDATE attempt for the new row
+                super().save(*args, **kwargs)
+            return
 
         super().save(*args, **kwargs)
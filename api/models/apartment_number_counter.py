@@ -0,0 +1,71 @@
+from django.db import models, connection
+
+from api.models.building_details import BuildingDetails
+
+
+class ApartmentNumberCounter(models.Model):
+    """
+    Last apartment number handed out for each floor of a Building.
+
+    Apartment numbers are `floor_number * 100 + n`, `n` being taken from this counter.
+    The counter row is incremented with a single `INSERT ... ON CONFLICT DO UPDATE ...
+    RETURNING` statement, which is atomic and keeps the row locked until the surrounding
+    transaction ends, so concurrent creates on the same floor never get the same number.
+    """
+    building_number = models.ForeignKey(
+        BuildingDetails,
+        on_delete=models.CASCADE,
+        to_field="building_number",
+        related_name="apartment_number_counters",
+        help_text="The building the counter belongs to."
+    )
+    floor_number = models.PositiveIntegerField(help_text="Floor number of the counter.")
+    last_number = models.PositiveIntegerField(
+        default=0, help_text="Last apartment number allocated on the floor (without the floor prefix)."
+    )
+
+    class Meta:
+        unique_together = ("building_number", "floor_number")
+
+    @classmethod
+    def allocate(cls, blocks):
+        """
+        Reserve a block of apartment numbers per (building_number, floor_number) in one round trip.
+
+        `blocks` maps `(building_number, floor_number)` to the number of apartments to create,
+        the result maps the same keys to the first apartment number of each reserved block.
+        """
+        blocks = {
+            (getattr(building_number, "pk", building_number), floor_number): count
+            for (building_number, floor_number), count in blocks.items() if count > 0
+        }
+        if not blocks:
+            return {}
+
+        table = connection.ops.quote_name(cls._meta.db_table)
+        building_column = connection.ops.quote_name(cls._meta.get_field("building_number").column)
+        floor_column = connection.ops.quote_name("floor_number")
+        last_column = connection.ops.quote_name("last_number")
+
+        # Sorted keys so that concurrent allocations lock the counter rows in the same order
+        keys = sorted(blocks)
+        params = []
+        for building_number, floor_number in keys:
+            params.extend([building_number, floor_number, blocks[(building_number, floor_number)]])
+        values = ", ".join(["(%s, %s, %s)"] * len(keys))
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {table} ({building_column}, {floor_column}, {last_column}) "
+                f"VALUES {values} "
+                f"ON CONFLICT ({building_column}, {floor_column}) "
+                f"DO UPDATE SET {last_column} = {table}.{last_column} + EXCLUDED.{last_column} "
+                f"RETURNING {building_column}, {floor_column}, {last_column}",
+                params
+            )
+            rows = cursor.fetchall()
+
+        return {
+            (building_number, floor_number): floor_number * 100 + last_number - blocks[(building_number, floor_number)] + 1
+            for building_number, floor_number, last_number in rows
+        }
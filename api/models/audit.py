@@ -1,31 +1,173 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Q
 from django.utils import timezone
 
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.contenttypes.fields import GenericForeignKey
 
+from api.models.change_log import ChangeLog, ChangeLogged
 from api.models.userdata import UserData
 from api.constants import constants as constants
+from bma_backend.response_cache import invalidate_cached_responses
+
+# Condition of the partial indexes on the live rows, the ones the default managers return
+ACTIVE_CONDITION = Q(audit_status="active")
+
+
+class AuditQuerySet(models.QuerySet):
+    """
+    Fills the audit fields of the rows written by bulk_create() and update() (which skip
+    save()), and records their changes in the ChangeLog for the ChangeLogged models.
+    """
+
+    def active(self):
+        return self.filter(ACTIVE_CONDITION)
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        user = UserData.current()
+        if user is not None:
+            for obj in objs:
+                obj.created_by_id = obj.created_by_id or user.pk
+                obj.modified_by_id = obj.modified_by_id or user.pk
+        objs = super().bulk_create(objs, *args, **kwargs)
+        if issubclass(self.model, ChangeLogged):
+            ChangeLog.record([
+                (self.model, obj.pk, ChangeLog.CREATE, obj.get_change_log_changes(ChangeLog.CREATE)) for obj in objs
+            ], self.db)
+            for obj in objs:
+                obj.remember_change_log_state()
+        return objs
+
+    def update(self, **kwargs):
+        """
+        For the ChangeLogged models, the changed fields of the matched rows are read and
+        locked before the UPDATE to log their old values: a `SELECT ... FOR UPDATE` loading
+        every matched row. Use unlogged_update() for the updates which don't need a history.
+        """
+        kwargs = self.with_audit_values(kwargs)
+        fields = [
+            field for field in getattr(self.model, "get_change_log_fields", list)() if field.name in kwargs
+        ]
+        if not fields:
+            return super().update(**kwargs)
+
+        # The old values of the rows locked until the update commits, then the new ones:
+        # the given values, or the values read back when they are expressions (F(), Case...).
+        # The rows are locked in primary key order, as concurrent updates do, not to deadlock.
+        attnames = [field.attname for field in fields]
+        with transaction.atomic(using=self.db):
+            old = {row.pop("pk"): row for row in self.select_for_update().order_by("pk").values("pk", *attnames)}
+            updated = super().update(**kwargs)
+            if any(hasattr(kwargs[field.name], "resolve_expression") for field in fields):
+                new = {
+                    row.pop("pk"): row
+                    for row in self.model._base_manager.using(self.db).filter(pk__in=old).values("pk", *attnames)
+                }
+            else:
+                values = {field.attname: getattr(kwargs[field.name], "pk", kwargs[field.name]) for field in fields}
+                new = dict.fromkeys(old, values)
+            entries = []
+            for pk, old_values in old.items():
+                changes = {
+                    field.name: [old_values[field.attname], new[pk][field.attname]] for field in fields
+                    if old_values[field.attname] != new[pk][field.attname]
+                }
+                if changes:
+                    entries.append((self.model, pk, ChangeLog.UPDATE, changes))
+            ChangeLog.record(entries, self.db)
+        return updated
+
+    def unlogged_update(self, **kwargs):
+        """
+        update() filling the audit fields only: one UPDATE, without reading or locking the
+        rows beforehand, whose changes aren't recorded in the ChangeLog.
+        """
+        return super().update(**self.with_audit_values(kwargs))
+
+    @staticmethod
+    def with_audit_values(values):
+        values.setdefault("modified_on", timezone.now())
+        user = UserData.current()
+        if user is not None:
+            values.setdefault("modified_by", user)
+        return values
+
+    def soft_delete(self, user=None):
+        """
+        Mark the rows as deleted, in one UPDATE. Returns the number of rows marked.
+
+        The status flip isn't diffed (see unlogged_update()): `modified_on` and `modified_by`
+        of the tombstones tell when and by whom the rows were deleted.
+        """
+        changes = {"audit_status": "deleted"}
+        if user is not None:
+            changes["modified_by"] = user
+        marked = self.unlogged_update(**changes)
+        invalidate_cached_responses(self.model)  # update() doesn't send post_save
+        return marked
+
+
+class ActiveManager(models.Manager.from_queryset(AuditQuerySet)):
+    """
+    Manager of the rows which aren't inactive nor deleted.
+    """
+
+    def get_queryset(self):
+        return super().get_queryset().active()
+
+
+AuditManager = models.Manager.from_queryset(AuditQuerySet)
 
 
 class Audit(models.Model):
     # Audit Details
     """
     An abstract base class model that provides self updating ``created``
-    and ``modified`` fields.
+    and ``modified`` fields, ``created_by`` and ``modified_by`` being the
+    user of the request (see bma_backend.middleware.ChangeLogMiddleware).
+
+    The default manager (``objects``), used by the viewsets and the related managers,
+    only returns the active rows; ``all_objects`` returns every row, deleted ones included.
     """
     audit_status = models.CharField(
         choices=constants.AUDIT_STATUS, max_length=30, default='active')
     created_on = models.DateTimeField(auto_now_add=True)
     created_by = models.ForeignKey(
-        UserData, models.DO_NOTHING,
+        UserData, models.SET_NULL,
         related_name="created_%(app_label)s_%(class)s_set",
         null=True, editable=False)
     modified_on = models.DateTimeField(auto_now=True)
     modified_by = models.ForeignKey(
-        UserData, models.DO_NOTHING,
+        UserData, models.SET_NULL,
         related_name="modified_%(app_label)s_%(class)s_set",
         null=True, editable=False)
 
+    objects = ActiveManager()
+    all_objects = AuditManager()
+
     class Meta:
         abstract = True
+
+    def save(self, *args, **kwargs):
+        user = UserData.current()
+        if user is not None:
+            if self._state.adding and self.created_by_id is None:
+                self.created_by_id = user.pk
+            self.modified_by_id = user.pk
+            update_fields = kwargs.get("update_fields")
+            if update_fields is not None and "modified_by" not in update_fields:
+                kwargs["update_fields"] = [*update_fields, "modified_by"]
+        super().save(*args, **kwargs)
+
+    def soft_delete(self, user=None):
+        """
+        Mark the row as deleted, it stays in the table (and in the change feed) as a tombstone.
+        Within a request, `modified_by` is the user of the request.
+        """
+        self.audit_status = "deleted"
+        update_fields = ["audit_status", "modified_on"]
+        if user is not None:
+            self.modified_by = user
+            update_fields.append("modified_by")
+        self.save(update_fields=update_fields)
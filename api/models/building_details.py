@@ -3,6 +3,7 @@ from django.core.validators import MinLengthValidator, RegexValidator
 from django_countries.fields import CountryField
 from localflavor.us.models import USStateField, USZipCodeField
 
+from api.models.audit import ACTIVE_CONDITION
 from api.models import Audit
 
 
@@ -46,3 +47,11 @@ class BuildingDetails(Audit):
         blank=True,
         help_text="Enter the Date of Construction"
     )
+
+    class Meta:
+        indexes = [
+            # Change feed order (see SyncMixin)
+            models.Index(fields=["modified_on", "building_number"], name="building_sync_idx"),
+            # Default ordering and hot filters of the lists, on the live rows only (see Audit.objects)
+            models.Index(fields=["building_number"], name="building_active_idx", condition=ACTIVE_CONDITION),
+        ]
@@ -0,0 +1,168 @@
+from decimal import Decimal
+
+from django.db import DEFAULT_DB_ALIAS, connections, models, transaction
+from django.db.models import Count, F, Q, Sum
+
+from api.constants.constants import ENDED_LEASE_STATUSES
+from api.models.apartment_details import ApartmentDetails
+from api.models.building_details import BuildingDetails
+from api.models.lease_details import LeaseDetails
+from api.models.parking_details import ParkingDetails
+
+
+class BuildingStats(models.Model):
+    """
+    Occupancy, rent roll and parking utilization summary of a Building.
+
+    Only the active rows (`audit_status`) are counted. On PostgreSQL the row of each building
+    is kept up to date by triggers on the apartments (`is_available`), leases and parking
+    spaces (`parking_status`), which add the difference made by every inserted, updated
+    (soft deletes included) or deleted row, so every write path (save, update, bulk_create,
+    COPY) is covered. On the other databases the signal
+    receivers recompute the rows of the changed buildings, which misses `update()` and
+    `bulk_create()`. `rebuild()` recomputes rows from the source tables and `check_consistency()`
+    reports the rows that drifted from them.
+    """
+    building_number = models.OneToOneField(
+        BuildingDetails,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        to_field="building_number",
+        related_name="stats",
+        help_text="The building summarized."
+    )
+    apartment_count = models.PositiveIntegerField(default=0, help_text="Number of apartments.")
+    available_apartment_count = models.PositiveIntegerField(
+        default=0, help_text="Number of apartments available for rent."
+    )
+    active_lease_count = models.PositiveIntegerField(
+        default=0, help_text="Number of leases which are not completed, transferred or terminated."
+    )
+    rent_roll = models.DecimalField(
+        max_digits=14, decimal_places=2, default=Decimal("0.00"),
+        help_text="Monthly rent of the active leases."
+    )
+    parking_count = models.PositiveIntegerField(default=0, help_text="Number of parking spaces.")
+    available_parking_count = models.PositiveIntegerField(default=0, help_text="Number of available parking spaces.")
+    reserved_parking_count = models.PositiveIntegerField(default=0, help_text="Number of reserved parking spaces.")
+    occupied_parking_count = models.PositiveIntegerField(default=0, help_text="Number of occupied parking spaces.")
+
+    STAT_FIELDS = [
+        "apartment_count", "available_apartment_count", "active_lease_count", "rent_roll",
+        "parking_count", "available_parking_count", "reserved_parking_count", "occupied_parking_count",
+    ]
+
+    class Meta:
+        verbose_name = "Building Stats"
+        verbose_name_plural = "Building Stats"
+        ordering = ["building_number"]
+
+    @property
+    def occupied_apartment_count(self):
+        return self.apartment_count - self.available_apartment_count
+
+    @property
+    def occupancy_rate(self):
+        return round(self.occupied_apartment_count / self.apartment_count, 4) if self.apartment_count else 0.0
+
+    @property
+    def vacancy_rate(self):
+        return round(self.available_apartment_count / self.apartment_count, 4) if self.apartment_count else 0.0
+
+    @property
+    def parking_utilization(self):
+        used = self.reserved_parking_count + self.occupied_parking_count
+        return round(used / self.parking_count, 4) if self.parking_count else 0.0
+
+    @classmethod
+    def compute(cls, building_numbers=None, using=DEFAULT_DB_ALIAS):
+        """
+        Stats of the buildings (all of them by default, deleted ones included) computed from the
+        active apartments, leases and parking spaces, with one grouped query per table. Returns
+        unsaved rows by building number.
+        """
+        buildings = BuildingDetails.all_objects.using(using)
+        apartments = ApartmentDetails.objects.using(using)
+        leases = LeaseDetails.objects.using(using).exclude(lease_status__in=ENDED_LEASE_STATUSES)
+        parking = ParkingDetails.objects.using(using)
+        if building_numbers is not None:
+            buildings = buildings.filter(pk__in=building_numbers)
+            apartments = apartments.filter(building_number__in=building_numbers)
+            leases = leases.filter(apartment__building_number__in=building_numbers)
+            parking = parking.filter(building_number__in=building_numbers)
+
+        stats = {
+            building_number: cls(building_number_id=building_number)
+            for building_number in buildings.values_list("pk", flat=True)
+        }
+        rows = [
+            apartments.values("building_number").annotate(
+                apartment_count=Count("pk"),
+                available_apartment_count=Count("pk", filter=Q(is_available=True)),
+            ),
+            leases.values(building_number=F("apartment__building_number")).annotate(
+                active_lease_count=Count("pk"),
+                rent_roll=Sum("rent_amount"),
+            ),
+            parking.values("building_number").annotate(
+                parking_count=Count("pk"),
+                available_parking_count=Count("pk", filter=Q(parking_status="available")),
+                reserved_parking_count=Count("pk", filter=Q(parking_status="reserved")),
+                occupied_parking_count=Count("pk", filter=Q(parking_status="occupied")),
+            ),
+        ]
+        for row in (row for queryset in rows for row in queryset.order_by()):
+            building = stats.get(row.pop("building_number"))
+            if building is not None:
+                for name, value in row.items():
+                    setattr(building, name, value)
+        return stats
+
+    @classmethod
+    def lock(cls, mode, using=DEFAULT_DB_ALIAS):
+        """
+        On PostgreSQL, lock the table until the end of the transaction so that no trigger
+        changes it between a computation of the stats and their use.
+        """
+        connection = connections[using]
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute(f"LOCK TABLE {connection.ops.quote_name(cls._meta.db_table)} IN {mode} MODE")
+
+    @classmethod
+    def rebuild(cls, building_numbers=None, using=DEFAULT_DB_ALIAS):
+        """
+        Recompute and save the stats of the buildings (all of them by default).
+        """
+        with transaction.atomic(using=using):
+            cls.lock("EXCLUSIVE", using)
+            stats = cls.compute(building_numbers, using)
+            cls.objects.using(using).bulk_create(
+                stats.values(), update_conflicts=True, unique_fields=["building_number"], update_fields=cls.STAT_FIELDS
+            )
+        return stats
+
+    @classmethod
+    def check_consistency(cls, using=DEFAULT_DB_ALIAS):
+        """
+        Differences between the saved stats and the stats computed from the source tables,
+        as `{building_number: {field: (saved, expected)}}`. Missing rows show as None.
+        """
+        with transaction.atomic(using=using):
+            cls.lock("SHARE", using)
+            expected = cls.compute(using=using)
+            saved = cls.objects.using(using).in_bulk()
+
+        differences = {}
+        for building_number in expected.keys() | saved.keys():
+            row, expected_row = saved.get(building_number), expected.get(building_number)
+            fields = {
+                name: (
+                    None if row is None else getattr(row, name),
+                    None if expected_row is None else getattr(expected_row, name),
+                ) for name in cls.STAT_FIELDS
+            }
+            fields = {name: values for name, values in fields.items() if values[0] != values[1]}
+            if fields:
+                differences[building_number] = fields
+        return differences
@@ -0,0 +1,226 @@
+import copy
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import partial
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DEFAULT_DB_ALIAS, connections, models, transaction
+from django.utils import timezone
+
+from api.models.userdata import UserData
+
+# Databases with a ChangeLog.buffered() block in progress
+buffered_databases = ContextVar("change_log_buffered_databases", default=())
+
+
+class ChangeLog(models.Model):
+    """
+    Append-only history of the field-level changes of the ChangeLogged models.
+
+    Entries are queued with on_commit(), so the changes of a rolled back transaction (or
+    savepoint) are never logged. A buffered() block (the viewsets run their writes in one)
+    writes the entries of its transaction with one multi-row INSERT right before it
+    commits, so they are committed with the rows they describe. Outside of them, they are
+    written once the operation is committed. Saving a row costs no query of its own: the
+    changes are diffed against the values the row was loaded with.
+    """
+    CREATE = "create"
+    UPDATE = "update"
+    DELETE = "delete"
+    ACTIONS = [(CREATE, "Create"), (UPDATE, "Update"), (DELETE, "Delete")]
+
+    id = models.BigAutoField(primary_key=True)
+    content_type = models.ForeignKey(
+        ContentType, on_delete=models.CASCADE, related_name="+", help_text="Model of the changed row."
+    )
+    object_id = models.CharField(max_length=64, help_text="Primary key of the changed row.")
+    action = models.CharField(max_length=6, choices=ACTIONS, help_text="What was done to the row.")
+    changes = models.JSONField(
+        encoder=DjangoJSONEncoder, default=dict,
+        help_text="Changed fields, as `{field: [old value, new value]}`."
+    )
+    changed_by = models.ForeignKey(
+        UserData, on_delete=models.DO_NOTHING, db_constraint=False, null=True, related_name="+",
+        help_text="User who made the change (the id is kept when the user is deleted)."
+    )
+    changed_on = models.DateTimeField(default=timezone.now, help_text="When the change was made.")
+
+    class Meta:
+        verbose_name = "Change Log"
+        verbose_name_plural = "Change Log"
+        ordering = ["changed_on", "id"]
+        indexes = [
+            # History of a row
+            models.Index(fields=["content_type", "object_id", "changed_on"], name="changelog_object_idx"),
+        ]
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError("Change log entries can't be changed.")
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise ValueError("Change log entries can't be deleted.")
+
+    @classmethod
+    def record(cls, entries, using=DEFAULT_DB_ALIAS, user=None):
+        """
+        Log the `(model, pk, action, changes)` entries by the user (of the request by default)
+        when the current transaction commits (right away in autocommit mode).
+        """
+        if not entries or not settings.CHANGE_LOG_ENABLED:
+            return
+        user = user or UserData.current()
+        changed_on = timezone.now()
+        entries = [(*entry, user.pk if user else None, changed_on) for entry in entries]
+        transaction.on_commit(partial(cls.committed, entries, using), using=using)
+
+    @classmethod
+    def committed(cls, entries, using):
+        if entries:  # Emptied when a buffered() block wrote them before the commit
+            cls.write(entries, using)
+
+    @classmethod
+    def write(cls, entries, using=DEFAULT_DB_ALIAS):
+        """
+        Insert the entries with multi-row INSERTs built from their values: preparing an
+        instance per entry (as bulk_create() does) costs more than inserting it.
+        """
+        connection = connections[using]
+        fields = [
+            cls._meta.get_field(name)
+            for name in ["content_type", "object_id", "action", "changes", "changed_by", "changed_on"]
+        ]
+        changes_field, changed_on_field = fields[3], fields[5]
+        content_types = ContentType.objects.get_for_models(*{entry[0] for entry in entries})
+        rows = [
+            (
+                content_types[model].pk, str(pk), action, changes_field.get_db_prep_save(changes, connection),
+                user_id, changed_on_field.get_db_prep_save(changed_on, connection),
+            ) for model, pk, action, changes, user_id, changed_on in entries
+        ]
+
+        quote = connection.ops.quote_name
+        sql = "INSERT INTO %s (%s) VALUES " % (
+            quote(cls._meta.db_table), ", ".join(quote(field.column) for field in fields)
+        )
+        placeholder = "(%s)" % ", ".join(["%s"] * len(fields))
+        batch_size = connection.ops.bulk_batch_size(fields, rows)
+        with transaction.atomic(using=using, savepoint=False), connection.cursor() as cursor:
+            for start in range(0, len(rows), batch_size):
+                batch = rows[start:start + batch_size]
+                cursor.execute(sql + ", ".join([placeholder] * len(batch)), [value for row in batch for value in row])
+
+    @classmethod
+    @contextmanager
+    def buffered(cls, using=DEFAULT_DB_ALIAS):
+        """
+        Atomic block writing the entries queued in it with one INSERT when it exits, in its
+        transaction. Nested blocks leave the writing to the outermost one.
+        """
+        if using in buffered_databases.get():
+            with transaction.atomic(using=using, savepoint=False):
+                yield
+            return
+        token = buffered_databases.set((*buffered_databases.get(), using))
+        try:
+            with transaction.atomic(using=using, savepoint=False):
+                start = len(cls.pending_callbacks(using))
+                yield
+                cls.flush(using, start)
+        finally:
+            buffered_databases.reset(token)
+
+    @classmethod
+    def flush(cls, using=DEFAULT_DB_ALIAS, start=0):
+        """
+        Write the entries queued in the current transaction (from its `start`th on_commit()
+        callback) now, in the transaction.
+
+        They are read from the on_commit() callbacks, which Django drops along with their
+        rolled back savepoints, as TestCase.captureOnCommitCallbacks() does.
+        """
+        queued = [
+            func.args[0] for func in cls.pending_callbacks(using)[start:]
+            if isinstance(func, partial) and func.func == cls.committed
+        ]
+        entries = [entry for batch in queued for entry in batch]
+        if entries:
+            cls.write(entries, using)
+        for batch in queued:
+            batch.clear()
+
+
+    @staticmethod
+    def pending_callbacks(using=DEFAULT_DB_ALIAS):
+        """
+        on_commit() callbacks of the current transaction, without the ones of the rolled back
+        savepoints. Django has no public API for them: they are read from the private
+        `run_on_commit` list of `(savepoint ids, callback, robust)` tuples of the connection,
+        as of Django 4.2 to 5.0 (pinned in requirements/base.txt, checked by ChangeLogTests).
+        """
+        return [callback[1] for callback in connections[using].run_on_commit]
+
+
+class ChangeLogged:
+    """
+    Mixin of the models whose changes are recorded in the ChangeLog: by the post_save and
+    post_delete receivers (see api.signals) and by the bulk_create() and update() of
+    AuditQuerySet.
+    """
+    change_log_exclude = ["created_on", "created_by", "modified_on", "modified_by", "search_vector"]
+
+    @classmethod
+    def get_change_log_fields(cls):
+        if "_change_log_fields" not in cls.__dict__:
+            cls._change_log_fields = [
+                field for field in cls._meta.concrete_fields if field.name not in cls.change_log_exclude
+            ]
+        return cls._change_log_fields
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_change_log_state()
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        super().refresh_from_db(using, fields, **kwargs)
+        self.remember_change_log_state(
+            None if fields is None else {self._meta.get_field(name).attname for name in fields}
+        )
+
+    def remember_change_log_state(self, attnames=None):
+        """
+        Keep the current values of the logged fields (of the given ones only), the next save
+        is diffed against them.
+        """
+        state = getattr(self, "_change_log_state", {}) if attnames is not None else {}
+        state.update({
+            field.attname: copy.deepcopy(value) if isinstance(value, (dict, list)) else value
+            for field in self.get_change_log_fields()
+            if (attnames is None or field.attname in attnames)
+            and (value := self.__dict__.get(field.attname, models.DEFERRED)) is not models.DEFERRED
+        })
+        self._change_log_state = state
+
+    def get_change_log_changes(self, action, update_fields=None):
+        """
+        `{field: [old value, new value]}` of the logged fields changed since the row was loaded
+        or last saved (all of them for a create or a delete).
+        """
+        state = getattr(self, "_change_log_state", {})
+        changes = {}
+        for field in self.get_change_log_fields():
+            if field.attname not in self.__dict__ or (update_fields is not None and field.name not in update_fields):
+                continue
+            value = self.__dict__[field.attname]
+            if action == ChangeLog.CREATE:
+                changes[field.name] = [None, value]
+            elif action == ChangeLog.DELETE:
+                changes[field.name] = [value, None]
+            elif state.get(field.attname) != value:
+                changes[field.name] = [state.get(field.attname), value]
+        return changes
@@ -7,7 +7,8 @@ from django.core.validators import MinValueValidator
 from django.core.exceptions import ValidationError
 from datetime import date
 
-from api.models.audit import Audit
+from api.models.audit import ACTIVE_CONDITION, Audit
+from api.models.change_log import ChangeLogged
 from api.models.apartment_details import ApartmentDetails
 from api.utils.utils import generate_unique_integer_number
 from api.constants import constants as constants
@@ -24,7 +25,7 @@ def validate_default_discounts(value):
         raise ValidationError("Only the default keys are allowed for discount fees.")
 
 
-class LeaseDetails(Audit):
+class LeaseDetails(ChangeLogged, Audit):
     """
     Lease for an Apartment.
     """
@@ -32,7 +33,7 @@ class LeaseDetails(Audit):
         primary_key=True,
         editable=False,
         default=generate_unique_integer_number,
-        help_text="Unique 12-digit agreement number"
+        help_text="Unique agreement number (Snowflake id: timestamp, worker id and sequence)"
     )
     start_date = models.DateField(help_text="Start date of the lease.")
     end_date = models.DateField(help_text="End date of the lease.")
@@ -114,10 +115,9 @@ class LeaseDetails(Audit):
     )
 
     # Foreign Keys
-    apartment_number = models.ForeignKey(
+    apartment = models.ForeignKey(
         ApartmentDetails,
         on_delete=models.CASCADE,
-        to_field="apartment_number",  # Point to the "apartment_number" field in ApartmentDetails
         related_name="leases",
         help_text="Apartment for the specific lease agreement."
     )
@@ -147,3 +147,13 @@ class LeaseDetails(Audit):
     class Meta:
         ordering = ["-start_date"]
         unique_together = ["agreement_number", "start_date"]
+        indexes = [
+            # Change feed order (see SyncMixin)
+            models.Index(fields=["modified_on", "agreement_number"], name="lease_sync_idx"),
+            # Default ordering and hot filters of the lists, on the live rows only (see Audit.objects)
+            models.Index(fields=["-start_date"], name="lease_active_start_date_idx", condition=ACTIVE_CONDITION),
+            models.Index(
+                fields=["apartment", "lease_status"], name="lease_active_apartment_idx",
+                condition=ACTIVE_CONDITION,
+            ),
+        ]
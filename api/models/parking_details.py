@@ -4,6 +4,8 @@ from django.db.models import JSONField
 from django.core.validators import MinValueValidator
 from django.core.exceptions import ValidationError
 
+from api.models.audit import ACTIVE_CONDITION
+from api.models.change_log import ChangeLogged
 from api.models import Audit, BuildingDetails, ApartmentDetails
 from api.constants.constants import default_parking_fees
 
@@ -13,7 +15,7 @@ def validate_parking_fees(value):
         raise ValidationError("Only the default keys are allowed for parking fees.")
 
 
-class ParkingDetails(Audit):
+class ParkingDetails(ChangeLogged, Audit):
     """
     Parking information associated with an Apartment.
     """
@@ -31,10 +33,9 @@ class ParkingDetails(Audit):
         related_name="parking_spaces",
         help_text="Building associated with the parking space."
     )
-    apartment_number = models.ForeignKey(
+    apartment = models.ForeignKey(
         ApartmentDetails,
         on_delete=models.CASCADE,
-        to_field="apartment_number",  # Use apartment_number as the foreign key
         related_name="parking_spaces",
         null=True,  # Optional field
         blank=True,
@@ -74,5 +75,15 @@ class ParkingDetails(Audit):
     class Meta:
         verbose_name = "Parking"
         verbose_name_plural = "Parking Spaces"
-        ordering = ["parking_number", "building_number", "apartment_number"]
-        unique_together = ("parking_number", "building_number", "apartment_number")
+        ordering = ["parking_number", "building_number", "apartment"]
+        unique_together = ("parking_number", "building_number", "apartment")
+        indexes = [
+            # Change feed order (see SyncMixin)
+            models.Index(fields=["modified_on", "parking_number"], name="parking_sync_idx"),
+            # Default ordering and hot filters of the lists, on the live rows only (see Audit.objects)
+            models.Index(fields=["parking_number"], name="parking_active_idx", condition=ACTIVE_CONDITION),
+            models.Index(
+                fields=["building_number", "parking_status"], name="parking_active_building_idx",
+                condition=ACTIVE_CONDITION,
+            ),
+        ]
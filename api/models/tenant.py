@@ -7,13 +7,14 @@ from django.db import models
 from django.core.validators import MinValueValidator
 from django.core.exceptions import ValidationError
 
-from api.models.audit import Audit
+from api.models.audit import ACTIVE_CONDITION, Audit
+from api.models.change_log import ChangeLogged
 from api.models.lease_details import LeaseDetails
 
 from api.models.userdata import UserData
 
 
-class Tenant(Audit):
+class Tenant(ChangeLogged, Audit):
     """
     Tenant associated with a Lease.
     """
@@ -159,3 +160,10 @@ class Tenant(Audit):
 
     class Meta:
         unique_together = ("lease", "user", "move_in_date")
+        indexes = [
+            # Change feed order (see SyncMixin)
+            models.Index(fields=["modified_on", "tenant_id"], name="tenant_sync_idx"),
+            # Default ordering and hot filters of the lists, on the live rows only (see Audit.objects)
+            models.Index(fields=["lease"], name="tenant_active_lease_idx", condition=ACTIVE_CONDITION),
+            models.Index(fields=["user"], name="tenant_active_user_idx", condition=ACTIVE_CONDITION),
+        ]
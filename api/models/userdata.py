@@ -2,10 +2,14 @@ from django.db import models
 from django.utils import timezone
 
 from django.contrib.auth.models import AbstractUser
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import RegexValidator
 from django_countries.fields import CountryField
 from localflavor.us.models import USStateField, USZipCodeField
 
+from bma_backend.request_context import get_current_user
+
 
 class UserData(AbstractUser):
     """
@@ -71,3 +75,27 @@ class UserData(AbstractUser):
         blank=True,
         verbose_name="user permissions",
     )
+    search_vector = SearchVectorField(
+        null=True, editable=False,
+        help_text="Full-text search document of the name, username, email and phone number (kept up to date by triggers)."
+    )
+
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            GinIndex(fields=["search_vector"], name="userdata_search_vector_idx"),
+            # Trigram indexes for the fuzzy `?fuzzy=` lookup
+            GinIndex(fields=["username"], name="userdata_username_trgm_idx", opclasses=["gin_trgm_ops"]),
+            GinIndex(fields=["first_name"], name="userdata_first_name_trgm_idx", opclasses=["gin_trgm_ops"]),
+            GinIndex(fields=["last_name"], name="userdata_last_name_trgm_idx", opclasses=["gin_trgm_ops"]),
+            GinIndex(fields=["email"], name="userdata_email_trgm_idx", opclasses=["gin_trgm_ops"]),
+            GinIndex(fields=["phone_number"], name="userdata_phone_number_trgm_idx", opclasses=["gin_trgm_ops"]),
+        ]
+
+    @classmethod
+    def current(cls):
+        """
+        User of the request being served, None outside of a request or when the request isn't
+        authenticated as a UserData (anonymous, or a Django admin User).
+        """
+        user = get_current_user()
+        return user if isinstance(user, cls) else None
@@ -1,8 +1,9 @@
 # Desc: __init__ file for serializers
 
 from .apartment_serializers import ApartmentDetailsSerializer
-from .building_serializers import BuildingDetailsSerializer
+from .building_serializers import BuildingDetailsSerializer, BuildingStatsSerializer
 from .tenant_serializers import TenantSerializer
 from .user_serializers import UserSerializer, UserLoginSerializer
 from .parking_serializers import ParkingDetailsSerializer
 from .book_apartment_serializers import BookApartmentSerializer
+from .lease_serializers import LeaseDetailsSerializer
@@ -1,14 +1,21 @@
 from rest_framework import serializers
 
 from api.models import ApartmentDetails
+from api.restful.serializers.fields import PrefetchedPrimaryKeyRelatedField, PrefetchRelatedListSerializer
+from api.restful.serializers.representation import CompiledRepresentationMixin
+from api.restful.serializers.validators import AllRowsUniqueMixin
 
-class ApartmentDetailsSerializer(serializers.ModelSerializer):
+class ApartmentDetailsSerializer(AllRowsUniqueMixin, CompiledRepresentationMixin, serializers.ModelSerializer):
+    serializer_related_field = PrefetchedPrimaryKeyRelatedField
 
     class Meta:
         model = ApartmentDetails
-        exclude = ["audit_status"]
+        exclude = ["audit_status", "search_vector"]
+        list_serializer_class = PrefetchRelatedListSerializer
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        for field_name, field in self.fields.items():
+    def get_fields(self):
+        # Built lazily, when the fields are needed (not by the compiled read path)
+        fields = super().get_fields()
+        for field_name, field in fields.items():
             field.required = True
+        return fields
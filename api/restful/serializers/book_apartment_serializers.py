@@ -1,11 +1,27 @@
 import re
 from django.core.exceptions import ValidationError
+from django.db import transaction, OperationalError
+from django.utils import timezone
 
-from rest_framework import serializers
+from rest_framework import serializers, status
+from rest_framework.exceptions import APIException
 from django.core.validators import MinValueValidator
 
 from api.models import LeaseDetails, Tenant, UserData, ApartmentDetails
 from api.constants import constants as constants
+from api.restful.serializers.validators import AllRowsUniqueMixin
+from bma_backend.authentication import invalidate_cached_user
+
+LOCK_NOT_AVAILABLE = "55P03"  # PostgreSQL error code of a NOWAIT lock held by another transaction
+
+
+class ApartmentBookingConflict(APIException):
+    """
+    Raised when the apartment is being booked or was booked by a concurrent request.
+    """
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "The apartment is being booked by another request. Please try again."
+    default_code = "booking_conflict"
 
 
 class TenantSerializer(serializers.Serializer):
@@ -28,7 +44,7 @@ class TenantSerializer(serializers.Serializer):
         ref_name = "TenantInput"
 
 
-class BookApartmentSerializer(serializers.ModelSerializer):
+class BookApartmentSerializer(AllRowsUniqueMixin, serializers.ModelSerializer):
     """
     Serializer for LeaseDetails model.
     """
@@ -46,24 +62,37 @@ class BookApartmentSerializer(serializers.ModelSerializer):
     )
 
     def validate_tenants_list(self, value):
+        # Check if all mandatory fields are provided
         for tenant_data in value:
-            # Check if all mandatory fields are provided
             if not all(field in tenant_data for field in ["first_name", "last_name", "email", "application_fee"]):
                 raise ValidationError({
                     "tenants_list": "Each tenant must have 'first_name', 'last_name', 'email', and 'application_fee' fields."
                 })
 
-            # Check if the user exists and is active
-            email = tenant_data["email"]
-            if not UserData.objects.filter(email=email, is_active=True).exists():
+        emails = [tenant_data["email"] for tenant_data in value]
+        duplicate_emails = sorted({email for email in emails if emails.count(email) > 1})
+        if duplicate_emails:
+            raise ValidationError(f"Users with emails {', '.join(duplicate_emails)} are listed more than once.")
+
+        # Check if the users exist and are active (single query for all the tenants)
+        users = {
+            user.email: user for user in UserData.objects.filter(email__in=emails, is_active=True)
+        }
+        for email in emails:
+            if email not in users:
                 raise ValidationError(f"User with email {email} does not exist or is not active.")
 
-            # Check if the user is already an active tenant in another apartment
-            if Tenant.objects.filter(user__email=email, is_active=True).exists():
-                raise ValidationError(
-                    f"User with email {email} is already an active tenant in another apartment."
-                )
+        # Check if the users are already active tenants in another apartment (single query)
+        active_tenant_email = Tenant.objects.filter(
+            user__email__in=emails, is_active=True
+        ).values_list("user__email", flat=True).first()
+        if active_tenant_email:
+            raise ValidationError(
+                f"User with email {active_tenant_email} is already an active tenant in another apartment."
+            )
 
+        # Keep the resolved users so that create() doesn't fetch them again
+        self._tenant_users = users
         return value
 
     def decimal_validator(self, validation_key, sub_key_type, sub_key_value):
@@ -85,53 +114,83 @@ class BookApartmentSerializer(serializers.ModelSerializer):
         return value
 
     def validate(self, data):
-        # Validate the provided apartment number
-        apartment_number = data.get("apartment_number", None)
-        if not ApartmentDetails.objects.filter(apartment_number=apartment_number.apartment_number, is_available=True).exists():
+        # Validate the provided apartment
+        # The apartment instance is already fetched by the related field
+        apartment = data.get("apartment", None)
+        if not apartment.is_available:
             raise ValidationError({
-                "apartment_number": f"The provided apartment is not available."
+                "apartment": f"The provided apartment is not available."
             })
         # Validate the rent amount against the price field for the apartment
         rent_amount = data.get("rent_amount")
-        if not ApartmentDetails.objects.filter(price=rent_amount).exists():
+        if rent_amount != apartment.price:
             raise ValidationError({
                 "rent_amount": f"The provided rent amount does not match the price for the apartment."
             })
 
         return data
 
+    def lock_apartment(self, apartment):
+        """
+        Lock the row of the apartment being booked until the booking transaction ends.
+        Concurrent bookings of the same apartment fail fast instead of waiting for the lock,
+        and the availability is checked again now that no one else can change it. The other
+        errors (lost connection, timeout, deadlock) are not conflicts and are raised as they are.
+        """
+        try:
+            apartment = ApartmentDetails.objects.select_for_update(nowait=True).get(pk=apartment.pk)
+        except OperationalError as exc:
+            if getattr(exc.__cause__, "pgcode", None) != LOCK_NOT_AVAILABLE:
+                raise
+            raise ApartmentBookingConflict()
+        if not apartment.is_available:
+            raise ApartmentBookingConflict("The provided apartment has already been booked.")
+        return apartment
+
     def create(self, validated_data):
         """
         Create a lease for the tenant(s).
+        The number of queries is the same regardless of the number of tenants.
         """
         tenants_list = list()
         tenants_data = validated_data.pop("tenants_list")
-        lease = LeaseDetails.objects.create(**validated_data)
-
-        for tenant_data in tenants_data:
-            user = UserData.objects.get(email=tenant_data["email"])
-            obj = {
-                "lease": lease,
-                "user": user,
-                "is_active": True,
-                "move_in_date": lease.start_date,
-                "move_out_date": lease.end_date,
-                "application_fee": tenant_data["application_fee"],
-            }
-            tenant = Tenant.objects.create(**obj)
-            tenant.first_name = tenant_data["first_name"]
-            tenant.last_name = tenant_data["last_name"]
-            tenant.email = tenant_data["email"]
-            # Update the user as a tenant
-            user.is_tenant = True
-            user.save()
-            tenants_list.append(tenant)
-
-        # Set the apartment as unavailable
-        apartment_number = validated_data["apartment_number"]
-        apartment = ApartmentDetails.objects.get(apartment_number=apartment_number.apartment_number)
-        apartment.is_available = False
-        apartment.save()
+        emails = [tenant_data["email"] for tenant_data in tenants_data]
+        users = getattr(self, "_tenant_users", None)
+        if users is None:
+            users = {user.email: user for user in UserData.objects.filter(email__in=emails)}
+
+        with transaction.atomic():
+            apartment = self.lock_apartment(validated_data["apartment"])
+            validated_data["apartment"] = apartment
+            lease = LeaseDetails.objects.create(**validated_data)
+
+            for tenant_data in tenants_data:
+                tenant = Tenant(
+                    lease=lease,
+                    user=users[tenant_data["email"]],
+                    is_active=True,
+                    move_in_date=lease.start_date,
+                    move_out_date=lease.end_date,
+                    application_fee=tenant_data["application_fee"],
+                )
+                # bulk_create() skips save(), so run the model validation here
+                tenant.clean()
+                tenant.first_name = tenant_data["first_name"]
+                tenant.last_name = tenant_data["last_name"]
+                tenant.email = tenant_data["email"]
+                tenants_list.append(tenant)
+            Tenant.objects.bulk_create(tenants_list)
+
+            # Update the users as tenants
+            user_ids = [users[email].pk for email in emails]
+            UserData.objects.filter(pk__in=user_ids).update(is_tenant=True, modified_at=timezone.now())
+            invalidate_cached_user(UserData, *user_ids)  # update() doesn't send post_save
+            for email in emails:
+                users[email].is_tenant = True
+
+            # Set the apartment as unavailable, saving the locked row logs the change without reading it again
+            apartment.is_available = False
+            apartment.save(update_fields=["is_available", "modified_on"])
 
         # Return the lease response
         lease.tenants_list = tenants_list
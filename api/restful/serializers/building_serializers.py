@@ -1,9 +1,26 @@
 from rest_framework import serializers
 
-from api.models import BuildingDetails
+from api.models import BuildingDetails, BuildingStats
+from api.restful.serializers.representation import CompiledRepresentationMixin
+from api.restful.serializers.validators import AllRowsUniqueMixin
 
-class BuildingDetailsSerializer(serializers.ModelSerializer):
+class BuildingDetailsSerializer(AllRowsUniqueMixin, CompiledRepresentationMixin, serializers.ModelSerializer):
 
     class Meta:
         model = BuildingDetails
         exclude = ["audit_status"]
+
+
+class BuildingStatsSerializer(serializers.ModelSerializer):
+    occupied_apartment_count = serializers.IntegerField(read_only=True)
+    occupancy_rate = serializers.FloatField(read_only=True)
+    vacancy_rate = serializers.FloatField(read_only=True)
+    parking_utilization = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = BuildingStats
+        fields = [
+            "building_number", "apartment_count", "available_apartment_count", "occupied_apartment_count",
+            "occupancy_rate", "vacancy_rate", "active_lease_count", "rent_roll", "parking_count",
+            "available_parking_count", "reserved_parking_count", "occupied_parking_count", "parking_utilization",
+        ]
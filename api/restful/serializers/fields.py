@@ -0,0 +1,49 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
+from rest_framework import serializers
+
+
+class PrefetchedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    PrimaryKeyRelatedField which resolves the related objects from a cache filled in bulk
+    by PrefetchRelatedListSerializer, so validating a list of N items runs one query per
+    related field instead of N. Values missing from the cache fall back to the default lookup.
+    """
+
+    def __init__(self, **kwargs):
+        self.prefetched = None
+        super().__init__(**kwargs)
+
+    def prefetch(self, values):
+        queryset = self.get_queryset()
+        pks = set()
+        for value in values:
+            try:
+                if value is not None and not isinstance(value, bool):
+                    pks.add(queryset.model._meta.pk.to_python(value))
+            except DjangoValidationError:
+                continue  # Reported by the default lookup during validation
+        self.prefetched = queryset.in_bulk(pks)
+
+    def to_internal_value(self, data):
+        if self.prefetched is not None and self.pk_field is None and not isinstance(data, bool):
+            try:
+                instance = self.prefetched.get(self.get_queryset().model._meta.pk.to_python(data))
+            except (DjangoValidationError, TypeError):
+                instance = None
+            if instance is not None:
+                return instance
+        return super().to_internal_value(data)
+
+
+class PrefetchRelatedListSerializer(serializers.ListSerializer):
+    """
+    ListSerializer fetching the related objects of all the items in one query per
+    PrefetchedPrimaryKeyRelatedField before validating the items.
+    """
+
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            for field_name, field in self.child.fields.items():
+                if isinstance(field, PrefetchedPrimaryKeyRelatedField) and not field.read_only:
+                    field.prefetch(item.get(field_name) for item in data if isinstance(item, dict))
+        return super().to_internal_value(data)
@@ -0,0 +1,11 @@
+from rest_framework import serializers
+
+from api.models import LeaseDetails
+from api.restful.serializers.representation import CompiledRepresentationMixin
+from api.restful.serializers.validators import AllRowsUniqueMixin
+
+class LeaseDetailsSerializer(AllRowsUniqueMixin, CompiledRepresentationMixin, serializers.ModelSerializer):
+
+    class Meta:
+        model = LeaseDetails
+        exclude = ["audit_status"]
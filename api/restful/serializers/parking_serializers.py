@@ -1,17 +1,39 @@
 import re
 from decimal import Decimal
 
+from django.db.models import Count
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 
 from api.models import ParkingDetails, LeaseDetails
 from api.constants.constants import default_parking_fees
+from api.restful.serializers.fields import PrefetchedPrimaryKeyRelatedField, PrefetchRelatedListSerializer
+from api.restful.serializers.representation import CompiledRepresentationMixin
+from api.restful.serializers.validators import AllRowsUniqueMixin
 
 
-class ParkingDetailsSerializer(serializers.ModelSerializer):
+class ParkingListSerializer(PrefetchRelatedListSerializer):
+    """
+    Also counts the existing parking spaces of the buildings of all the items in one query,
+    for the per building limit checked by ParkingDetailsSerializer.validate().
+    """
+
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            building_numbers = {item.get("building_number") for item in data if isinstance(item, dict)}
+            self.child.building_parking_counts = dict(
+                ParkingDetails.objects.filter(building_number__in=building_numbers - {None})
+                .values_list("building_number").annotate(count=Count("pk")).order_by()
+            )
+        return super().to_internal_value(data)
+
+
+class ParkingDetailsSerializer(AllRowsUniqueMixin, CompiledRepresentationMixin, serializers.ModelSerializer):
     """
     Serializer for ParkingDetails model.
     """
+    serializer_related_field = PrefetchedPrimaryKeyRelatedField
+
     parking_fee = serializers.JSONField(
         default=default_parking_fees(),
         help_text="Parking fees for the parking spot."
@@ -22,7 +44,7 @@ class ParkingDetailsSerializer(serializers.ModelSerializer):
     )
 
     def validate(self, data):
-        apartment_number = data.get("apartment_number", None)
+        apartment = data.get("apartment", None)
         building_number = data.get("building_number", None)
         lease_agreement_number = data.get("lease_agreement_number", None)
 
@@ -30,12 +52,12 @@ class ParkingDetailsSerializer(serializers.ModelSerializer):
         # Apartment field will be given only when the tenant books the apartment.
         if (hasattr(self, "context") and self.context.get("request", {}).method == "POST"):
             # This field will be given only when the tenant books the apartment
-            if (apartment_number and hasattr(apartment_number, "apartment_number")):
+            if (apartment and hasattr(apartment, "apartment_number")):
                 raise ValidationError(
                     {
-                        "apartment_number": [
+                        "apartment": [
                             f"Cannot reserve parking spot for apartment" +
-                            f" `{apartment_number.apartment_number}` before booking apartment."
+                            f" `{apartment.apartment_number}` before booking apartment."
                         ]
                     }
                 )
@@ -51,9 +73,7 @@ class ParkingDetailsSerializer(serializers.ModelSerializer):
             # Validate the maximum number of parking rows allowed for a specific building
             elif building_number:
                 max_parking_rows_per_building = 2 * 25 * building_number.no_of_floors
-                existing_parking_rows_for_building = ParkingDetails.objects.filter(
-                    building_number=building_number
-                ).count()
+                existing_parking_rows_for_building = self.get_building_parking_count(building_number)
                 if existing_parking_rows_for_building >= max_parking_rows_per_building:
                     raise ValidationError(
                         f"Number of parking spaces for building `{building_number}` exceeds the maximum limit."
@@ -109,7 +129,7 @@ class ParkingDetailsSerializer(serializers.ModelSerializer):
                 raise ValidationError("Only admin users can update/create parking fees.")
 
         # Validate the number of reserved parking spots for the apartment
-        elif (hasattr(self, "context") and self.context.get("request", {}).method in ["PUT", "PATCH"]) and apartment_number:
+        elif (hasattr(self, "context") and self.context.get("request", {}).method in ["PUT", "PATCH"]) and apartment:
 
             # Assign parking spot for the apartment only if the lease_agreement_number exists in the database
             if not lease_agreement_number:
@@ -119,15 +139,15 @@ class ParkingDetailsSerializer(serializers.ModelSerializer):
 
             # Validate the number of reserved parking spots for the apartment
             reserved_spots_count = ParkingDetails.objects.filter(
-                apartment_number=apartment_number,
+                apartment=apartment,
                 parking_status__in=["reserved", "occupied"]
             ).count()
             # Validate the maximum number of parking spots allowed for a specific apartment
             if reserved_spots_count >= 2:
                 raise ValidationError(
                     {
-                        "apartment_number": [
-                            f"Cannot reserve more than two parking spots for apartment `{apartment_number.apartment_number}`."
+                        "apartment": [
+                            f"Cannot reserve more than two parking spots for apartment `{apartment.apartment_number}`."
                         ]
                     },
                 )
@@ -142,10 +162,10 @@ class ParkingDetailsSerializer(serializers.ModelSerializer):
                 )
 
         # Raise error if the apartment number is not provided for reserved or occupied parking spot
-        elif (not apartment_number and data.get("parking_status", "") in ["reserved", "occupied"]):
+        elif (not apartment and data.get("parking_status", "") in ["reserved", "occupied"]):
             raise ValidationError(
                 {
-                    "apartment_number": [
+                    "apartment": [
                         "Cannot reserve or occupy parking spot without booking the apartment."
                     ]
                 }
@@ -153,7 +173,20 @@ class ParkingDetailsSerializer(serializers.ModelSerializer):
 
         return data
 
+    def get_building_parking_count(self, building):
+        """
+        Existing parking spaces of the building. When validating a list, counted once for all
+        the items by ParkingListSerializer, including the items of the list validated before.
+        """
+        counts = getattr(self, "building_parking_counts", None)
+        if counts is None:
+            return ParkingDetails.objects.filter(building_number=building).count()
+        count = counts.get(building.pk, 0)
+        counts[building.pk] = count + 1
+        return count
+
     class Meta:
         model = ParkingDetails
         exclude = ["audit_status"]
-        extra_kwargs = {"apartment_number": {"required": False}}
+        extra_kwargs = {"apartment": {"required": False}}
+        list_serializer_class = ParkingListSerializer
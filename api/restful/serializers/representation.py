@@ -0,0 +1,73 @@
+from operator import attrgetter
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.fields import SkipField
+from rest_framework.relations import PKOnlyObject
+
+# Fields whose to_representation() returns the model value unchanged
+IDENTITY_FIELDS = (serializers.BooleanField, serializers.CharField, serializers.IntegerField)
+
+
+class CompiledRepresentationMixin:
+    """
+    Read path of a ModelSerializer compiled once per serializer class.
+
+    DRF's `to_representation` goes through `get_attribute` and `to_representation` of
+    every field for every row. The first serialization builds a plan of the readable
+    fields instead: model columns which DRF returns unchanged (booleans, strings, integers,
+    primary keys of foreign keys) are read with an attribute getter, the other fields keep
+    their own `to_representation`. The output is the same as DRF's.
+
+    The plan is shared by all the instances of the serializer class, so its fields must
+    not depend on the context (e.g. no hyperlinked fields).
+    """
+    compiled_representation = True
+
+    def get_representation_plan(self):
+        cls = self.__class__
+        plan = cls.__dict__.get("_representation_plan")
+        if plan is None:
+            # Compiled from a serializer without instance nor context, the fields kept by
+            # the plan must not keep the first request alive
+            template = cls()
+            plan = cls._representation_plan = [template.compile_field(field) for field in template._readable_fields]
+        return plan
+
+    def compile_field(self, field):
+        """
+        (name, getter, to_representation) of a readable field, `to_representation` being
+        None when the value of the getter is the representation.
+        """
+        try:
+            model_field = self.Meta.model._meta.get_field(field.source)
+        except FieldDoesNotExist:
+            model_field = None
+        if model_field is None or not model_field.concrete or field.source_attrs != [field.source]:
+            return field.field_name, None, field  # Not a model column, the field does it all
+        if model_field.is_relation:
+            if isinstance(field, serializers.PrimaryKeyRelatedField) and field.pk_field is None:
+                return field.field_name, attrgetter(model_field.attname), None
+            return field.field_name, None, field
+        if type(field) in IDENTITY_FIELDS or (type(field) is serializers.JSONField and not field.binary):
+            return field.field_name, attrgetter(model_field.attname), None
+        return field.field_name, attrgetter(model_field.attname), field.to_representation
+
+    def to_representation(self, instance):
+        if not self.compiled_representation:
+            return super().to_representation(instance)
+        ret = {}
+        for name, getter, to_representation in self.get_representation_plan():
+            if getter is None:
+                # Same as Serializer.to_representation()
+                field = to_representation
+                try:
+                    attribute = field.get_attribute(instance)
+                except SkipField:
+                    continue
+                check_for_none = attribute.pk if isinstance(attribute, PKOnlyObject) else attribute
+                ret[name] = None if check_for_none is None else field.to_representation(attribute)
+                continue
+            value = getter(instance)
+            ret[name] = value if value is None or to_representation is None else to_representation(value)
+        return ret
@@ -1,8 +1,10 @@
 from rest_framework import serializers
 
 from api.models import Tenant
+from api.restful.serializers.representation import CompiledRepresentationMixin
+from api.restful.serializers.validators import AllRowsUniqueMixin
 
-class TenantSerializer(serializers.ModelSerializer):
+class TenantSerializer(AllRowsUniqueMixin, CompiledRepresentationMixin, serializers.ModelSerializer):
 
     class Meta:
         model = Tenant
@@ -1,8 +1,12 @@
+from django_countries.serializer_fields import CountryField
 from rest_framework import serializers
 
 from api.models import UserData
+from api.restful.serializers.representation import CompiledRepresentationMixin
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(CompiledRepresentationMixin, serializers.ModelSerializer):
+
+    country = CountryField()
 
     class Meta:
         model = UserData
@@ -0,0 +1,30 @@
+import copy
+
+from rest_framework.validators import UniqueTogetherValidator, UniqueValidator
+
+
+class AllRowsUniqueMixin:
+    """
+    ModelSerializer checking the unique fields and `unique_together` of the Audit models
+    against every row (`all_objects`). DRF checks them against the default manager, which
+    leaves out the soft deleted rows the unique constraints of the table still apply to:
+    re-creating a deleted building number passed validation and failed on the INSERT.
+    """
+
+    def build_standard_field(self, field_name, model_field):
+        field_class, field_kwargs = super().build_standard_field(field_name, model_field)
+        if "validators" in field_kwargs:
+            field_kwargs["validators"] = [self.against_all_rows(validator) for validator in field_kwargs["validators"]]
+        return field_class, field_kwargs
+
+    def get_unique_together_validators(self):
+        return [self.against_all_rows(validator) for validator in super().get_unique_together_validators()]
+
+    @staticmethod
+    def against_all_rows(validator):
+        if isinstance(validator, (UniqueValidator, UniqueTogetherValidator)):
+            all_objects = getattr(validator.queryset.model, "all_objects", None)
+            if all_objects is not None:
+                validator = copy.copy(validator)
+                validator.queryset = all_objects.all()
+        return validator
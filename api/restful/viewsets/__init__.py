@@ -6,3 +6,7 @@ from .tenant_viewsets import TenantViewSet
 from .user_viewsets import UsersViewSet, UserLoginViewSet
 from .parking_viewsets import ParkingDetailsViewSet
 from .book_apartment_viewsets import BookApartmentViewSet
+from .lease_viewsets import LeaseDetailsViewSet
+
+from .database_viewsets import DatabasePoolViewSet
+from .async_views import AsyncReadView
\ No newline at end of file
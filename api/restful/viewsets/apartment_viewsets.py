@@ -1,55 +1,62 @@
-from django.db import transaction
-
 from rest_framework import status
 from rest_framework.response import Response
 
-from api.models import ApartmentDetails
+from api.models import ApartmentDetails, ApartmentNumberCounter, BuildingDetails, ChangeLog
 from api.filters import ApartmentDetailsFilter
 from api.restful.serializers import ApartmentDetailsSerializer
 from api.restful.viewsets.base_filter_viewsets import BaseFilterViewSet
+from api.restful.viewsets.bulk_import import ImportMixin
+from api.restful.viewsets.export import ExportMixin
+from api.restful.viewsets.sync import SyncMixin
+from api.utils.bulk_import import ApartmentImporter
 from bma_backend.permissions import ApartmentPermissions
+from bma_backend.response_cache import invalidate_cached_responses
 
 
-class ApartmentDetailsViewSet(BaseFilterViewSet):
+class ApartmentDetailsViewSet(ImportMixin, ExportMixin, SyncMixin, BaseFilterViewSet):
     """
-    CRUD Operations for listing/creating/updating apartment details.
+    CRUD Operations for listing/creating/updating/importing/exporting/syncing apartment details.
     """
-    queryset = ApartmentDetails.objects.all().order_by("apartment_number")
+    queryset = ApartmentDetails.objects.all().order_by("building_number", "apartment_number")
     serializer_class = ApartmentDetailsSerializer
     permission_classes = [ApartmentPermissions]
     http_method_names = ["get", "post", "put", "patch"]
     filterset_class = ApartmentDetailsFilter
+    importer_class = ApartmentImporter
+    search_vector_field = "search_vector"
+    search_config = "english"
+    search_fields = ["description", "building_number__street_name", "building_number__city", "building_number__zip_code"]
+    query_budgets = {
+        "list": 3, "retrieve": 2, "create": 6, "update": 5, "partial_update": 5, "export": 1, "bulk_import": 7,
+        "sync": 2,
+    }
+    # The search vector of the apartments holds the address of their building
+    response_cache_models = [ApartmentDetails, BuildingDetails]
 
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data, many=isinstance(request.data, list))
         serializer.is_valid(raise_exception=True)
 
         if isinstance(request.data, list):
-            # Collect unique building and floor combinations from the data
-            building_floor_combinations = {(item['building_number'], item['floor_number']) for item in serializer.validated_data}
-            
-            # Calculate apartment numbers for each building and floor combination
-            apartment_numbers = {}
-            for building_number, floor_number in building_floor_combinations:
-                existing_apartments_count = ApartmentDetails.objects.filter(
-                    building_number=building_number,
-                    floor_number=floor_number
-                ).count()
-                apartment_numbers[(building_number, floor_number)] = existing_apartments_count
-            
-            # Use transaction.atomic() to ensure atomicity when bulk creating instances
-            with transaction.atomic():
+            # Count the apartments to create for each building and floor combination
+            blocks = {}
+            for item in serializer.validated_data:
+                key = (item['building_number'].pk, item['floor_number'])
+                blocks[key] = blocks.get(key, 0) + 1
+
+            # One transaction for the numbers, the apartments and their change log entries
+            with ChangeLog.buffered():
+                # Reserve the apartment numbers of every combination in one query
+                apartment_numbers = ApartmentNumberCounter.allocate(blocks)
                 instances = []
                 for item in serializer.validated_data:
-                    building_number = item['building_number']
-                    floor_number = item['floor_number']
-                    existing_apartments_count = apartment_numbers[(building_number, floor_number)]
-                    apartment_number = floor_number * 100 + existing_apartments_count + 1
-                    apartment_numbers[(building_number, floor_number)] += 1  # Update count for next apartment
-                    item['apartment_number'] = apartment_number
+                    key = (item['building_number'].pk, item['floor_number'])
+                    item['apartment_number'] = apartment_numbers[key]
+                    apartment_numbers[key] += 1  # Next apartment number of the block
                     instances.append(ApartmentDetails(**item))
                 instances = ApartmentDetails.objects.bulk_create(instances)
-            
+                invalidate_cached_responses(ApartmentDetails)  # bulk_create() doesn't send post_save
+
             serializer = self.get_serializer(instances, many=True)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         self.perform_create(serializer)
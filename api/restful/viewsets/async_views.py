@@ -0,0 +1,78 @@
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError
+from django.http import Http404
+from django.views import View
+from rest_framework.response import Response
+
+
+class AsyncReadView(View):
+    """
+    Async `list`/`retrieve` endpoint of a DRF viewset.
+
+    The viewset's authentication, permissions, throttling, filter backends, pagination
+    and serializer are reused as they are, so the responses are the same as the sync
+    endpoint's. The page, count and object queries run with the async ORM, and the
+    steps which may query the database synchronously (authentication on a cache miss,
+    filter validation, browsable API rendering) run with sync_to_async, so the worker's
+    event loop keeps serving other requests while a request waits on the database.
+    """
+    viewset_class = None
+    action = None  # "list" or "retrieve"
+    http_method_names = ["get"]
+
+    async def get(self, request, *args, **kwargs):
+        viewset = self.viewset_class(
+            action=self.action, action_map={"get": self.action},
+            basename=None, detail=self.action == "retrieve", suffix=None,
+        )
+        viewset.args = args
+        viewset.kwargs = kwargs
+        viewset.format_kwarg = None
+        request = viewset.initialize_request(request, *args, **kwargs)
+        viewset.request = request
+        viewset.headers = viewset.default_response_headers
+
+        try:
+            await sync_to_async(viewset.initial)(request, *args, **kwargs)
+            if self.action == "list":
+                response = await self.list(viewset, request)
+            else:
+                response = await self.retrieve(viewset, request)
+        except Exception as exc:
+            response = viewset.handle_exception(exc)
+
+        response = viewset.finalize_response(request, response, *args, **kwargs)
+        if getattr(response.accepted_renderer, "format", None) == "json":
+            return response.render()
+        return await sync_to_async(response.render)()
+
+    @staticmethod
+    async def filter_queryset(viewset):
+        return await sync_to_async(lambda: viewset.filter_queryset(viewset.get_queryset()))()
+
+    async def list(self, viewset, request):
+        queryset = await self.filter_queryset(viewset)
+
+        paginator = viewset.paginator
+        if paginator is not None:
+            page = await paginator.apaginate_queryset(queryset, request, view=viewset)
+            if page is not None:
+                serializer = viewset.get_serializer(page, many=True)
+                return paginator.get_paginated_response(serializer.data)
+
+        serializer = viewset.get_serializer([obj async for obj in queryset], many=True)
+        return Response(serializer.data)
+
+    async def retrieve(self, viewset, request):
+        queryset = await self.filter_queryset(viewset)
+
+        # Same lookup as GenericAPIView.get_object()
+        lookup_url_kwarg = viewset.lookup_url_kwarg or viewset.lookup_field
+        try:
+            instance = await queryset.aget(**{viewset.lookup_field: viewset.kwargs[lookup_url_kwarg]})
+        except (queryset.model.DoesNotExist, TypeError, ValueError, ValidationError):
+            raise Http404(f"No {queryset.model._meta.object_name} matches the given query.")
+        viewset.check_object_permissions(request, instance)
+
+        serializer = viewset.get_serializer(instance)
+        return Response(serializer.data)
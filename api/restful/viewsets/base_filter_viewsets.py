@@ -2,15 +2,49 @@
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import viewsets, filters
 
-from api.restful.viewsets.pagination import CustomPagination
+from api.filters import FullTextSearchFilter, TrigramSearchFilter
+from api.restful.viewsets.change_log import ChangeLogMixin
+from api.restful.viewsets.conditional import ConditionalRequestMixin
+from api.restful.viewsets.pagination import CustomPagination, KeysetPagination
+from api.restful.viewsets.query_budget import QueryBudgetMixin
+from bma_backend.response_cache import ResponseCacheMixin
 
 
-class BaseFilterViewSet(viewsets.ModelViewSet):
+class BaseFilterViewSet(
+        ResponseCacheMixin, ConditionalRequestMixin, QueryBudgetMixin, ChangeLogMixin, viewsets.ModelViewSet
+    ):
     """
     Base viewset with common filter configurations.
     """
     pagination_class = CustomPagination  # Enable pagination
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    keyset_pagination_class = KeysetPagination  # Used when the `cursor` query param is given
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter, TrigramSearchFilter, filters.OrderingFilter]
     filterset_fields = "__all__"  # Allow filtering by all model fields
-    search_fields = "__all__"  # Allow searching by all model fields
+    search_fields = []  # Fields searched with `icontains` when the view has no `search_vector_field`
+    search_vector_field = None  # Full-text search (tsvector) column used by `?search=` on PostgreSQL
+    search_config = "simple"  # Text search configuration the search vector was built with
+    trigram_search_fields = []  # Fields matched by the `?fuzzy=` trigram lookup
     ordering_fields = "__all__"  # Allow ordering by all model fields
+    # Maximum queries per action, including the user lookup of the JWT authentication when
+    # the user isn't cached, the row lock of the updates with If-Match and the change log
+    # INSERT of the writes (see QueryBudgetMixin and ChangeLogMixin)
+    query_budgets = {}
+    # Models the cached GET responses are built from, none to not cache them (see ResponseCacheMixin)
+    response_cache_models = []
+
+    @property
+    def paginator(self):
+        """
+        Switch to keyset pagination when the client asks for it with a `cursor` query
+        param (empty for the first page), otherwise keep the limit/offset pagination.
+        """
+        if not hasattr(self, "_paginator"):
+            request = getattr(self, "request", None)
+            if (
+                    self.keyset_pagination_class is not None and request is not None
+                    and self.keyset_pagination_class.cursor_query_param in request.query_params
+                ):
+                self._paginator = self.keyset_pagination_class()
+            else:
+                return super().paginator
+        return self._paginator
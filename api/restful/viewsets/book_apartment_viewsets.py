@@ -16,3 +16,4 @@ class BookApartmentViewSet(BaseFilterViewSet):
     serializer_class = BookApartmentSerializer
     permission_classes = [ActiveUserPermissions]
     http_method_names = ["post"]
+    query_budgets = {"create": 13}  # Independent of the number of tenants
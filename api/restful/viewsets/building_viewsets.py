@@ -1,17 +1,56 @@
-from api.models import BuildingDetails
+from django.shortcuts import get_object_or_404
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from api.models import BuildingDetails, BuildingStats
 from api.filters import BuildingDetailsFilter
-from api.restful.serializers import BuildingDetailsSerializer
+from api.restful.serializers import BuildingDetailsSerializer, BuildingStatsSerializer
 from api.restful.viewsets.base_filter_viewsets import BaseFilterViewSet
+from api.restful.viewsets.bulk_import import ImportMixin
+from api.restful.viewsets.sync import SyncMixin
+from api.utils.bulk_import import BuildingImporter
 
 from bma_backend.permissions import IsAdminPermissions
 
 
-class BuildingDetailsViewSet(BaseFilterViewSet):
+class BuildingDetailsViewSet(ImportMixin, SyncMixin, BaseFilterViewSet):
     """
-    CRUD Operations for listing/creating/updating building details.
+    CRUD Operations for listing/creating/updating/importing/syncing building details.
     """
     queryset = BuildingDetails.objects.all().order_by("building_number")
     serializer_class = BuildingDetailsSerializer
     permission_classes = [IsAdminPermissions]
     http_method_names = ["get", "post", "put", "patch"]
     filterset_class = BuildingDetailsFilter
+    importer_class = BuildingImporter
+    search_fields = ["building_number", "street_name", "city", "zip_code"]
+    query_budgets = {
+        "list": 3, "retrieve": 2, "create": 3, "update": 4, "partial_update": 4, "bulk_import": 5,
+        "stats": 2, "portfolio_stats": 2, "sync": 2,
+    }
+    response_cache_models = [BuildingDetails]
+
+    @action(detail=True, methods=["get"], serializer_class=BuildingStatsSerializer)
+    def stats(self, request, *args, **kwargs):
+        """
+        Occupancy, rent roll and parking utilization of the building, read from its summary row.
+        """
+        stats = get_object_or_404(BuildingStats, pk=kwargs[self.lookup_field], building_number__audit_status="active")
+        return Response(self.get_serializer(stats).data)
+
+    @action(detail=False, methods=["get"], url_path="stats", serializer_class=BuildingStatsSerializer)
+    def portfolio_stats(self, request, *args, **kwargs):
+        """
+        Stats of every building and their totals over the portfolio, read from the summary rows.
+        """
+        buildings = list(BuildingStats.objects.filter(building_number__audit_status="active"))
+        totals = BuildingStats(**{
+            name: sum(getattr(building, name) for building in buildings) for name in BuildingStats.STAT_FIELDS
+        })
+        totals = self.get_serializer(totals).data
+        del totals["building_number"]
+        return Response({
+            "building_count": len(buildings),
+            "totals": totals,
+            "buildings": self.get_serializer(buildings, many=True).data,
+        })
@@ -0,0 +1,49 @@
+import io
+
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import MultiPartParser
+from rest_framework.response import Response
+
+from api.utils.bulk_import import IMPORT_FORMATS
+from bma_backend.permissions import IsAdminPermissions
+
+
+class ImportMixin:
+    """
+    Adds an admin only `POST <list url>/import/` action loading a CSV or NDJSON file
+    (multipart field `file`) through the bulk importer of the viewset.
+    """
+    importer_class = None
+    import_format_query_param = "import_format"
+    import_permission_classes = [IsAdminPermissions]
+
+    def get_permissions(self):
+        if self.action == "bulk_import":
+            return [permission() for permission in self.import_permission_classes]
+        return super().get_permissions()
+
+    @action(detail=False, methods=["post"], url_path="import", parser_classes=[MultiPartParser])
+    def bulk_import(self, request, *args, **kwargs):
+        """
+        Import a CSV (with header) or NDJSON file, format given by `?import_format=` or the file extension.
+        Returns the number of created rows and the errors of the rejected rows.
+        """
+        upload = request.FILES.get("file")
+        if upload is None:
+            raise ValidationError({"file": ["No file was submitted."]})
+
+        import_format = request.query_params.get(
+            self.import_format_query_param, upload.name.rsplit(".", 1)[-1].lower()
+        )
+        if import_format not in IMPORT_FORMATS:
+            raise ValidationError({
+                self.import_format_query_param: [
+                    f"Invalid import format `{import_format}`. Choose from {', '.join(IMPORT_FORMATS)}."
+                ]
+            })
+
+        importer = self.importer_class(user=request.user)
+        report = importer.run(io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline=""), import_format)
+        return Response(report, status=status.HTTP_201_CREATED if report["created"] else status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,21 @@
+from api.models import ChangeLog
+
+
+class ChangeLogMixin:
+    """
+    Runs the writes of the create, update and destroy actions in a ChangeLog.buffered()
+    block: the change log entries of the request are written with one INSERT, in the
+    transaction of the rows they describe.
+    """
+
+    def perform_create(self, serializer):
+        with ChangeLog.buffered(self.queryset.db):
+            super().perform_create(serializer)
+
+    def perform_update(self, serializer):
+        with ChangeLog.buffered(self.queryset.db):
+            super().perform_update(serializer)
+
+    def perform_destroy(self, instance):
+        with ChangeLog.buffered(self.queryset.db):
+            super().perform_destroy(instance)
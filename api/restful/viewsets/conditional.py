@@ -0,0 +1,181 @@
+import hashlib
+from calendar import timegm
+
+from django.db import transaction
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.response import Response
+
+from api.restful.viewsets.pagination import KeysetPagination
+
+
+class PreconditionFailed(APIException):
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = "The resource has been modified since the given version (If-Match/If-Unmodified-Since)."
+    default_code = "precondition_failed"
+
+
+def make_etag(*parts):
+    return '"%s"' % hashlib.md5(repr(parts).encode()).hexdigest()
+
+
+class ConditionalRequestMixin:
+    """
+    ETag and Last-Modified validators driven by the `last_modified_field` of the model
+    (`Audit.modified_on`), None to not send them.
+
+    - list: computed with a single `MAX(modified_on), COUNT(*)` query on the filtered
+      queryset, whose count is also the one of the limit/offset pagination. Keyset pages
+      are computed from their rows instead, as the query would scan the whole queryset
+      for every page.
+    - retrieve, update, partial_update: computed from the fetched instance.
+
+    A GET matching `If-None-Match` (or `If-Modified-Since`) returns a 304 before the page
+    is fetched and serialized. A PUT/PATCH with `If-Match` (or `If-Unmodified-Since`) is
+    checked against the row locked until the update commits, and fails with a 412 when
+    someone else changed it, so concurrent updates are never lost.
+
+    The ETags are strong, one per representation (URL, query params and media type).
+    """
+    last_modified_field = "modified_on"
+
+    def get_list_validators(self, queryset):
+        """
+        (etag, last_modified, count) of the filtered queryset.
+        """
+        aggregate = queryset.order_by().aggregate(
+            last_modified=Max(self.last_modified_field), count=Count("pk")
+        )
+        etag = make_etag(
+            self.__class__.__name__, self.request.path, sorted(self.request.query_params.lists()),
+            self.request.accepted_media_type, self.timestamp(aggregate["last_modified"]), aggregate["count"],
+        )
+        return etag, aggregate["last_modified"], aggregate["count"]
+
+    def get_page_validators(self, page):
+        """
+        (etag, last_modified) of a keyset page, from the versions of its rows and its links.
+        """
+        versions = [(obj.pk, getattr(obj, self.last_modified_field)) for obj in page]
+        last_modified = max((version for _, version in versions), default=None)
+        etag = make_etag(
+            self.__class__.__name__, self.request.path, sorted(self.request.query_params.lists()),
+            self.request.accepted_media_type, [(pk, self.timestamp(version)) for pk, version in versions],
+            self.paginator.has_next, self.paginator.has_previous,
+        )
+        return etag, last_modified
+
+    def get_object_validators(self, instance, last_modified=None):
+        """
+        (etag, last_modified) of the instance, or of its version modified at `last_modified`.
+        """
+        if last_modified is None:
+            last_modified = getattr(instance, self.last_modified_field)
+        etag = make_etag(
+            self.__class__.__name__, instance._meta.label_lower, instance.pk, self.request.accepted_media_type,
+            self.timestamp(last_modified),
+        )
+        return etag, last_modified
+
+    @staticmethod
+    def timestamp(value):
+        return value.timestamp() if value is not None else None
+
+    def evaluate_preconditions(self, request, etag, last_modified):
+        """
+        304 response when the client has the current representation, PreconditionFailed
+        when a condition of an update fails, None otherwise.
+        """
+        timestamp = timegm(last_modified.utctimetuple()) if last_modified else None
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if response is None:
+            return None
+        if response.status_code == status.HTTP_412_PRECONDITION_FAILED:
+            raise PreconditionFailed()
+        self.set_validators(response, etag, last_modified)
+        return response
+
+    @staticmethod
+    def set_validators(response, etag, last_modified):
+        response["ETag"] = etag
+        if last_modified:
+            response["Last-Modified"] = http_date(timegm(last_modified.utctimetuple()))
+        return response
+
+    def get_object(self):
+        # Fetched once per request, by the precondition checks and then by the action
+        if not hasattr(self, "_object"):
+            self._object = super().get_object()
+        return self._object
+
+    def list(self, request, *args, **kwargs):
+        if self.last_modified_field is None:
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        if isinstance(self.paginator, KeysetPagination):
+            page = self.paginate_queryset(queryset)
+            etag, last_modified = self.get_page_validators(page)
+        else:
+            page = None
+            etag, last_modified, count = self.get_list_validators(queryset)
+        not_modified = self.evaluate_preconditions(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        if page is None:
+            if hasattr(self.paginator, "known_count"):
+                self.paginator.known_count = count
+            page = self.paginate_queryset(queryset)
+        if page is not None:
+            response = self.get_paginated_response(self.get_serializer(page, many=True).data)
+        else:
+            response = Response(self.get_serializer(queryset, many=True).data)
+        return self.set_validators(response, etag, last_modified)
+
+    def retrieve(self, request, *args, **kwargs):
+        if self.last_modified_field is None:
+            return super().retrieve(request, *args, **kwargs)
+
+        etag, last_modified = self.get_object_validators(self.get_object())
+        not_modified = self.evaluate_preconditions(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+        return self.set_validators(super().retrieve(request, *args, **kwargs), etag, last_modified)
+
+    def update(self, request, *args, **kwargs):
+        if self.last_modified_field is None:
+            return super().update(request, *args, **kwargs)
+
+        if "HTTP_IF_MATCH" in request.META or "HTTP_IF_UNMODIFIED_SINCE" in request.META:
+            with transaction.atomic(using=self.queryset.db):
+                instance = self.get_object()
+                # Compared with the version of the row locked until the update commits
+                last_modified = type(instance)._default_manager.select_for_update().filter(
+                    pk=instance.pk
+                ).values_list(self.last_modified_field, flat=True).get()
+                if last_modified != getattr(instance, self.last_modified_field):
+                    instance.refresh_from_db()  # Changed since it was fetched, update the locked version
+                self.evaluate_preconditions(request, *self.get_object_validators(instance, last_modified))
+                response = super().update(request, *args, **kwargs)
+        else:
+            response = super().update(request, *args, **kwargs)
+        if status.is_success(response.status_code):
+            self.set_validators(response, *self.get_object_validators(self.get_object()))
+        return response
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        # Responses built before this request (e.g. from the response cache) carry their validators
+        if (
+                request.method in ("GET", "HEAD") and response.status_code == status.HTTP_200_OK
+                and response.has_header("ETag")
+            ):
+            return get_conditional_response(
+                request, etag=response["ETag"], last_modified=parse_http_date_safe(response.get("Last-Modified", "")),
+                response=response,
+            )
+        return response
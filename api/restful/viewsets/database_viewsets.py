@@ -0,0 +1,18 @@
+import os
+
+from rest_framework import viewsets
+from rest_framework.response import Response
+
+from bma_backend.db.postgresql.pool import pool_stats
+from bma_backend.permissions import IsAdminPermissions
+
+
+class DatabasePoolViewSet(viewsets.ViewSet):
+    """
+    Connection pool statistics (size, in use, waiting, wait time...) of the worker
+    process serving the request.
+    """
+    permission_classes = [IsAdminPermissions]
+
+    def list(self, request):
+        return Response({"pid": os.getpid(), "pools": pool_stats()})
@@ -0,0 +1,111 @@
+import csv
+import datetime
+import json
+
+import orjson
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+
+from bma_backend.permissions import IsAdminPermissions
+
+
+class Echo:
+    """
+    File-like object returning what is written, used to stream csv.writer rows.
+    """
+
+    def write(self, value):
+        return value
+
+
+class ExportMixin:
+    """
+    Adds an admin only `GET <list url>/export/` action streaming the filtered queryset as
+    CSV or NDJSON.
+
+    The rows are read with `values_list().iterator(chunk_size=...)` (a server-side cursor on
+    PostgreSQL) and written to the response as they come, so the whole queryset is never held
+    in memory and no pagination, count or serializer runs.
+    """
+    export_fields = None  # Defaults to every concrete model field except `export_exclude`
+    export_exclude = ["audit_status", "search_vector"]
+    export_chunk_size = 2000  # Rows fetched from the database per round trip
+    export_format_query_param = "export_format"
+    # The whole table, unpaginated: not open to the readers of the lists (e.g. anonymous users)
+    export_permission_classes = [IsAdminPermissions]
+    export_content_types = {
+        "csv": "text/csv",
+        "ndjson": "application/x-ndjson",
+    }
+
+    def get_permissions(self):
+        if self.action == "export":
+            return [permission() for permission in self.export_permission_classes]
+        return super().get_permissions()
+
+    def get_export_fields(self):
+        if self.export_fields is not None:
+            return list(self.export_fields)
+        return [
+            field.name for field in self.get_queryset().model._meta.concrete_fields
+            if field.name not in self.export_exclude
+        ]
+
+    @action(detail=False, methods=["get"])
+    def export(self, request, *args, **kwargs):
+        """
+        Stream the filtered list as CSV (`?export_format=csv`, default) or NDJSON (`?export_format=ndjson`).
+        """
+        export_format = request.query_params.get(self.export_format_query_param, "csv")
+        if export_format not in self.export_content_types:
+            raise ValidationError({
+                self.export_format_query_param: [
+                    f"Invalid export format `{export_format}`. Choose from {', '.join(self.export_content_types)}."
+                ]
+            })
+
+        fields = self.get_export_fields()
+        rows = self.filter_queryset(self.get_queryset()).values_list(*fields).iterator(
+            chunk_size=self.export_chunk_size
+        )
+        stream = self.stream_csv(fields, rows) if export_format == "csv" else self.stream_ndjson(fields, rows)
+
+        response = StreamingHttpResponse(stream, content_type=self.export_content_types[export_format])
+        filename = f"{self.basename}.{export_format}"
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+    def stream_csv(self, fields, rows):
+        writer = csv.writer(Echo())
+        yield writer.writerow(fields)
+        chunk = []
+        for row in rows:
+            chunk.append(writer.writerow([self.csv_value(value) for value in row]))
+            if len(chunk) >= self.export_chunk_size:
+                yield "".join(chunk)
+                chunk = []
+        if chunk:
+            yield "".join(chunk)
+
+    @staticmethod
+    def csv_value(value):
+        if isinstance(value, (dict, list)):
+            return json.dumps(value, cls=DjangoJSONEncoder)
+        if isinstance(value, (datetime.date, datetime.time)):
+            return value.isoformat()
+        return value
+
+    def stream_ndjson(self, fields, rows):
+        # Dates, times, Decimals and UUIDs are encoded by DjangoJSONEncoder, the rest by orjson
+        default = DjangoJSONEncoder().default
+        options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_APPEND_NEWLINE
+        chunk = []
+        for row in rows:
+            chunk.append(orjson.dumps(dict(zip(fields, row)), default=default, option=options))
+            if len(chunk) >= self.export_chunk_size:
+                yield b"".join(chunk)
+                chunk = []
+        if chunk:
+            yield b"".join(chunk)
@@ -0,0 +1,20 @@
+from api.models import LeaseDetails
+from api.filters import LeaseDetailsFilter
+from api.restful.serializers import LeaseDetailsSerializer
+from api.restful.viewsets.base_filter_viewsets import BaseFilterViewSet
+from api.restful.viewsets.export import ExportMixin
+from api.restful.viewsets.sync import SyncMixin
+
+from bma_backend.permissions import IsAdminPermissions
+
+
+class LeaseDetailsViewSet(ExportMixin, SyncMixin, BaseFilterViewSet):
+    """
+    Listing/exporting/syncing lease details. Leases are created by booking an apartment.
+    """
+    queryset = LeaseDetails.objects.all().order_by("-start_date")
+    serializer_class = LeaseDetailsSerializer
+    permission_classes = [IsAdminPermissions]
+    http_method_names = ["get"]
+    filterset_class = LeaseDetailsFilter
+    query_budgets = {"list": 3, "retrieve": 2, "export": 1, "sync": 2}
@@ -1,4 +1,15 @@
-from rest_framework.pagination import LimitOffsetPagination
+import json
+from base64 import b64decode, b64encode
+from collections import OrderedDict
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import F, FloatField, Q
+from django.db.models.expressions import OrderBy
+from django.db.models.functions import Cast
+from rest_framework import exceptions
+from rest_framework.pagination import BasePagination, LimitOffsetPagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
 
 class CustomPagination(LimitOffsetPagination):
@@ -9,3 +20,335 @@ class CustomPagination(LimitOffsetPagination):
     max_limit = 100  # Set the maximum page size
     limit_query_param = 'limit'  # Set the query parameter for limit
     offset_query_param = 'offset'  # Set the query parameter for offset
+    known_count = None  # Count of the queryset when the view already ran it (see ConditionalRequestMixin)
+
+    def get_count(self, queryset):
+        if self.known_count is not None:
+            return self.known_count
+        return super().get_count(queryset)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        paginate_queryset() running the count and page queries with the async ORM.
+        """
+        self.request = request
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+
+        self.count = await queryset.acount()
+        self.offset = self.get_offset(request)
+        if self.count > self.limit and self.template is not None:
+            self.display_page_controls = True
+
+        if self.count == 0 or self.offset > self.count:
+            return []
+        return [obj async for obj in queryset[self.offset:self.offset + self.limit]]
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (seek) pagination over the queryset's ordering plus a primary key tiebreak.
+
+    Each page is fetched with a `WHERE (ordering columns) > (last row values)` condition
+    instead of an `OFFSET`, and no `COUNT(*)` is run, so every page costs the same
+    regardless of how deep the client has paged. The cursor is an opaque token holding
+    the ordering and the boundary row values, so it survives inserts and deletes
+    between requests.
+
+    Ascending columns sort NULLs last and descending columns sort NULLs first
+    (the PostgreSQL defaults), which keeps nullable columns traversable.
+
+    Float annotations (e.g. the `real` search ranks of PostgreSQL) are ordered and compared
+    as double precision: the cursor keeps them as JSON numbers, which would not compare
+    equal to the single precision values they were read from.
+    """
+    default_limit = CustomPagination.default_limit  # Set the default page size
+    max_limit = CustomPagination.max_limit  # Set the maximum page size
+    limit_query_param = 'limit'  # Set the query parameter for limit
+    cursor_query_param = 'cursor'  # Set the query parameter for cursor
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.set_page(list(self.get_page_queryset(queryset, request)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        paginate_queryset() running the page query with the async ORM.
+        """
+        return self.set_page([obj async for obj in self.get_page_queryset(queryset, request)])
+
+    def get_page_queryset(self, queryset, request):
+        """
+        Queryset of the requested page, with one extra row to know whether a further page exists.
+        """
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.limit = self.get_limit(request)
+        self.model_opts = queryset.model._meta
+        self.annotations = queryset.query.annotations
+        self.ordering = self.get_ordering(queryset)
+        queryset = queryset.annotate(**{
+            column: Cast(self.annotations[column], FloatField()) for column, _ in self.ordering
+            if column in self.annotations and isinstance(self.annotations[column].output_field, FloatField)
+        })
+        self.annotations = queryset.query.annotations
+
+        cursor = self.decode_cursor(request)
+        self.has_cursor = cursor is not None
+        self.reverse = bool(cursor and cursor["reverse"])
+        ordering = self.invert(self.ordering) if self.reverse else self.ordering
+
+        queryset = queryset.order_by(*self.order_by_expressions(ordering))
+        if cursor is not None:
+            queryset = queryset.filter(self.seek_condition(ordering, cursor["values"]))
+        return queryset[:self.limit + 1]
+
+    def set_page(self, results):
+        has_more = len(results) > self.limit
+        results = results[:self.limit]
+        if self.reverse:
+            results.reverse()
+
+        self.page = results
+        if self.reverse:
+            self.has_next = self.has_cursor
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.has_cursor
+        return results
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_limit(self, request):
+        try:
+            return _positive_int(
+                request.query_params[self.limit_query_param],
+                strict=True,
+                cutoff=self.max_limit
+            )
+        except (KeyError, ValueError):
+            return self.default_limit
+
+    def get_ordering(self, queryset):
+        """
+        Resolve the effective ordering of the queryset (as left by the view and the
+        ordering filter backend) into `(column, descending)` pairs ending with the PK.
+        """
+        opts = queryset.model._meta
+        if queryset.query.order_by:
+            order_by = queryset.query.order_by
+        elif queryset.query.default_ordering:
+            order_by = opts.ordering
+        else:
+            order_by = []
+
+        ordering = []
+        for item in order_by:
+            if isinstance(item, OrderBy) and isinstance(item.expression, F):
+                name, descending = item.expression.name, item.descending
+            elif isinstance(item, str) and item != "?":
+                name, descending = item.lstrip("-"), item.startswith("-")
+            else:
+                raise exceptions.ValidationError(f"Ordering `{item}` cannot be used with cursor pagination.")
+
+            if name in queryset.query.annotations:
+                # Annotations (e.g. the search rank) are compared like any other column
+                if (name, descending) not in ordering:
+                    ordering.append((name, descending))
+                continue
+            if name == "pk":
+                name = opts.pk.name
+            try:
+                field = opts.get_field(name)
+            except FieldDoesNotExist:
+                raise exceptions.ValidationError(f"Ordering `{name}` cannot be used with cursor pagination.")
+            column = (field.attname, descending)
+            if column not in ordering:
+                ordering.append(column)
+            if field.primary_key:
+                break  # The primary key is unique, nothing after it affects the order
+
+        # Primary key tiebreak so that the ordering is total
+        if not any(column == opts.pk.attname for column, _ in ordering):
+            ordering.append((opts.pk.attname, False))
+        return ordering
+
+    @staticmethod
+    def invert(ordering):
+        return [(column, not descending) for column, descending in ordering]
+
+    @staticmethod
+    def order_by_expressions(ordering):
+        expressions = []
+        for column, descending in ordering:
+            if descending:
+                expressions.append(F(column).desc(nulls_first=True))
+            else:
+                expressions.append(F(column).asc(nulls_last=True))
+        return expressions
+
+    def seek_condition(self, ordering, values):
+        """
+        Build the lexicographic "row comes after the cursor" condition:
+        `(a > x) OR (a = x AND b > y) OR (a = x AND b = y AND pk > z)`.
+        """
+        condition = Q(pk__in=[])
+        equal = Q()
+        for (column, descending), value in zip(ordering, values):
+            if value is None:
+                # NULLs come first when descending and last when ascending
+                after = Q(**{f"{column}__isnull": False}) if descending else Q(pk__in=[])
+                same = Q(**{f"{column}__isnull": True})
+            elif descending:
+                after = Q(**{f"{column}__lt": value})
+                same = Q(**{column: value})
+            else:
+                after = Q(**{f"{column}__gt": value})
+                if self.model_field(column).null:
+                    after |= Q(**{f"{column}__isnull": True})
+                same = Q(**{column: value})
+            condition |= equal & after
+            equal &= same
+        return condition
+
+    def decode_cursor(self, request):
+        """
+        Decode the cursor query parameter. An empty cursor requests the first page.
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+
+        try:
+            cursor = json.loads(b64decode(encoded.encode("ascii"), altchars=b"-_").decode("utf-8"))
+            ordering = [(column, bool(descending)) for column, descending in cursor["o"]]
+            raw_values = cursor["v"]
+            reverse = bool(cursor.get("r", False))
+        except (TypeError, ValueError, KeyError):
+            raise self.invalid_cursor()
+
+        # A cursor is only valid for the ordering it was produced with
+        if ordering != self.ordering or len(raw_values) != len(ordering):
+            raise self.invalid_cursor()
+
+        values = []
+        try:
+            for (column, _), raw in zip(ordering, raw_values):
+                field = self.model_field(column)
+                if field.is_relation:
+                    field = field.target_field
+                values.append(None if raw is None else field.to_python(raw))
+        except (FieldDoesNotExist, ValidationError):
+            raise self.invalid_cursor()
+        return {"values": values, "reverse": reverse}
+
+    def invalid_cursor(self):
+        # A bad request rather than DRF's 404: the cursor is tampered with or of another ordering
+        return exceptions.ValidationError({self.cursor_query_param: [self.invalid_cursor_message]})
+
+    def encode_cursor(self, instance, reverse):
+        values = []
+        for column, _ in self.ordering:
+            value = getattr(instance, column)
+            values.append(value if value is None or isinstance(value, (int, float, str)) else str(value))
+        payload = json.dumps(
+            {"o": self.ordering, "v": values, "r": int(reverse)}, separators=(",", ":")
+        )
+        encoded = b64encode(payload.encode("utf-8"), altchars=b"-_").decode("ascii")
+        url = replace_query_param(self.base_url, self.cursor_query_param, encoded)
+        return replace_query_param(url, self.limit_query_param, self.limit)
+
+    def model_field(self, column):
+        if column in self.annotations:
+            return self.annotations[column].output_field
+        for field in self.model_opts.concrete_fields:
+            if field.attname == column:
+                return field
+        raise FieldDoesNotExist(column)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            # The first page, still with the keyset pagination
+            return replace_query_param(self.base_url, self.cursor_query_param, "")
+        return self.encode_cursor(self.page[0], reverse=True)
+
+
+class SyncPagination(KeysetPagination):
+    """
+    Keyset pagination of a change feed ordered by `(modified_on, pk)`.
+
+    Unlike KeysetPagination, the next link is always given: it resumes after the last row
+    of the page (or at the same position when nothing changed), so the client keeps it
+    to fetch the next changes later. Rows which aren't active (`audit_status`) are returned
+    as tombstones (their primary keys) instead of being serialized.
+    """
+    default_limit = 100  # Set the default page size
+    max_limit = 1000  # Set the maximum page size
+
+    def get_page_queryset(self, queryset, request):
+        queryset = super().get_page_queryset(queryset, request)
+        if self.reverse:
+            raise self.invalid_cursor()  # The feed is only read forward
+        return queryset
+
+    def seek_condition(self, ordering, values):
+        # Redundant bound on the leading column, so that the index range scan starts at the cursor
+        (column, _), value = ordering[0], values[0]
+        return Q(**{f"{column}__gte": value}) & super().seek_condition(ordering, values)
+
+    def split_page(self, page):
+        """
+        (changed rows, primary keys of the deleted or inactive rows) of the page.
+        """
+        return (
+            [obj for obj in page if obj.audit_status == "active"],
+            [obj.pk for obj in page if obj.audit_status != "active"],
+        )
+
+    def get_next_link(self):
+        if not self.page:
+            return self.base_url  # Nothing changed, resume from the same position
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_paginated_response(self, data, deleted=()):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('has_more', self.has_next),
+            ('results', data),
+            ('deleted', list(deleted)),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'format': 'uri'},
+                'has_more': {'type': 'boolean'},
+                'results': schema,
+                'deleted': {'type': 'array', 'items': {}},
+            },
+        }
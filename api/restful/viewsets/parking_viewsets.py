@@ -2,29 +2,39 @@ from rest_framework import viewsets
 from rest_framework import status
 from rest_framework.response import Response
 
-from api.models import ParkingDetails
+from api.models import ChangeLog, ParkingDetails
 from api.restful.serializers import ParkingDetailsSerializer
 from api.restful.viewsets.base_filter_viewsets import BaseFilterViewSet
+from api.restful.viewsets.bulk_import import ImportMixin
+from api.restful.viewsets.export import ExportMixin
+from api.restful.viewsets.sync import SyncMixin
+from api.utils.bulk_import import ParkingImporter
 from bma_backend.permissions import ParkingPermissions
 from api.filters import ParkingDetailsFilter
 
 
-class ParkingDetailsViewSet(BaseFilterViewSet):
+class ParkingDetailsViewSet(ImportMixin, ExportMixin, SyncMixin, BaseFilterViewSet):
     """
-    CRUD Operations for listing/creating/updating parking details.
+    CRUD Operations for listing/creating/updating/importing/exporting/syncing parking details.
     """
     queryset = ParkingDetails.objects.all().order_by('parking_number')
     serializer_class = ParkingDetailsSerializer
     permission_classes = [ParkingPermissions]
     http_method_names = ["get", "post", "put", "patch"]
     filterset_class = ParkingDetailsFilter
+    importer_class = ParkingImporter
+    query_budgets = {
+        "list": 3, "retrieve": 2, "create": 6, "update": 6, "partial_update": 6, "export": 1, "bulk_import": 6,
+        "sync": 3,
+    }
 
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data, many=isinstance(request.data, list))
         serializer.is_valid(raise_exception=True)
         
         if isinstance(request.data, list):
-            instances = ParkingDetails.objects.bulk_create([ParkingDetails(**item) for item in serializer.validated_data])
+            with ChangeLog.buffered():
+                instances = ParkingDetails.objects.bulk_create([ParkingDetails(**item) for item in serializer.validated_data])
             serializer = self.get_serializer(instances, many=True)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         self.perform_create(serializer)
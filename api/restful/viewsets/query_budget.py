@@ -0,0 +1,56 @@
+import logging
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """
+    Raised when a request runs more SQL queries than the budget of its action (`raise` mode).
+    """
+
+
+class QueryBudgetMixin:
+    """
+    Declarative maximum number of SQL queries per viewset action, e.g.
+
+        query_budgets = {"list": 3, "retrieve": 2}
+
+    Every query of the request once routed to the viewset is counted: authentication,
+    permissions, filtering, pagination, validation and serialization (the streamed rows
+    of `export` are sent after the count). Actions without a budget are not checked.
+
+    QUERY_BUDGET_MODE selects what happens when a budget is exceeded: `log` a warning,
+    `raise` QueryBudgetExceeded (the tests) or `off` to not count the queries at all.
+    """
+    query_budgets = {}
+
+    def get_query_budget(self):
+        return self.query_budgets.get(getattr(self, "action", None))
+
+    def dispatch(self, request, *args, **kwargs):
+        mode = settings.QUERY_BUDGET_MODE
+        if mode == "off" or not self.query_budgets:
+            return super().dispatch(request, *args, **kwargs)
+
+        queries = []
+
+        def record_query(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+
+        with connections[self.queryset.db].execute_wrapper(record_query):
+            response = super().dispatch(request, *args, **kwargs)
+
+        budget = self.get_query_budget()
+        if budget is not None and len(queries) > budget:
+            message = (
+                f"{self.__class__.__name__}.{self.action} ran {len(queries)} queries "
+                f"(budget {budget}): {request.method} {request.get_full_path()}"
+            )
+            if mode == "raise":
+                raise QueryBudgetExceeded(message + "\n" + "\n".join(queries))
+            logger.warning(message)
+        return response
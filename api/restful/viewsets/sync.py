@@ -0,0 +1,59 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+
+from api.restful.viewsets.pagination import SyncPagination
+
+
+class SyncMixin:
+    """
+    Adds a `GET <list url>/sync/` change feed: the rows modified after a watermark, ordered
+    by `(modified_on, pk)`, with the primary keys of the rows which left the lists (deleted
+    or inactive, see `Audit.objects`) as tombstones.
+
+    The first request gives the watermark with `?modified_since=<ISO 8601 datetime>` (or
+    nothing for a full sync), the following ones follow the `next` link, whose cursor resumes
+    after the last row returned. The cost is the number of changed rows, read from the
+    `(modified_on, pk)` index of the model.
+
+    `modified_on` is set when the row is saved, not when the transaction commits, so the
+    rows of the last SYNC_SETTLE_SECONDS are held back until the transactions writing them
+    have committed, otherwise a row committed after a later one could be skipped.
+    """
+    sync_pagination_class = SyncPagination
+    sync_modified_since_query_param = "modified_since"
+
+    def get_sync_queryset(self):
+        # Every row, the default manager of the model leaves out the tombstones
+        queryset = self.queryset.model.all_objects.order_by(self.last_modified_field, "pk")
+        settle = timezone.now() - timedelta(seconds=settings.SYNC_SETTLE_SECONDS)
+        queryset = queryset.filter(**{f"{self.last_modified_field}__lte": settle})
+
+        modified_since = self.request.query_params.get(self.sync_modified_since_query_param)
+        if modified_since:
+            try:
+                modified_since = parse_datetime(modified_since)
+            except ValueError:
+                modified_since = None
+            if modified_since is None:
+                raise ValidationError({
+                    self.sync_modified_since_query_param: ["Enter a valid ISO 8601 date and time."]
+                })
+            if timezone.is_naive(modified_since):
+                modified_since = timezone.make_aware(modified_since)
+            queryset = queryset.filter(**{f"{self.last_modified_field}__gt": modified_since})
+        return queryset
+
+    @action(detail=False, methods=["get"])
+    def sync(self, request, *args, **kwargs):
+        """
+        Rows modified after `?modified_since=` (or the `next` link cursor), and the deleted ones.
+        """
+        paginator = self.sync_pagination_class()
+        page = paginator.paginate_queryset(self.get_sync_queryset(), request, view=self)
+        changed, deleted = paginator.split_page(page)
+        return paginator.get_paginated_response(self.get_serializer(changed, many=True).data, deleted)
@@ -4,16 +4,22 @@ from api.models import Tenant
 from api.restful.serializers import TenantSerializer
 from api.restful.viewsets.pagination import CustomPagination
 from api.restful.viewsets.base_filter_viewsets import BaseFilterViewSet
+from api.restful.viewsets.export import ExportMixin
+from api.restful.viewsets.sync import SyncMixin
 
 from bma_backend.permissions import IsAdminPermissions
 
 
-class TenantViewSet(BaseFilterViewSet):
+class TenantViewSet(ExportMixin, SyncMixin, BaseFilterViewSet):
     """
-    CRUD Operations for listing/creating/updating Tenant details.
+    CRUD Operations for listing/creating/updating/exporting/syncing Tenant details.
     """
     queryset = Tenant.objects.all()
     serializer_class = TenantSerializer
     permission_classes = [IsAdminPermissions]
     http_method_names = ["get", "patch"]
     pagination_class = CustomPagination  # Enable pagination
+    trigram_search_fields = [
+        "user__username", "user__first_name", "user__last_name", "user__email", "user__phone_number"
+    ]
+    query_budgets = {"list": 3, "retrieve": 2, "partial_update": 4, "export": 1, "sync": 2}
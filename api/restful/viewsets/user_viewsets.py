@@ -9,31 +9,43 @@ from django.contrib.auth import authenticate, login
 from api.models import UserData
 from api.restful.serializers import UserSerializer, UserLoginSerializer
 from api.restful.viewsets.base_filter_viewsets import BaseFilterViewSet
+from api.restful.viewsets.export import ExportMixin
 from api.filters import UsersFilter
 
+from bma_backend.authentication import USER_MODEL_CLAIM
 from bma_backend.permissions import UserPermissions
 
 
-class UsersViewSet(BaseFilterViewSet):
+class UsersViewSet(ExportMixin, BaseFilterViewSet):
     """
-    CRUD Operations for listing/creating/deleting/updating users.
+    CRUD Operations for listing/creating/deleting/updating/exporting users.
     """
     queryset = UserData.objects.all().order_by("id")
     serializer_class = UserSerializer
     lookup_field = "id"
     permission_classes = [UserPermissions]
     filterset_class = UsersFilter
+    search_vector_field = "search_vector"
+    search_fields = ["username", "first_name", "last_name", "email", "phone_number"]
+    trigram_search_fields = search_fields
+    export_fields = [field for field in UserSerializer.Meta.fields if field != "password"]
+    last_modified_field = "modified_at"
+    query_budgets = {
+        "list": 3, "retrieve": 2, "create": 3, "update": 4, "partial_update": 4, "destroy": 9, "export": 1,
+    }
 
     def get_object(self):
         """
-        Gets Object for the queryset Model.
+        Gets Object for the queryset Model, fetched and permission checked once per request.
         """
-        queryset = self.filter_queryset(self.get_queryset())
-        obj = queryset.first()  # Get the first object
-        if obj is None:
-            raise NotFound(detail="User not found")
-        self.check_object_permissions(self.request, obj)
-        return obj
+        if not hasattr(self, "_object"):
+            queryset = self.filter_queryset(self.get_queryset())
+            obj = queryset.first()  # Get the first object
+            if obj is None:
+                raise NotFound(detail="User not found")
+            self.check_object_permissions(self.request, obj)
+            self._object = obj
+        return self._object
 
     def get_queryset(self):
         """
@@ -66,6 +78,7 @@ class UserLoginViewSet(viewsets.ViewSet):
         if user:
             login(request, user)
             refresh = RefreshToken.for_user(user)
+            refresh[USER_MODEL_CLAIM] = user._meta.label_lower  # Copied to the access token
             return Response(
                 {
                     "message": "Login successful",
@@ -0,0 +1,86 @@
+from django.contrib.auth.models import User
+from django.db import connections, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from api.models import (
+    ApartmentDetails, BuildingDetails, BuildingStats, ChangeLog, LeaseDetails, ParkingDetails, Tenant, UserData
+)
+from bma_backend.authentication import invalidate_cached_user
+from bma_backend.response_cache import invalidate_cached_responses
+
+
+@receiver(post_save, sender=UserData)
+@receiver(post_delete, sender=UserData)
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_cache(sender, instance, **kwargs):
+    """
+    Drop the cached authenticated user when the user is saved (updated, deactivated) or deleted.
+    """
+    invalidate_cached_user(sender, instance.pk)
+
+
+@receiver(post_save, sender=BuildingDetails)
+@receiver(post_delete, sender=BuildingDetails)
+@receiver(post_save, sender=ApartmentDetails)
+@receiver(post_delete, sender=ApartmentDetails)
+def invalidate_response_cache(sender, **kwargs):
+    """
+    Make the cached responses built from the apartments or buildings stale (see ResponseCacheMixin).
+    """
+    invalidate_cached_responses(sender)
+
+
+@receiver(post_save, sender=BuildingDetails)
+@receiver(post_save, sender=ApartmentDetails)
+@receiver(post_delete, sender=ApartmentDetails)
+@receiver(post_save, sender=LeaseDetails)
+@receiver(post_delete, sender=LeaseDetails)
+@receiver(post_save, sender=ParkingDetails)
+@receiver(post_delete, sender=ParkingDetails)
+def refresh_building_stats(sender, instance, using, **kwargs):
+    """
+    Recompute the stats of the building of the saved or deleted row once the transaction commits.
+    Only on the databases without the triggers maintaining them (PostgreSQL has them).
+    """
+    if connections[using].vendor == "postgresql":
+        return
+    if sender is BuildingDetails:
+        building_number = instance.pk
+    elif sender is LeaseDetails and LeaseDetails.apartment.is_cached(instance):
+        building_number = instance.apartment.building_number_id
+    elif sender is LeaseDetails:
+        building_number = ApartmentDetails.all_objects.using(using).filter(
+            pk=instance.apartment_id
+        ).values_list("building_number", flat=True).first()
+    else:
+        building_number = instance.building_number_id
+    transaction.on_commit(lambda: BuildingStats.rebuild([building_number], using=using), using=using)
+
+
+@receiver(post_save, sender=ApartmentDetails)
+@receiver(post_save, sender=LeaseDetails)
+@receiver(post_save, sender=Tenant)
+@receiver(post_save, sender=ParkingDetails)
+def record_saved_changes(sender, instance, created, update_fields, using, **kwargs):
+    """
+    Log the fields changed by the save (see ChangeLog), diffed against the values the row
+    was loaded or last saved with.
+    """
+    action = ChangeLog.CREATE if created else ChangeLog.UPDATE
+    changes = instance.get_change_log_changes(action, update_fields)
+    if changes:
+        ChangeLog.record([(sender, instance.pk, action, changes)], using)
+    instance.remember_change_log_state()
+
+
+@receiver(post_delete, sender=ApartmentDetails)
+@receiver(post_delete, sender=LeaseDetails)
+@receiver(post_delete, sender=Tenant)
+@receiver(post_delete, sender=ParkingDetails)
+def record_deletion(sender, instance, using, **kwargs):
+    """
+    Log the values of the deleted row (see ChangeLog).
+    """
+    ChangeLog.record([(sender, instance.pk, ChangeLog.DELETE, instance.get_change_log_changes(ChangeLog.DELETE))], using)
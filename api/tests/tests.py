@@ -1,3 +1,1359 @@
-from django.test import TestCase
+import io
+import json
+import os
+import threading
+from base64 import urlsafe_b64encode
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import DatabaseError, OperationalError, connection, transaction
+from django.db.models import FloatField
+from django.db.models.functions import Cast
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from psycopg2 import OperationalError as DriverOperationalError, extensions
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.models import (
+    ApartmentDetails, BuildingDetails, BuildingStats, ChangeLog, LeaseDetails, ParkingDetails, Tenant, UserData
+)
+from api.restful.serializers import (
+    ApartmentDetailsSerializer, BuildingDetailsSerializer, LeaseDetailsSerializer, ParkingDetailsSerializer,
+    TenantSerializer, UserSerializer,
+)
+from api.restful.viewsets import ApartmentDetailsViewSet, BookApartmentViewSet
+from api.restful.viewsets.query_budget import QueryBudgetExceeded
+from api.utils.utils import SnowflakeGenerator
+from bma_backend.authentication import CachedJWTAuthentication, CustomAuthBackend
+from bma_backend.db.postgresql import pool as connection_pool
+from bma_backend.renderers import ORJSONRenderer
+from bma_backend.response_cache import invalidate_cached_responses
+
+
+def create_building(building_number="10", **kwargs):
+    data = {
+        "building_number": building_number,
+        "street_name": "Main Street",
+        "city": "Cincinnati",
+        "state": "OH",
+        "country": "US",
+        "zip_code": "45219",
+        "no_of_floors": 5,
+    }
+    data.update(kwargs)
+    return BuildingDetails.objects.create(**data)
+
+
+def create_apartment(building, **kwargs):
+    data = {
+        "building_number": building,
+        "price": Decimal("1200.00"),
+        "description": "Two bedroom apartment",
+        "floor_number": 1,
+        "stove": "Gas",
+        "laundry": "in_unit",
+    }
+    data.update(kwargs)
+    return ApartmentDetails.objects.create(**data)
+
+
+def create_user(username, **kwargs):
+    data = {
+        "email": f"{username}@example.com",
+        "first_name": username,
+        "last_name": "User",
+        "phone_number": "+1 (513) 123-7890",
+    }
+    data.update(kwargs)
+    return UserData.objects.create(username=username, **data)
+
+
+def create_lease(apartment, *users, **kwargs):
+    data = {
+        "apartment": apartment,
+        "start_date": date.today() + timedelta(days=1),
+        "duration": 12,
+        "rent_amount": apartment.price,
+        "security_deposit": Decimal("500.00"),
+        "additional_charges": Decimal("0.00"),
+        "payment_schedule": "monthly",
+        "lease_status": "not_started",
+    }
+    data.update(kwargs)
+    lease = LeaseDetails.objects.create(**data)
+    for user in users:
+        Tenant.objects.create(
+            lease=lease, user=user, move_in_date=lease.start_date, move_out_date=lease.end_date,
+            application_fee=Decimal("25.00"),
+        )
+    return lease
+
+
+class KeysetPaginationTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(create_user("admin", is_admin=True))
+        building = create_building()
+        self.apartments = [create_apartment(building, floor_number=floor_number) for floor_number in [1, 2]]
+
+    def test_previous_link_of_an_empty_page_stays_on_the_cursor(self):
+        next_link = self.client.get("/api/apartments/?cursor=&limit=1").data["next"]
+        self.apartments[1].soft_delete()
+
+        response = self.client.get(next_link)
+
+        self.assertEqual(response.data["results"], [])
+        self.assertIn("cursor=&", response.data["previous"])
+        self.assertEqual(self.client.get(response.data["previous"]).data["results"][0]["id"], self.apartments[0].pk)
+
+    def traverse(self, url):
+        """
+        Results of the pages from the url on, following the next links.
+        """
+        results = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            results += response.data["results"]
+            url = response.data["next"]
+        return results
+
+    def test_forward_then_backward_traversal(self):
+        building = self.apartments[0].building_number
+        self.apartments += [create_apartment(building, floor_number=3) for _ in range(3)]
+        pages, url = [], "/api/apartments/?cursor=&limit=2"
+        while url:
+            response = self.client.get(url)
+            pages.append([item["id"] for item in response.data["results"]])
+            url, previous = response.data["next"], response.data["previous"]
+        self.assertEqual(sum(pages, []), [apartment.pk for apartment in self.apartments])
+        self.assertEqual([len(page) for page in pages], [2, 2, 1])
+
+        backward = []
+        while previous:
+            response = self.client.get(previous)
+            backward.insert(0, [item["id"] for item in response.data["results"]])
+            previous = response.data["previous"]
+        self.assertEqual(backward, pages[:-1])
+
+    def test_descending_ordering_with_ties(self):
+        building = self.apartments[0].building_number
+        self.apartments += [create_apartment(building, floor_number=floor_number) for floor_number in [1, 2, 1]]
+
+        results = self.traverse("/api/apartments/?cursor=&limit=2&ordering=-floor_number")
+
+        expected = sorted(self.apartments, key=lambda apartment: (-apartment.floor_number, apartment.pk))
+        self.assertEqual([item["id"] for item in results], [apartment.pk for apartment in expected])
+
+    def test_invalid_cursor_is_a_bad_request(self):
+        next_link = self.client.get("/api/apartments/?cursor=&limit=1").data["next"]
+        self.assertEqual(self.client.get(next_link).status_code, status.HTTP_200_OK)
+
+        def cursor(payload):
+            return urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+        for value in [
+            "not a cursor",
+            cursor(["building_number", "apartment_number"]),
+            cursor({"o": [["floor_number", False], ["id", False]], "v": [1, self.apartments[0].pk]}),  # Other ordering
+            cursor({  # Value of another type
+                "o": [["building_number_id", False], ["apartment_number", False], ["id", False]], "v": ["10", "first", 1],
+            }),
+        ]:
+            response = self.client.get("/api/apartments/", {"cursor": value})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, value)
+            self.assertIn("cursor", response.data)
+
+    def test_float_annotation_ordering_with_ties(self):
+        building = self.apartments[0].building_number
+        self.apartments += [create_apartment(building, price=Decimal("1300.00")) for _ in range(3)]
+        queryset = ApartmentDetails.objects.annotate(
+            rank=Cast("price", FloatField()) / 7  # Repeating decimals, tied by the prices
+        ).order_by("-rank")
+
+        with mock.patch.object(ApartmentDetailsViewSet, "queryset", queryset):
+            results = self.traverse("/api/apartments/?cursor=&limit=2")
+
+        expected = sorted(self.apartments, key=lambda apartment: (-apartment.price, apartment.pk))
+        self.assertEqual([item["id"] for item in results], [apartment.pk for apartment in expected])
+
+    def test_unsupported_ordering_is_a_bad_request(self):
+        with mock.patch.object(ApartmentDetailsViewSet, "queryset", ApartmentDetails.objects.order_by("?")):
+            response = self.client.get("/api/apartments/?cursor=")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class BookApartmentTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(create_user("booker"))
+        self.building = create_building()
+
+    def book(self, apartment, users):
+        return self.client.post("/api/bookapartment/", {
+            "apartment": apartment.pk,
+            "start_date": str(date.today() + timedelta(days=1)),
+            "duration": 12,
+            "rent_amount": str(apartment.price),
+            "security_deposit": "500.00",
+            "additional_charges": "0.00",
+            "payment_schedule": "monthly",
+            "tenants_list": [
+                {
+                    "first_name": user.first_name,
+                    "last_name": user.last_name,
+                    "email": user.email,
+                    "application_fee": "25.00",
+                } for user in users
+            ],
+        }, format="json")
+
+    def test_booking_creates_tenants(self):
+        apartment = create_apartment(self.building)
+        users = [create_user(f"tenant{i}") for i in range(3)]
+
+        response = self.book(apartment, users)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        self.assertEqual(Tenant.objects.filter(lease__apartment=apartment).count(), 3)
+        self.assertEqual(UserData.objects.filter(is_tenant=True).count(), 3)
+        apartment.refresh_from_db()
+        self.assertFalse(apartment.is_available)
+
+    def test_booking_rejects_active_tenant(self):
+        users = [create_user(f"tenant{i}") for i in range(2)]
+        self.assertEqual(
+            self.book(create_apartment(self.building), users).status_code, status.HTTP_201_CREATED
+        )
+
+        response = self.book(create_apartment(self.building, floor_number=2), users[1:])
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_booking_rejects_rent_of_another_apartment(self):
+        apartment = create_apartment(self.building)
+        create_apartment(self.building, floor_number=2, price=Decimal("900.00"))
+        apartment.price = Decimal("900.00")
+
+        response = self.book(apartment, [create_user("tenant")])
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("rent_amount", response.data)
+
+    @staticmethod
+    def database_error(pgcode):
+        # As raised by Django, wrapping the error of the driver
+        cause = Exception()
+        cause.pgcode = pgcode
+        error = OperationalError()
+        error.__cause__ = cause
+        return error
+
+    def test_locked_apartment_is_a_conflict(self):
+        apartment = create_apartment(self.building)
+        error = self.database_error("55P03")  # lock_not_available
+
+        with mock.patch.object(ApartmentDetails.objects, "select_for_update", side_effect=error):
+            response = self.book(apartment, [create_user("tenant")])
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+    def test_other_database_errors_are_not_conflicts(self):
+        apartment = create_apartment(self.building)
+        error = self.database_error("57014")  # query_canceled (statement timeout)
+
+        with mock.patch.object(ApartmentDetails.objects, "select_for_update", side_effect=error):
+            with self.assertRaises(OperationalError):
+                self.book(apartment, [create_user("tenant")])
+
+    def test_booking_query_count_is_independent_of_tenants(self):
+        # Cached by the first change log write
+        ContentType.objects.get_for_models(ApartmentDetails, LeaseDetails, Tenant)
+        query_counts = []
+        # Authenticated with a JWT whose user isn't cached, the lookup counts in the budget
+        self.client.force_authenticate(None)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(create_user('booker2'))}")
+        for floor_number, tenants_count in [(1, 1), (2, 5)]:
+            apartment = create_apartment(self.building, floor_number=floor_number)
+            users = [create_user(f"tenant{floor_number}_{i}") for i in range(tenants_count)]
+            cache.clear()
+            with CaptureQueriesContext(connection) as queries:
+                response = self.book(apartment, users)
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+            query_counts.append(len(queries))
+
+        self.assertEqual(query_counts[0], query_counts[1])
+        self.assertEqual(query_counts[1], BookApartmentViewSet.query_budgets["create"])
+
+
+class SnowflakeTests(TestCase):
+
+    def test_ids_embed_the_worker_id(self):
+        generator = SnowflakeGenerator()
+        self.assertTrue(0 <= generator.worker_id <= SnowflakeGenerator.MAX_WORKER_ID)
+
+        ids = [generator.next_id() for _ in range(3)]
+        self.assertEqual(ids, sorted(set(ids)))
+        self.assertEqual(
+            {(id >> SnowflakeGenerator.SEQUENCE_BITS) & SnowflakeGenerator.MAX_WORKER_ID for id in ids},
+            {generator.worker_id},
+        )
+
+
+class ApartmentNumberTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(create_user("admin", is_admin=True))
+        self.building = create_building()
+
+    def apartment_data(self, floor_number):
+        return {
+            "building_number": self.building.building_number,
+            "price": "1200.00",
+            "description": "Two bedroom apartment",
+            "is_available": True,
+            "dishwasher": False,
+            "microwave": False,
+            "carpet": False,
+            "refrigerator": False,
+            "air_condition": False,
+            "bedrooms": 2,
+            "bathrooms": 1,
+            "closets": 1,
+            "floor_number": floor_number,
+            "no_of_occupants": 2,
+            "stove": "Gas",
+            "laundry": "in_unit",
+            "pets": False,
+            "smoking": False,
+        }
+
+    def test_apartment_numbers_continue_per_floor(self):
+        self.assertEqual(create_apartment(self.building, floor_number=1).apartment_number, 101)
+        self.assertEqual(create_apartment(self.building, floor_number=2).apartment_number, 201)
+
+        response = self.client.post(
+            "/api/apartments/", [self.apartment_data(1), self.apartment_data(2), self.apartment_data(1)],
+            format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        self.assertEqual([item["apartment_number"] for item in response.data], [102, 202, 103])
+        self.assertEqual(create_apartment(self.building, floor_number=1).apartment_number, 104)
+
+    def test_apartment_numbers_are_allocated_per_building(self):
+        other_building = create_building("20")
+        self.assertEqual(create_apartment(self.building, floor_number=1).apartment_number, 101)
+        self.assertEqual(create_apartment(other_building, floor_number=1).apartment_number, 101)
+
+        response = self.client.post(
+            "/api/apartments/", [self.apartment_data(1), {**self.apartment_data(1), "building_number": "20"}],
+            format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        self.assertEqual([item["apartment_number"] for item in response.data], [102, 102])
+
+        upload = SimpleUploadedFile("apartments.csv", (
+            "building_number,price,description,floor_number,stove,laundry\n"
+            "10,1200.00,Corner unit,1,Gas,in_unit\n"
+            "20,1200.00,Corner unit,1,Gas,in_unit\n"
+        ).encode())
+        response = self.client.post("/api/apartments/import/", {"file": upload}, format="multipart")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        self.assertEqual(response.data["created"], 2)
+
+        self.assertEqual(
+            list(ApartmentDetails.objects.values_list("building_number", "apartment_number")),
+            [("10", 101), ("10", 102), ("10", 103), ("20", 101), ("20", 102), ("20", 103)],
+        )
+
+    def test_bulk_create_query_count_is_independent_of_size(self):
+        ContentType.objects.get_for_model(ApartmentDetails)  # Cached by the first change log write
+        query_counts = []
+        for floor_number, apartments_count in [(1, 2), (2, 20)]:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post(
+                    "/api/apartments/", [self.apartment_data(floor_number)] * apartments_count, format="json"
+                )
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+            query_counts.append(len(queries))
+
+        self.assertEqual(query_counts[0], query_counts[1])
+
+
+class ExportTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(create_user("admin", is_admin=True))
+        building = create_building()
+        for floor_number in [1, 1, 2]:
+            create_apartment(building, floor_number=floor_number)
+
+    def test_csv_export_applies_filters(self):
+        response = self.client.get("/api/apartments/export/?floor_number=1")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertIn("apartment_number", lines[0].split(","))
+        self.assertNotIn("audit_status", lines[0].split(","))
+
+    def test_ndjson_export(self):
+        response = self.client.get("/api/apartments/export/?export_format=ndjson&ordering=-apartment_number")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rows = [json.loads(line) for line in b"".join(response.streaming_content).decode().splitlines()]
+        self.assertEqual([row["apartment_number"] for row in rows], [201, 102, 101])
+        self.assertEqual(rows[0]["price"], "1200.00")
+
+    def test_users_export_requires_admin(self):
+        self.client.force_authenticate(create_user("tenant"))
+
+        response = self.client.get("/api/users/export/")
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_export_requires_admin(self):
+        self.client.force_authenticate(None)
+        for url in ["/api/apartments/", "/api/parkings/"]:
+            self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)  # The lists are public
+            self.assertEqual(self.client.get(f"{url}export/").status_code, status.HTTP_403_FORBIDDEN)
+
+
+class ImportTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(create_user("admin", is_admin=True))
+        self.building = create_building()
+
+    def test_apartment_import_reports_invalid_rows(self):
+        upload = SimpleUploadedFile("apartments.csv", (
+            "building_number,price,description,floor_number,stove,laundry,pets\n"
+            "10,1200.00,Corner unit,1,Gas,in_unit,true\n"
+            "99,1200.00,Unknown building,1,Gas,in_unit,false\n"
+            "10,1100.00,Second unit,1,Wood,in_unit,false\n"
+            "10,1000.00,Second floor,2,Electric,floor,no\n"
+        ).encode())
+
+        response = self.client.post("/api/apartments/import/", {"file": upload}, format="multipart")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        self.assertEqual(response.data["created"], 2)
+        self.assertEqual([error["row"] for error in response.data["errors"]], [2, 3])
+        self.assertEqual(
+            list(ApartmentDetails.objects.values_list("apartment_number", "pets")), [(101, True), (201, False)]
+        )
+
+    def test_import_requires_admin(self):
+        self.client.force_authenticate(create_user("tenant"))
+        upload = SimpleUploadedFile("buildings.csv", b"building_number\n11\n")
+
+        response = self.client.post("/api/buildings/import/", {"file": upload}, format="multipart")
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class FuzzySearchTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(create_user("admin", is_admin=True))
+        create_user("jsmith", first_name="John", last_name="Smith")
+        create_user("mjones", first_name="Mary", last_name="Jones")
+
+    def test_fuzzy_lookup(self):
+        response = self.client.get("/api/users/?fuzzy=smith")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([user["username"] for user in response.data["results"]], ["jsmith"])
+
+    def test_invalid_similarity(self):
+        response = self.client.get("/api/users/?fuzzy=smith&similarity=2")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class AuthenticationTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = create_user("tenant")
+        self.user.set_password("secret-password")
+        self.user.save()
+
+    def login(self):
+        response = APIClient().post(
+            "/api/login/", {"username": "tenant", "password": "secret-password"}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return AccessToken(response.data["access"])
+
+    def test_login_resolves_user_in_one_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            user = CustomAuthBackend().authenticate(None, username="tenant", password="secret-password")
+
+        self.assertEqual(user, self.user)
+        self.assertEqual(len(queries), 1)
+
+    def test_cached_user_is_invalidated_on_save(self):
+        token = self.login()
+        authentication = CachedJWTAuthentication()
+        self.assertEqual(authentication.get_user(token), self.user)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(authentication.get_user(token).first_name, "tenant")
+        self.assertEqual(len(queries), 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.first_name = "Renamed"
+            self.user.save()
+        self.assertEqual(authentication.get_user(token).first_name, "Renamed")
+
+    def test_deactivated_user_is_rejected(self):
+        token = self.login()
+        CachedJWTAuthentication().get_user(token)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+
+        response = APIClient().get("/api/apartments/", HTTP_AUTHORIZATION=f"Bearer {token}")
+        # 403 rather than 401 as SessionAuthentication comes first and has no WWW-Authenticate header
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(response.data["code"], "user_inactive")
+
+
+class AsyncReadTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(create_user("admin", is_admin=True))
+        building = create_building()
+        self.apartments = [create_apartment(building, floor_number=floor_number) for floor_number in [1, 1, 2]]
+
+    def test_async_list_matches_sync_list(self):
+        for query in ["?floor_number=1", "?cursor=&limit=2&ordering=-apartment_number"]:
+            response = self.client.get(f"/api/apartments/{query}")
+            async_response = self.client.get(f"/api/async/apartments/{query}")
+
+            self.assertEqual(async_response.status_code, status.HTTP_200_OK)
+            self.assertEqual(async_response.data["results"], response.data["results"])
+
+    def test_async_retrieve(self):
+        response = self.client.get(f"/api/async/apartments/{self.apartments[1].pk}/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["apartment_number"], 102)
+
+        response = self.client.get("/api/async/apartments/999/")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_async_list_checks_permissions(self):
+        self.client.force_authenticate(create_user("tenant"))
+
+        response = self.client.get("/api/async/buildings/")
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class MetricsTests(TestCase):
+
+    def setUp(self):
+        self.user = create_user("admin", is_admin=True)
+        create_apartment(create_building())
+
+    @override_settings(METRICS_ENABLED=True)
+    def test_request_metrics_are_exposed(self):
+        client = APIClient()  # Loads the middleware with the overridden settings
+        client.force_authenticate(self.user)
+
+        self.assertEqual(client.get("/api/apartments/").status_code, status.HTTP_200_OK)
+        response = client.get("/metrics")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        labels = 'action="list",method="GET",view="ApartmentDetailsViewSet"'
+        metrics = response.content.decode()
+        self.assertIn(f"bma_request_duration_seconds_count{{{labels}}}", metrics)
+        self.assertIn(f"bma_request_sql_queries_count{{{labels}}}", metrics)
+        self.assertIn('bma_requests_total{action="list",method="GET",status="200",view="ApartmentDetailsViewSet"}', metrics)
+
+    def test_metrics_disabled(self):
+        response = self.client.get("/metrics")
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+@override_settings(QUERY_BUDGET_MODE="raise")
+class UserPermissionTests(TestCase):
+
+    def setUp(self):
+        self.user = create_user("tenant")
+        self.other_user = create_user("neighbour")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_self_details_are_fetched_once(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(f"/api/users/{self.user.id}/")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["username"], "tenant")
+        self.assertEqual(len(queries), 1)
+
+    def test_self_update(self):
+        response = self.client.patch(f"/api/users/{self.user.id}/", {"city": "Dayton"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.patch(f"/api/users/{self.user.id}/", {"is_admin": True}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_other_users_are_forbidden(self):
+        self.assertEqual(
+            self.client.get(f"/api/users/{self.other_user.id}/").status_code, status.HTTP_403_FORBIDDEN
+        )
+        self.assertEqual(self.client.get("/api/users/").status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(self.client.get("/api/users/999/").status_code, status.HTTP_404_NOT_FOUND)
+
+
+@override_settings(QUERY_BUDGET_MODE="raise")
+class QueryBudgetTests(TestCase):
+
+    LIST_URLS = ["/api/users/", "/api/buildings/", "/api/apartments/", "/api/tenants/", "/api/parkings/", "/api/leases/"]
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(create_user("admin", is_admin=True))
+        self.building = create_building()
+        for index in range(5):
+            apartment = create_apartment(self.building)
+            ParkingDetails.objects.create(building_number=self.building, parking_type="covered")
+            create_lease(apartment, create_user(f"tenant{index}"))
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, url)
+        return len(queries)
+
+    def test_list_query_count_is_independent_of_page_size(self):
+        for url in self.LIST_URLS:
+            with self.subTest(url=url):
+                self.assertEqual(self.count_queries(f"{url}?limit=1"), self.count_queries(f"{url}?limit=5"))
+                self.assertEqual(
+                    self.count_queries(f"{url}?cursor=&limit=1"), self.count_queries(f"{url}?cursor=&limit=5")
+                )
+
+    def test_parking_bulk_create_query_count_is_independent_of_size(self):
+        ContentType.objects.get_for_model(ParkingDetails)  # Cached by the first change log write
+        query_counts = []
+        for parkings_count in [1, 5]:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post("/api/parkings/", [{
+                    "building_number": self.building.building_number,
+                    "parking_type": "garage",
+                    "parking_status": "available",
+                }] * parkings_count, format="json")
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+            query_counts.append(len(queries))
+
+        self.assertEqual(query_counts[0], query_counts[1])
+
+    def test_exceeded_budget_raises(self):
+        with mock.patch.object(ApartmentDetailsViewSet, "query_budgets", {"list": 1}):
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.get("/api/apartments/")
+
+    @override_settings(QUERY_BUDGET_MODE="log")
+    def test_exceeded_budget_is_logged(self):
+        with mock.patch.object(ApartmentDetailsViewSet, "query_budgets", {"list": 1}):
+            with self.assertLogs("api.restful.viewsets.query_budget", "WARNING") as logs:
+                response = self.client.get("/api/apartments/")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("ApartmentDetailsViewSet.list ran 2 queries (budget 1)", logs.output[0])
+
+
+class CompiledRepresentationTests(TestCase):
+
+    def test_compiled_representation_renders_the_same_json(self):
+        building = create_building()
+        apartment = create_apartment(building)
+        create_apartment(building, floor_number=2, price=Decimal("999.99"), pets=True)
+        ParkingDetails.objects.create(building_number=building, parking_type="covered")
+        ParkingDetails.objects.create(building_number=building, apartment=apartment, parking_type="garage")
+        create_lease(apartment, create_user("tenant", country=""), lease_notes="Corner unit")
+
+        for serializer_class in [
+            ApartmentDetailsSerializer, BuildingDetailsSerializer, LeaseDetailsSerializer,
+            ParkingDetailsSerializer, TenantSerializer, UserSerializer,
+        ]:
+            with self.subTest(serializer=serializer_class.__name__):
+                instances = list(serializer_class.Meta.model.objects.all())
+                default_class = type("DefaultSerializer", (serializer_class,), {"compiled_representation": False})
+
+                self.assertEqual(
+                    JSONRenderer().render(serializer_class(instances, many=True).data),
+                    JSONRenderer().render(default_class(instances, many=True).data),
+                )
+
+
+class ORJSONRendererTests(TestCase):
+
+    def setUp(self):
+        self.admin = create_user("admin", is_admin=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_renders_the_same_json_as_json_renderer(self):
+        building = create_building()
+        apartment = create_apartment(building, description="Line\u2028separator, caf\u00e9")
+        create_lease(apartment, create_user("tenant", country="US"))
+
+        for serializer_class in [ApartmentDetailsSerializer, LeaseDetailsSerializer, TenantSerializer, UserSerializer]:
+            with self.subTest(serializer=serializer_class.__name__):
+                data = {
+                    "count": 1, "next": None,
+                    "results": serializer_class(serializer_class.Meta.model.objects.all(), many=True).data,
+                }
+                self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_parses_request_bodies(self):
+        building = create_building()
+
+        response = self.client.patch(
+            f"/api/buildings/{building.pk}/", data='{"city": "Dayton"}', content_type="application/json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["city"], "Dayton")
+
+        response = self.client.patch(
+            f"/api/buildings/{building.pk}/", data='{"city": ', content_type="application/json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("JSON parse error", response.json()["detail"])
+
+
+class BuildingStatsTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(create_user("admin", is_admin=True))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.building = create_building()
+            self.apartment = create_apartment(self.building)
+            create_apartment(self.building, floor_number=2, is_available=False)
+            create_lease(self.apartment, lease_status="started")
+            create_lease(self.apartment, rent_amount=Decimal("900.00"), lease_status="terminated")
+            ParkingDetails.objects.create(building_number=self.building, parking_type="covered")
+            ParkingDetails.objects.create(
+                building_number=self.building, apartment=self.apartment, parking_type="garage",
+                parking_status="occupied",
+            )
+
+    def test_building_stats(self):
+        response = self.client.get(f"/api/buildings/{self.building.pk}/stats/")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), {
+            "building_number": "10", "apartment_count": 2, "available_apartment_count": 1,
+            "occupied_apartment_count": 1, "occupancy_rate": 0.5, "vacancy_rate": 0.5, "active_lease_count": 1,
+            "rent_roll": "1200.00", "parking_count": 2, "available_parking_count": 1, "reserved_parking_count": 0,
+            "occupied_parking_count": 1, "parking_utilization": 0.5,
+        })
+        self.assertEqual(BuildingStats.check_consistency(), {})
+
+    def test_portfolio_stats_query_count_is_independent_of_rows(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            create_building("20")
+            create_apartment(BuildingDetails.objects.get(pk="20"), floor_number=3)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/api/buildings/stats/")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(response.json()["building_count"], 2)
+        self.assertEqual(response.json()["totals"]["apartment_count"], 3)
+        self.assertEqual(response.json()["totals"]["available_apartment_count"], 2)
+        self.assertEqual(response.json()["totals"]["rent_roll"], "1200.00")
+
+    def test_stats_follow_the_changes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.apartment.is_available = False
+            self.apartment.save()
+            ParkingDetails.objects.filter(parking_status="available").get().delete()
+
+        stats = BuildingStats.objects.get(pk=self.building.pk)
+        self.assertEqual((stats.available_apartment_count, stats.parking_count), (0, 1))
+        self.assertEqual(BuildingStats.check_consistency(), {})
+
+    def test_check_and_rebuild(self):
+        BuildingStats.objects.filter(pk=self.building.pk).update(apartment_count=5)
+
+        self.assertEqual(BuildingStats.check_consistency(), {"10": {"apartment_count": (5, 2)}})
+        with self.assertRaises(CommandError):
+            call_command("check_building_stats", stderr=io.StringIO())
+        call_command("check_building_stats", "--fix", stdout=io.StringIO(), stderr=io.StringIO())
+        self.assertEqual(BuildingStats.check_consistency(), {})
+
+
+class ResponseCacheTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(create_user("tenant"))
+        self.building = create_building()
+        self.apartment = create_apartment(self.building)
+
+    def test_cached_response_runs_no_query(self):
+        response = self.client.get("/api/apartments/?limit=10&pets=false")
+        self.assertEqual(response["X-Cache"], "MISS")
+
+        with CaptureQueriesContext(connection) as queries:
+            cached = self.client.get("/api/apartments/?pets=false&limit=10")
+
+        self.assertEqual(cached["X-Cache"], "HIT")
+        self.assertEqual(len(queries), 0)
+        self.assertEqual(cached.json(), response.json())
+
+    def test_cached_responses_are_keyed_by_role(self):
+        self.client.get(f"/api/buildings/{self.building.pk}/")  # Forbidden, not cached
+        admin = APIClient()
+        admin.force_authenticate(create_user("admin", is_admin=True))
+        self.assertEqual(admin.get(f"/api/buildings/{self.building.pk}/")["X-Cache"], "MISS")
+        self.assertEqual(admin.get(f"/api/buildings/{self.building.pk}/")["X-Cache"], "HIT")
+
+        self.assertEqual(
+            self.client.get(f"/api/buildings/{self.building.pk}/").status_code, status.HTTP_403_FORBIDDEN
+        )
+
+    def test_changes_invalidate_the_cached_responses(self):
+        self.client.get("/api/apartments/")
+
+        self.apartment.price = Decimal("1500.00")
+        self.apartment.save()
+        response = self.client.get("/api/apartments/")
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.json()["results"][0]["price"], "1500.00")
+
+        admin = APIClient()
+        admin.force_authenticate(create_user("admin", is_admin=True))
+        response = admin.post("/api/apartments/", [{
+            "building_number": self.building.pk, "price": "900.00", "description": "Studio", "floor_number": 2,
+            "is_available": True, "dishwasher": False, "microwave": False, "carpet": False, "refrigerator": True,
+            "air_condition": False, "bedrooms": 0, "bathrooms": 1, "closets": 1, "no_of_occupants": 1,
+            "stove": "Electric", "laundry": "floor", "pets": False, "smoking": False,
+        }], format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        response = self.client.get("/api/apartments/")
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.json()["count"], 2)
+
+        self.building.city = "Dayton"
+        self.building.save()
+        self.assertEqual(self.client.get("/api/apartments/")["X-Cache"], "MISS")
+
+    def test_stale_response_is_served_while_revalidating(self):
+        self.client.get("/api/apartments/")
+        ApartmentDetails.objects.filter(pk=self.apartment.pk).update(price=Decimal("1500.00"))
+        invalidate_cached_responses(ApartmentDetails)
+
+        with mock.patch.object(cache, "add", return_value=False):  # Another request holds the lock
+            response = self.client.get("/api/apartments/")
+        self.assertEqual(response["X-Cache"], "STALE")
+        self.assertEqual(response.json()["results"][0]["price"], "1200.00")
+
+        response = self.client.get("/api/apartments/")
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.json()["results"][0]["price"], "1500.00")
+
+
+@override_settings(QUERY_BUDGET_MODE="off")  # The savepoint of the If-Match updates counts in the tests
+class ConditionalRequestTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(create_user("admin", is_admin=True))
+        self.building = create_building()
+        ParkingDetails.objects.create(building_number=self.building, parking_type="covered")
+
+    def test_unchanged_list_is_not_modified(self):
+        response = self.client.get("/api/parkings/?limit=10")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("Last-Modified", response)
+
+        with CaptureQueriesContext(connection) as queries:
+            not_modified = self.client.get("/api/parkings/?limit=10", HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(not_modified["ETag"], response["ETag"])
+        self.assertEqual(len(queries), 1)  # The validators, no count, page nor serialization
+
+        self.assertEqual(
+            self.client.get("/api/parkings/?limit=5", HTTP_IF_NONE_MATCH=response["ETag"]).status_code,
+            status.HTTP_200_OK,
+        )
+        ParkingDetails.objects.create(building_number=self.building, parking_type="garage")
+        changed = self.client.get("/api/parkings/?limit=10", HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(changed.status_code, status.HTTP_200_OK)
+        self.assertEqual(changed.json()["count"], 2)
+
+    def test_keyset_list_is_validated_without_aggregate(self):
+        ParkingDetails.objects.create(building_number=self.building, parking_type="garage")
+        url = "/api/parkings/?cursor=&limit=1"
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse([query for query in queries if "COUNT(" in query["sql"] or "MAX(" in query["sql"]])
+
+        with CaptureQueriesContext(connection) as queries:
+            not_modified = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(len(queries), 1)  # The page, no serialization
+
+        ParkingDetails.objects.filter(pk=response.json()["results"][0]["parking_number"]).update(parking_type="uncovered")
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"]).status_code, status.HTTP_200_OK)
+
+    def test_unchanged_instance_is_not_modified(self):
+        url = f"/api/buildings/{self.building.pk}/"
+        response = self.client.get(url)
+
+        self.assertEqual(
+            self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"]).status_code, status.HTTP_304_NOT_MODIFIED
+        )
+        self.assertEqual(
+            self.client.get(url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]).status_code,
+            status.HTTP_304_NOT_MODIFIED,
+        )
+
+    def test_cached_response_is_not_modified(self):
+        apartment = create_apartment(self.building)
+        url = f"/api/apartments/{apartment.pk}/"
+        response = self.client.get(url)
+
+        with CaptureQueriesContext(connection) as queries:
+            not_modified = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(len(queries), 0)
+
+    def test_update_with_outdated_etag_fails(self):
+        url = f"/api/buildings/{self.building.pk}/"
+        etag = self.client.get(url)["ETag"]
+
+        response = self.client.patch(url, {"city": "Dayton"}, format="json", HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+        response = self.client.patch(url, {"city": "Columbus"}, format="json", HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.building.refresh_from_db()
+        self.assertEqual(self.building.city, "Dayton")
+
+
+@override_settings(SYNC_SETTLE_SECONDS=0)
+class SyncTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(create_user("admin", is_admin=True))
+        self.building = create_building()
+        self.apartments = [create_apartment(self.building, floor_number=floor) for floor in range(1, 4)]
+
+    def test_sync_resumes_after_the_last_change(self):
+        response = self.client.get("/api/apartments/sync/?limit=2")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.json()["has_more"])
+        self.assertEqual(
+            [row["id"] for row in response.json()["results"]],
+            [apartment.pk for apartment in self.apartments[:2]],
+        )
+
+        response = self.client.get(response.json()["next"])
+        self.assertFalse(response.json()["has_more"])
+        self.assertEqual([row["id"] for row in response.json()["results"]], [self.apartments[2].pk])
+
+        # Nothing changed since, the next link stays valid
+        next_url = response.json()["next"]
+        response = self.client.get(next_url)
+        self.assertEqual((response.json()["results"], response.json()["next"]), ([], next_url))
+
+        self.apartments[0].price = Decimal("1500.00")
+        self.apartments[0].save()
+        self.apartments[1].audit_status = "deleted"
+        self.apartments[1].save()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(next_url)
+        self.assertEqual([row["price"] for row in response.json()["results"]], ["1500.00"])
+        self.assertEqual(response.json()["deleted"], [self.apartments[1].pk])
+        self.assertEqual(len(queries), 1)
+
+    def test_sync_since_watermark(self):
+        watermark = self.apartments[2].modified_on
+        ParkingDetails.objects.create(building_number=self.building, parking_type="covered")
+
+        response = self.client.get("/api/parkings/sync/", {"modified_since": watermark.isoformat()})
+        self.assertEqual(len(response.json()["results"]), 1)
+        response = self.client.get("/api/apartments/sync/", {"modified_since": watermark.isoformat()})
+        self.assertEqual(response.json()["results"], [])
+
+        response = self.client.get("/api/apartments/sync/", {"modified_since": "yesterday"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(SYNC_SETTLE_SECONDS=60)
+    def test_sync_holds_back_recent_changes(self):
+        response = self.client.get("/api/buildings/sync/")
+
+        self.assertEqual(response.json()["results"], [])
+
+
+@override_settings(SYNC_SETTLE_SECONDS=0)
+class SoftDeleteTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(create_user("admin", is_admin=True))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.building = create_building()
+            self.apartments = [create_apartment(self.building, floor_number=floor) for floor in range(1, 4)]
+
+    def test_soft_deleted_rows_leave_the_lists(self):
+        self.client.get("/api/apartments/")  # Cached
+        with self.captureOnCommitCallbacks(execute=True):
+            self.apartments[0].soft_delete()
+
+        response = self.client.get("/api/apartments/")
+        self.assertEqual(response.json()["count"], 2)
+        response = self.client.get(f"/api/apartments/{self.apartments[0].pk}/")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.building.apartments.count(), 2)
+        self.assertEqual(ApartmentDetails.all_objects.count(), 3)
+        self.assertEqual(BuildingStats.objects.get(pk=self.building.pk).apartment_count, 2)
+
+        response = self.client.get("/api/apartments/sync/")
+        self.assertEqual(len(response.json()["results"]), 2)
+        self.assertEqual(response.json()["deleted"], [self.apartments[0].pk])
+
+    def test_queryset_soft_delete(self):
+        self.client.get("/api/apartments/")  # Cached
+        user = UserData.objects.get(username="admin")
+
+        marked = ApartmentDetails.objects.filter(floor_number__gte=2).soft_delete(user)
+
+        self.assertEqual(marked, 2)
+        self.assertEqual(self.client.get("/api/apartments/").json()["count"], 1)
+        self.assertEqual(
+            set(ApartmentDetails.all_objects.filter(audit_status="deleted").values_list("modified_by", flat=True)),
+            {user.pk},
+        )
+
+    def test_soft_deleted_building_number_cannot_be_created_again(self):
+        self.building.soft_delete()
+        data = {
+            "building_number": self.building.pk, "street_name": "Main Street", "city": "Cincinnati", "state": "OH",
+            "country": "US", "zip_code": "45219", "no_of_floors": 5,
+        }
+
+        response = self.client.post("/api/buildings/", data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("building_number", response.data)
+        data["building_number"] = "20"
+        self.assertEqual(self.client.post("/api/buildings/", data, format="json").status_code, status.HTTP_201_CREATED)
+
+    def test_inactive_rows_are_hidden(self):
+        ApartmentDetails.objects.filter(pk=self.apartments[1].pk).update(audit_status="inactive")
+
+        self.assertEqual(
+            list(ApartmentDetails.objects.values_list("pk", flat=True)),
+            [self.apartments[0].pk, self.apartments[2].pk],
+        )
+        self.assertEqual(ApartmentDetails.all_objects.active().count(), 2)
+
+
+class ChangeLogTests(TestCase):
+
+    def setUp(self):
+        self.admin = create_user("admin", is_admin=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        self.building = create_building()
+        self.apartment = create_apartment(self.building)
+
+    def history(self, instance):
+        return [
+            (entry.action, entry.changes, entry.changed_by_id)
+            for entry in ChangeLog.objects.filter(object_id=str(instance.pk)).order_by("id")
+        ]
+
+    def test_request_changes_are_logged_by_the_request_user(self):
+        apartment = ApartmentDetails.objects.get(pk=self.apartment.pk)
+        # Written in the transaction of the request, not once it commits
+        response = self.client.patch(
+            f"/api/apartments/{apartment.pk}/", {"price": "1300.00", "pets": True}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.assertEqual(self.history(apartment), [
+            ("update", {"price": ["1200.00", "1300.00"], "pets": [False, True]}, self.admin.pk),
+        ])
+        apartment.refresh_from_db()
+        self.assertEqual((apartment.created_by_id, apartment.modified_by_id), (None, self.admin.pk))
+
+    def test_buffered_entries_are_written_with_one_insert(self):
+        apartments = [ApartmentDetails.objects.get(pk=self.apartment.pk)]
+        with self.captureOnCommitCallbacks(execute=True):
+            apartments += [create_apartment(self.building, floor_number=floor) for floor in (2, 3)]
+
+        with CaptureQueriesContext(connection) as queries, self.captureOnCommitCallbacks(execute=True):
+            with ChangeLog.buffered():
+                for apartment in apartments:
+                    apartment.is_available = False
+                    apartment.save()
+
+        inserts = [query for query in queries.captured_queries if query["sql"].startswith('INSERT INTO "api_changelog"')]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(ChangeLog.objects.filter(action="update").count(), 3)
+
+    def test_failed_change_log_insert_rolls_the_write_back(self):
+        def fail_change_log_insert(execute, sql, params, many, context):
+            if sql.startswith('INSERT INTO "api_changelog"'):
+                raise DatabaseError("Change log insert failed")
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(fail_change_log_insert):
+            with self.assertRaisesMessage(DatabaseError, "Change log insert failed"), transaction.atomic():
+                self.client.patch(f"/api/apartments/{self.apartment.pk}/", {"price": "1300.00"}, format="json")
+
+        self.apartment.refresh_from_db()
+        self.assertEqual(self.apartment.price, Decimal("1200.00"))
+        self.assertEqual(self.history(self.apartment), [])
+
+    def test_buffered_entries_of_rolled_back_savepoints_are_not_logged(self):
+        with ChangeLog.buffered():
+            try:
+                with transaction.atomic():
+                    self.apartment.price = Decimal("1500.00")
+                    self.apartment.save()
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+            self.apartment.refresh_from_db()
+            self.apartment.pets = True
+            self.apartment.save()
+
+        self.assertEqual(self.history(self.apartment), [("update", {"pets": [False, True]}, None)])
+
+    def test_pending_callbacks_of_the_transaction(self):
+        # ChangeLog.buffered() relies on the on_commit() callbacks kept by Django, a private list
+        def kept():
+            pass
+
+        def rolled_back():
+            pass
+
+        with transaction.atomic():
+            start = len(ChangeLog.pending_callbacks())
+            transaction.on_commit(kept)
+            try:
+                with transaction.atomic():
+                    transaction.on_commit(rolled_back)
+                    raise DatabaseError()
+            except DatabaseError:
+                pass
+            self.assertEqual(ChangeLog.pending_callbacks()[start:], [kept])
+
+    def test_rolled_back_changes_are_not_logged(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    self.apartment.price = Decimal("1500.00")
+                    self.apartment.save()
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+
+        self.assertEqual(self.history(self.apartment), [])
+
+    def test_bulk_operations_are_logged(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            ParkingDetails.objects.bulk_create([
+                ParkingDetails(building_number=self.building, parking_type="covered") for _ in range(2)
+            ])
+            ParkingDetails.objects.filter(parking_status="available").update(parking_status="reserved")
+
+        parking = ParkingDetails.objects.first()
+        history = self.history(parking)
+        self.assertEqual([action for action, _, _ in history], ["create", "update"])
+        self.assertEqual(history[0][1]["parking_status"], [None, "available"])
+        self.assertEqual(history[1][1], {"parking_status": ["available", "reserved"]})
+        self.assertEqual(ChangeLog.objects.count(), 4)
+
+    def test_update_reads_the_rows_in_primary_key_order(self):
+        create_apartment(self.building, floor_number=2)
+        with CaptureQueriesContext(connection) as queries:
+            ApartmentDetails.objects.update(price=Decimal("1300.00"))
+        selects = [query["sql"] for query in queries.captured_queries if query["sql"].startswith("SELECT")]
+        self.assertEqual(len(selects), 1)
+        self.assertTrue(selects[0].endswith('ORDER BY "api_apartmentdetails"."id" ASC'), selects[0])
+
+        # The soft deletes skip the read
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(ApartmentDetails.objects.soft_delete(), 2)
+        self.assertEqual([query["sql"].split()[0] for query in queries.captured_queries], ["UPDATE"])
+
+    def test_entries_are_append_only(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.apartment.soft_delete()
+        entry = ChangeLog.objects.get()
+
+        self.assertEqual(entry.changes, {"audit_status": ["active", "deleted"]})
+        with self.assertRaises(ValueError):
+            entry.save()
+        with self.assertRaises(ValueError):
+            entry.delete()
+
+
+class FakeConnection:
+    """
+    psycopg2 connection as seen by the pool.
+    """
+
+    def __init__(self):
+        self.closed = 0
+        self.broken = False
+        self.info = mock.Mock(transaction_status=extensions.TRANSACTION_STATUS_IDLE)
+
+    def cursor(self):
+        cursor = mock.MagicMock()
+        cursor.__enter__.return_value.execute.side_effect = DriverOperationalError() if self.broken else None
+        return cursor
+
+    def rollback(self):
+        if self.broken:
+            raise DriverOperationalError()
+        self.info.transaction_status = extensions.TRANSACTION_STATUS_IDLE
+
+    def close(self):
+        self.closed = 1
+
+
+class ConnectionPoolTests(SimpleTestCase):
+
+    def setUp(self):
+        self.connections = []
+        self.now = 1000.0
+        clock = mock.patch.object(connection_pool.time, "monotonic", side_effect=lambda: self.now)
+        clock.start()
+        self.addCleanup(clock.stop)
+
+    def connect(self):
+        self.connections.append(FakeConnection())
+        return self.connections[-1]
+
+    def test_returned_connections_are_reused(self):
+        pool = connection_pool.ConnectionPool(self.connect, max_size=2)
+        first, second = pool.getconn(), pool.getconn()
+        pool.putconn(first)
+
+        self.assertIs(pool.getconn(), first)
+        self.assertEqual(len(self.connections), 2)
+        self.assertEqual(pool.get_stats()["in_use"], 2)
+
+    def test_returned_transactions_are_rolled_back(self):
+        pool = connection_pool.ConnectionPool(self.connect, max_size=2)
+        open_transaction, failed_rollback = pool.getconn(), pool.getconn()
+        open_transaction.info.transaction_status = extensions.TRANSACTION_STATUS_INTRANS
+        failed_rollback.info.transaction_status = extensions.TRANSACTION_STATUS_INERROR
+        failed_rollback.broken = True
+
+        pool.putconn(open_transaction)
+        pool.putconn(failed_rollback)
+
+        self.assertEqual(open_transaction.info.transaction_status, extensions.TRANSACTION_STATUS_IDLE)
+        self.assertTrue(failed_rollback.closed)
+        self.assertEqual((pool.size, len(pool.idle)), (1, 1))
+
+    def test_exhausted_pool_times_out(self):
+        pool = connection_pool.ConnectionPool(self.connect, max_size=1, timeout=0)
+        pool.getconn()
+
+        with self.assertRaises(connection_pool.PoolTimeout):
+            pool.getconn()
+        self.assertEqual(pool.get_stats()["timeouts"], 1)
+
+    def test_waiting_checkout_gets_the_returned_connection(self):
+        pool = connection_pool.ConnectionPool(self.connect, max_size=1, timeout=5)
+        connection = pool.getconn()
+        checked_out = []
+        waiter = threading.Thread(target=lambda: checked_out.append(pool.getconn()))
+        waiter.start()
+        while not pool.waiting:
+            waiter.join(0.001)
+
+        pool.putconn(connection)
+        waiter.join()
+
+        self.assertEqual(checked_out, [connection])
+        self.assertEqual(len(self.connections), 1)
+
+    def test_idle_connections_are_reaped_down_to_min_size(self):
+        pool = connection_pool.ConnectionPool(self.connect, min_size=1, max_size=3, max_idle=300)
+        connections = [pool.getconn() for _ in range(3)]
+        for connection in connections:
+            pool.putconn(connection)
+
+        self.now += 299
+        self.assertEqual(pool.get_stats()["idle"], 3)
+        self.now += 2
+        self.assertEqual(pool.get_stats()["idle"], 1)
+        self.assertEqual([connection.closed for connection in connections], [1, 1, 0])  # Oldest returned first
+
+    def test_broken_idle_connection_is_replaced_on_checkout(self):
+        pool = connection_pool.ConnectionPool(self.connect, max_size=1, check_interval=30)
+        connection = pool.getconn()
+        pool.putconn(connection)
+        connection.broken = True
+
+        self.now += 10  # Recently used, not checked
+        self.assertIs(pool.getconn(), connection)
+        pool.putconn(connection)
+
+        self.now += 31
+        replacement = pool.getconn()
+        self.assertIsNot(replacement, connection)
+        self.assertTrue(connection.closed)
+        self.assertEqual(pool.size, 1)
+        self.assertEqual(pool.get_stats()["health_check_failures"], 1)
+
+    def test_forked_process_gets_its_own_pools(self):
+        pool = connection_pool.get_pool(("test", ()), self.connect)
+        self.addCleanup(connection_pool._pools.pop, ("test", ()), None)
+        pool.putconn(pool.getconn())
+
+        read, write = os.pipe()
+        pid = os.fork()
+        if pid == 0:  # Child
+            child_pool = connection_pool.get_pool(("test", ()), self.connect)
+            os.write(write, b"1" if child_pool is not pool and child_pool.size == 0 else b"0")
+            os._exit(0)
+        os.waitpid(pid, 0)
+        os.close(write)
+        self.assertEqual(os.read(read, 1), b"1")
+        os.close(read)
+        # The connections of the parent are closed before forking, never shared with the child
+        self.assertTrue(self.connections[0].closed)
+        self.assertEqual(pool.size, 0)
@@ -12,6 +12,9 @@ from api.restful.viewsets import (
     ParkingDetailsViewSet,
     TenantViewSet,
     BookApartmentViewSet,
+    LeaseDetailsViewSet,
+    DatabasePoolViewSet,
+    AsyncReadView,
 )
 
 # Create a router and register our viewsets with it.
@@ -22,6 +25,8 @@ router.register(r"apartments", ApartmentDetailsViewSet)
 router.register(r"tenants", TenantViewSet)  # TODO
 router.register(r"parkings", ParkingDetailsViewSet)
 router.register(r"bookapartment", BookApartmentViewSet)
+router.register(r"leases", LeaseDetailsViewSet)
+router.register(r"db-pool", DatabasePoolViewSet, basename="db-pool")
 
 schema_view = get_schema_view(
     openapi.Info(
@@ -42,4 +47,25 @@ urlpatterns = [
     path('swagger/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
     path('redoc/', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
     path("login/", UserLoginViewSet.as_view({"post": "create"}), name="login"),
+    # Async variants of the hot read endpoints, served by the async ORM under ASGI
+    path(
+        "async/apartments/",
+        AsyncReadView.as_view(viewset_class=ApartmentDetailsViewSet, action="list"),
+        name="async-apartmentdetails-list",
+    ),
+    path(
+        "async/apartments/<str:pk>/",
+        AsyncReadView.as_view(viewset_class=ApartmentDetailsViewSet, action="retrieve"),
+        name="async-apartmentdetails-detail",
+    ),
+    path(
+        "async/buildings/",
+        AsyncReadView.as_view(viewset_class=BuildingDetailsViewSet, action="list"),
+        name="async-buildingdetails-list",
+    ),
+    path(
+        "async/parkings/",
+        AsyncReadView.as_view(viewset_class=ParkingDetailsViewSet, action="list"),
+        name="async-parkingdetails-list",
+    ),
 ]
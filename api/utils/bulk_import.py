@@ -0,0 +1,331 @@
+import csv
+import io
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.db import connection, models
+from django.db.models import Count
+from django.utils import timezone
+
+from api.models import (
+    ApartmentDetails, ApartmentNumberCounter, BuildingDetails, ChangeLog, ChangeLogged, ParkingDetails, UserData
+)
+from bma_backend.response_cache import invalidate_cached_responses
+
+IMPORT_FORMATS = ["csv", "ndjson"]
+
+BOOLEAN_VALUES = {
+    "true": True, "t": True, "yes": True, "y": True, "1": True,
+    "false": False, "f": False, "no": False, "n": False, "0": False,
+}
+
+
+def read_rows(file, file_format):
+    """
+    Yield `(row_number, row)` for each record of a CSV (with header) or NDJSON text stream.
+    """
+    if file_format == "csv":
+        for row_number, row in enumerate(csv.DictReader(file), start=1):
+            yield row_number, row
+    elif file_format == "ndjson":
+        row_number = 0
+        for line in file:
+            if not line.strip():
+                continue
+            row_number += 1
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = None
+            yield row_number, row if isinstance(row, dict) else {"__invalid__": line}
+    else:
+        raise ValueError(f"Invalid import format `{file_format}`. Choose from {', '.join(IMPORT_FORMATS)}.")
+
+
+class BulkImporter:
+    """
+    Validates and loads CSV/NDJSON records of a model in batches.
+
+    Each batch is validated field by field in Python, foreign keys and any other database
+    based checks are resolved with one query per batch, and the valid rows are loaded with
+    PostgreSQL `COPY` into a temporary staging table followed by a single
+    `INSERT ... SELECT ... ON CONFLICT DO NOTHING` (`bulk_create` on other databases).
+    Invalid rows are skipped and reported with their row number; every batch is committed
+    on its own so one bad row doesn't discard the rest of the file.
+    """
+    model = None
+    exclude = ["audit_status"]  # Fields which can't be given in the file
+    batch_size = 5000
+
+    def __init__(self, user=None, batch_size=None):
+        self.user = user if isinstance(user, UserData) else None
+        self.batch_size = batch_size or self.batch_size
+        self.input_fields = [
+            field for field in self.model._meta.concrete_fields
+            if field.editable and not isinstance(field, models.AutoField) and field.name not in self.exclude
+        ]
+        self.created = 0
+        self.errors = []
+
+    def run(self, file, file_format):
+        batch = []
+        for row_number, row in read_rows(file, file_format):
+            batch.append((row_number, row))
+            if len(batch) >= self.batch_size:
+                self.import_batch(batch)
+                batch = []
+        if batch:
+            self.import_batch(batch)
+        self.errors.sort(key=lambda error: error["row"])
+        return {"created": self.created, "errors": self.errors}
+
+    def add_error(self, row_number, errors):
+        self.errors.append({"row": row_number, "errors": errors})
+
+    def import_batch(self, batch):
+        rows = []
+        for row_number, row in batch:
+            try:
+                rows.append((row_number, self.clean_row(row)))
+            except ValidationError as exc:
+                self.add_error(row_number, exc.message_dict)
+        rows = self.resolve_foreign_keys(rows)
+        with ChangeLog.buffered():
+            rows = self.check_batch(rows)
+            if rows:
+                self.load_batch(rows)
+
+    def clean_row(self, row):
+        if "__invalid__" in row:
+            raise ValidationError({"__all__": ["Invalid JSON record."]})
+
+        values, errors = {}, {}
+        for field in self.input_fields:
+            raw = row.get(field.name)
+            try:
+                if raw is None or raw == "":
+                    if field.has_default():
+                        values[field.attname] = field.get_default()
+                    elif field.null:
+                        values[field.attname] = None
+                    elif field.blank:
+                        values[field.attname] = ""
+                    else:
+                        raise ValidationError("This field is required.")
+                elif field.is_relation:
+                    # Existence is checked for the whole batch in resolve_foreign_keys()
+                    values[field.attname] = field.target_field.to_python(raw)
+                else:
+                    if isinstance(field, models.BooleanField) and isinstance(raw, str):
+                        raw = BOOLEAN_VALUES.get(raw.strip().lower(), raw)
+                    if isinstance(field, models.JSONField) and isinstance(raw, str):
+                        try:
+                            raw = json.loads(raw)
+                        except ValueError:
+                            raise ValidationError("Value must be valid JSON.")
+                    values[field.attname] = field.clean(raw, None)
+            except ValidationError as exc:
+                errors[field.name] = exc.messages
+        if errors:
+            raise ValidationError(errors)
+        return values
+
+    def resolve_foreign_keys(self, rows):
+        """
+        Check that the referenced objects exist, with one query per foreign key for the batch.
+        The related objects are kept in `self.related[field.name]` for check_batch().
+        """
+        self.related = {}
+        for field in self.input_fields:
+            if not field.is_relation:
+                continue
+            keys = {values[field.attname] for _, values in rows if values[field.attname] is not None}
+            self.related[field.name] = field.related_model.objects.in_bulk(
+                keys, field_name=field.target_field.name
+            )
+
+        valid_rows = []
+        for row_number, values in rows:
+            errors = {
+                field.name: [f"Invalid pk \"{values[field.attname]}\" - object does not exist."]
+                for field in self.input_fields
+                if field.is_relation and values[field.attname] is not None
+                and values[field.attname] not in self.related[field.name]
+            }
+            if errors:
+                self.add_error(row_number, errors)
+            else:
+                valid_rows.append((row_number, values))
+        return valid_rows
+
+    def check_batch(self, rows):
+        """
+        Model specific validation of the batch, runs inside the batch transaction.
+        """
+        return rows
+
+    def unique_rows(self, rows):
+        """
+        Reject rows whose primary key is repeated in the batch or already exists.
+        """
+        pk = self.model._meta.pk
+        keys = [values[pk.attname] for _, values in rows]
+        # Every row, the soft deleted ones keep their primary key
+        existing = set(self.model._base_manager.filter(pk__in=keys).values_list("pk", flat=True))
+        seen = set()
+        valid_rows = []
+        for row_number, values in rows:
+            key = values[pk.attname]
+            if key in existing or key in seen:
+                self.add_error(row_number, {pk.name: [f"{self.model._meta.verbose_name.capitalize()} `{key}` already exists."]})
+            else:
+                seen.add(key)
+                valid_rows.append((row_number, values))
+        return valid_rows
+
+    def load_batch(self, rows):
+        now = timezone.now()
+        user_id = self.user.pk if self.user else None
+        for _, values in rows:
+            values.update({
+                "audit_status": "active",
+                "created_on": now,
+                "modified_on": now,
+                "created_by_id": user_id,
+                "modified_by_id": user_id,
+            })
+
+        if connection.vendor == "postgresql":
+            inserted = self.copy_batch(rows)
+        else:
+            self.model.objects.bulk_create([self.model(**values) for _, values in rows])
+            inserted = len(rows)
+        self.created += inserted
+        invalidate_cached_responses(self.model)  # Neither COPY nor bulk_create() send post_save
+
+    def copy_batch(self, rows):
+        """
+        COPY the rows into a temporary staging table, then move them to the model table.
+        """
+        pk = self.model._meta.pk
+        columns = list(rows[0][1])
+        quote = connection.ops.quote_name
+        table = quote(self.model._meta.db_table)
+        staging = quote(f"{self.model._meta.db_table}_import")
+        column_list = ", ".join(quote(column) for column in columns)
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for _, values in rows:
+            writer.writerow([self.copy_value(values[column]) for column in columns])
+        buffer.seek(0)
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE TEMPORARY TABLE {staging} AS SELECT {column_list} FROM {table} WITH NO DATA"
+            )
+            cursor.cursor.copy_expert(
+                f"COPY {staging} ({column_list}) FROM STDIN WITH (FORMAT csv, NULL '\\N')", buffer
+            )
+            cursor.execute(
+                f"INSERT INTO {table} ({column_list}) SELECT {column_list} FROM {staging} "
+                f"ON CONFLICT DO NOTHING RETURNING {quote(pk.column)}, {column_list}"
+            )
+            inserted = {key: dict(zip(columns, values)) for key, *values in cursor.fetchall()}
+            cursor.execute(f"DROP TABLE {staging}")
+
+        if issubclass(self.model, ChangeLogged):  # COPY doesn't go through bulk_create()
+            fields = [field for field in self.model.get_change_log_fields() if field.attname in columns]
+            ChangeLog.record([
+                (self.model, key, ChangeLog.CREATE, {field.name: [None, values[field.attname]] for field in fields})
+                for key, values in inserted.items()
+            ], user=self.user)
+
+        # Rows inserted concurrently by someone else since check_batch() are reported
+        if pk.attname in columns:
+            for row_number, values in rows:
+                if pk.to_python(values[pk.attname]) not in inserted:
+                    self.add_error(
+                        row_number, {pk.name: [f"{self.model._meta.verbose_name.capitalize()} `{values[pk.attname]}` already exists."]}
+                    )
+        return len(inserted)
+
+    @staticmethod
+    def copy_value(value):
+        if value is None:
+            return "\\N"
+        if isinstance(value, bool):
+            return "t" if value else "f"
+        if isinstance(value, (dict, list)):
+            return json.dumps(value)
+        if isinstance(value, (datetime, date, time)):
+            return value.isoformat()
+        if isinstance(value, Decimal):
+            return str(value)
+        return value
+
+
+class BuildingImporter(BulkImporter):
+    model = BuildingDetails
+
+    def check_batch(self, rows):
+        return self.unique_rows(rows)
+
+
+class ApartmentImporter(BulkImporter):
+    model = ApartmentDetails
+
+    def check_batch(self, rows):
+        # Reserve the apartment numbers of the batch with one query
+        blocks = {}
+        for _, values in rows:
+            key = (values["building_number_id"], values["floor_number"])
+            blocks[key] = blocks.get(key, 0) + 1
+        apartment_numbers = ApartmentNumberCounter.allocate(blocks)
+        for _, values in rows:
+            key = (values["building_number_id"], values["floor_number"])
+            values["apartment_number"] = apartment_numbers[key]
+            apartment_numbers[key] += 1  # Next apartment number of the block
+        return rows  # The numbers were just reserved and the primary key is generated
+
+
+class ParkingImporter(BulkImporter):
+    model = ParkingDetails
+
+    def check_batch(self, rows):
+        # Same rules as creating parking spots with ParkingDetailsSerializer
+        buildings = self.related["building_number"]
+        parking_counts = dict(
+            ParkingDetails.objects.filter(building_number__in=buildings).values_list(
+                "building_number"
+            ).annotate(count=Count("pk")).order_by()
+        )
+
+        valid_rows = []
+        for row_number, values in rows:
+            building = buildings[values["building_number_id"]]
+            if values["apartment_id"] is not None:
+                self.add_error(row_number, {"apartment": [
+                    f"Cannot reserve parking spot for apartment `{values['apartment_id']}` before booking apartment."
+                ]})
+            elif values["parking_status"] != "available":
+                self.add_error(row_number, {"parking_status": [
+                    "Parking spot cannot be created with status other than `available`."
+                ]})
+            elif parking_counts.get(building.pk, 0) >= 2 * 25 * building.no_of_floors:
+                self.add_error(row_number, {"building_number": [
+                    f"Number of parking spaces for building `{building.pk}` exceeds the maximum limit."
+                ]})
+            else:
+                parking_counts[building.pk] = parking_counts.get(building.pk, 0) + 1
+                valid_rows.append((row_number, values))
+        return valid_rows
+
+
+IMPORTERS = {
+    "buildings": BuildingImporter,
+    "apartments": ApartmentImporter,
+    "parkings": ParkingImporter,
+}
@@ -1,6 +1,126 @@
+import os
+import threading
 from time import time
 
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class SnowflakeGenerator:
+    """
+    Snowflake style 63-bit unique id generator.
+
+    Layout (most to least significant bits):
+        41 bits: milliseconds since ``EPOCH`` (good until 2093)
+        10 bits: worker id, unique per process
+        12 bits: sequence within the same millisecond (4096 ids per ms per worker)
+
+    Ids are monotonically increasing within a worker and can't collide across workers
+    as long as the worker ids are distinct. On PostgreSQL the worker id is leased the
+    first time a process generates an id, for as long as the process lives (see
+    allocate_worker_id()), so every live process on every host has its own. Other
+    databases fall back to the process id.
+    """
+    EPOCH = 1704067200000  # 2024-01-01T00:00:00Z in milliseconds
+    WORKER_ID_BITS = 10
+    SEQUENCE_BITS = 12
+    MAX_WORKER_ID = (1 << WORKER_ID_BITS) - 1
+    MAX_SEQUENCE = (1 << SEQUENCE_BITS) - 1
+    WORKER_ID_SEQUENCE = "api_snowflake_worker_id_seq"
+    WORKER_ID_LOCK = 0x536E6F77  # First key of the advisory locks leasing the worker ids
+
+    def __init__(self, worker_id=None):
+        self._lock = threading.Lock()
+        self._configured_worker_id = worker_id
+        self._pid = os.getpid()
+        self._lease = None  # Connection holding the lock of the worker id
+        self._parent_leases = []
+        self.reset()
+
+    def reset(self):
+        """
+        Forget the worker id and sequence, used after the process is forked.
+        """
+        if self._lease is not None:
+            if self._pid == os.getpid():
+                self._lease.close()
+            else:
+                # Closing the connection of the parent would end its session, and its lease
+                self._parent_leases.append(self._lease)
+            self._lease = None
+        self._pid = os.getpid()
+        self._worker_id = self._configured_worker_id
+        self._last_timestamp = -1
+        self._sequence = 0
+
+    @property
+    def worker_id(self):
+        if self._worker_id is None:
+            self._worker_id = self.allocate_worker_id()
+        return self._worker_id
+
+    def allocate_worker_id(self):
+        """
+        On PostgreSQL, lease the first free worker id from the one given by the (cycling)
+        sequence: the id is locked with a session advisory lock on a connection of its own,
+        outside of the pool, which the process keeps open. The lock is released when the
+        process exits or dies, so a recycled worker's id can be reused but never shared.
+        """
+        database = connections[DEFAULT_DB_ALIAS]
+        if database.vendor != "postgresql":
+            return os.getpid() % (self.MAX_WORKER_ID + 1)
+
+        options = {name: value for name, value in database.settings_dict["OPTIONS"].items() if name != "pool"}
+        lease = type(database)({**database.settings_dict, "OPTIONS": options}, DEFAULT_DB_ALIAS)
+        lease.inc_thread_sharing()  # Closed by the thread resetting the generator
+        with lease.cursor() as cursor:
+            cursor.execute("SELECT nextval(%s)", [self.WORKER_ID_SEQUENCE])
+            first_worker_id = cursor.fetchone()[0]
+            for offset in range(self.MAX_WORKER_ID + 1):
+                worker_id = (first_worker_id + offset) % (self.MAX_WORKER_ID + 1)
+                cursor.execute("SELECT pg_try_advisory_lock(%s, %s)", [self.WORKER_ID_LOCK, worker_id])
+                if cursor.fetchone()[0]:
+                    self._lease = lease
+                    return worker_id
+        lease.close()
+        raise RuntimeError("Every Snowflake worker id is leased by a live process.")
+
+    @staticmethod
+    def current_millis():
+        return int(time() * 1000)
+
+    def next_id(self):
+        with self._lock:
+            # A forked child must not reuse the worker id of its parent
+            if self._pid != os.getpid():
+                self.reset()
+            worker_id = self.worker_id
+
+            timestamp = self.current_millis()
+            # Keep ids monotonic if the clock moves backwards
+            if timestamp <= self._last_timestamp:
+                timestamp = self._last_timestamp
+                self._sequence = (self._sequence + 1) & self.MAX_SEQUENCE
+                if self._sequence == 0:
+                    # Sequence exhausted for this millisecond, wait for the next one
+                    while timestamp <= self._last_timestamp:
+                        timestamp = self.current_millis()
+            else:
+                self._sequence = 0
+            self._last_timestamp = timestamp
+
+            return (
+                ((timestamp - self.EPOCH) << (self.WORKER_ID_BITS + self.SEQUENCE_BITS))
+                | (worker_id << self.SEQUENCE_BITS)
+                | self._sequence
+            )
+
+
+snowflake = SnowflakeGenerator()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=snowflake.reset)
+
 
 def generate_unique_integer_number():
-    # Generate a unique 12-digit number based on the current timestamp
-    return int(time() * 1000) % 1000000000000
+    # Generate a unique number from the Snowflake generator (timestamp, worker id and sequence)
+    return snowflake.next_id()
@@ -1,20 +1,109 @@
+import time
 
-from django.contrib.auth import get_user_model
+from django.conf import settings
 from django.contrib.auth.backends import ModelBackend
 from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
 from api.models import UserData
 
+# Claim telling which user model the token was issued for, tokens without it are for UserData
+USER_MODEL_CLAIM = "user_model"
+USER_MODELS = {model._meta.label_lower: model for model in [UserData, User]}
+
+
+def user_cache_version_key(model, user_id):
+    return f"auth-user-version:{model._meta.label_lower}:{user_id}"
+
+
+def get_cached_user(model, user_id):
+    """
+    Get the user from the cache, or from the database (and cache it) on a miss.
+
+    Cached users are keyed by the user id and the user's cache version, which
+    invalidate_cached_user() bumps when the user changes, so an entry set by a request
+    that read the user before the change is never served afterwards.
+    """
+    version = cache.get_or_set(user_cache_version_key(model, user_id), time.time_ns, timeout=None)
+    key = f"auth-user:{model._meta.label_lower}:{user_id}:{version}"
+    user = cache.get(key)
+    if user is None:
+        user = model.objects.get(pk=user_id)
+        cache.set(key, user, settings.AUTH_USER_CACHE_TIMEOUT)
+    return user
+
+
+def invalidate_cached_user(model, *user_ids):
+    """
+    Drop the cached users once the current transaction commits.
+    """
+    def bump_versions():
+        for user_id in user_ids:
+            key = user_cache_version_key(model, user_id)
+            try:
+                cache.incr(key)
+            except ValueError:  # Not cached, or evicted: start from a version never used before
+                cache.set(key, time.time_ns(), timeout=None)
+
+    transaction.on_commit(bump_versions)
+
+
 class CustomAuthBackend(ModelBackend):
 
     def authenticate(self, request, username=None, password=None, **kwargs):
-        try:
-            user_model = UserData
-            if User.objects.filter(username=username).exists():
-                user_model = User
+        if username is None or password is None:
+            return None
 
-            user = user_model.objects.get(username=username)
+        # A single query fetches the UserData row and checks whether an auth User with
+        # the same username exists, which takes precedence (e.g. superusers).
+        user = UserData.objects.filter(username=username).annotate(
+            is_auth_user=Exists(User.objects.filter(username=OuterRef("username")))
+        ).first()
+        if user is None or user.is_auth_user:
+            user = User.objects.filter(username=username).first()
 
-            if user.check_password(password):
-                return user
-        except user_model.DoesNotExist:
+        if user is None:
+            # Run the password hasher to reduce the timing difference with existing users
+            UserData().set_password(password)
             return None
+        if user.check_password(password):
+            return user
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication resolving the token's user from the cache, so that authenticated
+    requests run no query on a cache hit. The user model comes from the token's
+    `user_model` claim (set at login), UserData when it's missing.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        model = USER_MODELS.get(validated_token.get(USER_MODEL_CLAIM, UserData._meta.label_lower))
+        if model is None:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        try:
+            user = get_cached_user(model, user_id)
+        except model.DoesNotExist:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+        return user
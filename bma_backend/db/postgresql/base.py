@@ -0,0 +1,52 @@
+"""
+PostgreSQL backend with an optional per-process connection pool.
+
+Enabled with a `pool` dict in the database OPTIONS (see ConnectionPool for the keys):
+
+    "ENGINE": "bma_backend.db.postgresql",
+    "OPTIONS": {"pool": {"min_size": 1, "max_size": 2}},
+
+Django "closes" the connection at the end of every request (with CONN_MAX_AGE = 0),
+which returns it to the pool instead of closing it, so requests reuse the open
+connections instead of paying a TCP and authentication handshake each.
+"""
+
+from django.db.backends.postgresql import base
+
+from bma_backend.db.postgresql.pool import get_pool
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pool = None  # Pool the current connection was checked out of
+
+    def get_pool_options(self):
+        return self.settings_dict["OPTIONS"].get("pool")
+
+    def get_connection_params(self):
+        conn_params = super().get_connection_params()
+        conn_params.pop("pool", None)
+        return conn_params
+
+    def get_new_connection(self, conn_params):
+        pool_options = self.get_pool_options()
+        if not pool_options:
+            self.pool = None
+            return super().get_new_connection(conn_params)
+
+        # One pool per set of connection parameters (the test database and the `postgres`
+        # database used to create it get their own)
+        key = (self.alias, tuple(sorted((name, repr(value)) for name, value in conn_params.items())))
+        self.pool = get_pool(
+            key, lambda: super(DatabaseWrapper, self).get_new_connection(conn_params), **pool_options
+        )
+        return self.pool.getconn()
+
+    def _close(self):
+        if self.connection is not None and self.pool is not None:
+            with self.wrap_database_errors:
+                self.pool.putconn(self.connection)
+            return
+        return super()._close()
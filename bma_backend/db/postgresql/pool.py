@@ -0,0 +1,218 @@
+import os
+import threading
+import time
+from collections import deque
+
+import psycopg2
+from psycopg2 import extensions
+
+
+class PoolTimeout(psycopg2.OperationalError):
+    """
+    Raised when no connection could be checked out of the pool within its timeout.
+    """
+
+
+class ConnectionPool:
+    """
+    Thread safe pool of psycopg2 connections of one process.
+
+    - Keeps between `min_size` and `max_size` connections open; a checkout waits up to
+      `timeout` seconds for a connection to be returned when `max_size` are in use.
+    - Connections idle for more than `check_interval` seconds are checked with a
+      `SELECT 1` on checkout, broken ones are replaced by new connections.
+    - Connections idle for more than `max_idle` seconds are closed (reaped) down to `min_size`.
+    - Returned connections with an open transaction are rolled back, broken ones are discarded.
+    """
+
+    def __init__(self, connect, min_size=0, max_size=10, timeout=10.0, max_idle=300.0, check_interval=30.0):
+        self.connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.check_interval = check_interval
+
+        self.condition = threading.Condition()
+        self.idle = deque()  # (connection, returned at) pairs, most recently returned last
+        self.size = 0  # Open connections, idle and in use
+        self.waiting = 0
+        self.stats = {
+            "checkouts": 0,
+            "connections_opened": 0,
+            "connections_closed": 0,
+            "health_check_failures": 0,
+            "timeouts": 0,
+            "wait_time": 0.0,
+            "max_wait_time": 0.0,
+        }
+
+    def getconn(self):
+        started = time.monotonic()
+        with self.condition:
+            self.waiting += 1
+            try:
+                while not self.idle and self.size >= self.max_size:
+                    remaining = self.timeout - (time.monotonic() - started)
+                    if remaining <= 0:
+                        self.stats["timeouts"] += 1
+                        raise PoolTimeout(
+                            f"No connection available in the pool within {self.timeout}s "
+                            f"({self.max_size} connections in use)."
+                        )
+                    self.condition.wait(remaining)
+            finally:
+                self.waiting -= 1
+
+            waited = time.monotonic() - started
+            self.stats["checkouts"] += 1
+            self.stats["wait_time"] += waited
+            self.stats["max_wait_time"] = max(self.stats["max_wait_time"], waited)
+            if self.idle:
+                connection, returned_at = self.idle.pop()
+            else:
+                connection, returned_at = None, None
+                self.size += 1  # Reserve the slot before connecting outside of the lock
+
+        if connection is not None:
+            if time.monotonic() - returned_at < self.check_interval or self.is_usable(connection):
+                return connection
+            with self.condition:
+                self.stats["health_check_failures"] += 1
+            self.discard(connection, reserve=True)
+
+        try:
+            connection = self.connect()
+        except BaseException:
+            with self.condition:
+                self.size -= 1
+                self.condition.notify()
+            raise
+        with self.condition:
+            self.stats["connections_opened"] += 1
+        return connection
+
+    def putconn(self, connection):
+        status = None if connection.closed else connection.info.transaction_status
+        if status in (extensions.TRANSACTION_STATUS_INTRANS, extensions.TRANSACTION_STATUS_INERROR):
+            try:
+                connection.rollback()
+                status = connection.info.transaction_status
+            except psycopg2.Error:
+                status = None
+        if status != extensions.TRANSACTION_STATUS_IDLE:
+            self.discard(connection)
+            return
+
+        with self.condition:
+            self.idle.append((connection, time.monotonic()))
+            self.reap()
+            self.condition.notify()
+
+    def discard(self, connection, reserve=False):
+        """
+        Close a connection checked out of the pool. With `reserve` its slot is kept for a
+        replacement connection, otherwise a waiting checkout can open one.
+        """
+        with self.condition:
+            self.close_connection(connection)
+            if not reserve:
+                self.size -= 1
+                self.condition.notify()
+
+    def reap(self):
+        """
+        Close the connections idle for more than `max_idle`, keeping `min_size` open.
+        Must be called with the condition held.
+        """
+        deadline = time.monotonic() - self.max_idle
+        while self.idle and self.size > self.min_size and self.idle[0][1] < deadline:
+            connection, _ = self.idle.popleft()
+            self.size -= 1
+            self.close_connection(connection)
+
+    def close_idle(self):
+        with self.condition:
+            while self.idle:
+                connection, _ = self.idle.popleft()
+                self.size -= 1
+                self.close_connection(connection)
+
+    def close_connection(self, connection):
+        # Must be called with the condition held
+        try:
+            connection.close()
+        except psycopg2.Error:
+            pass
+        self.stats["connections_closed"] += 1
+
+    @staticmethod
+    def is_usable(connection):
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            return True
+        except psycopg2.Error:
+            return False
+
+    def get_stats(self):
+        with self.condition:
+            self.reap()
+            return {
+                "pid": os.getpid(),
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "size": self.size,
+                "idle": len(self.idle),
+                "in_use": self.size - len(self.idle),
+                "waiting": self.waiting,
+                **self.stats,
+            }
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(key, connect, **options):
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = ConnectionPool(connect, **options)
+        return pool
+
+
+def pool_stats():
+    """
+    Statistics of the pools of the current process, by database alias.
+    """
+    with _pools_lock:
+        pools = list(_pools.items())
+    stats = {}
+    for (alias, _), pool in pools:
+        stats.setdefault(alias, []).append(pool.get_stats())
+    return stats
+
+
+def close_pools():
+    """
+    Close the idle connections of every pool. Runs before forking so that child
+    processes (e.g. gunicorn workers forked from a preloaded master) never share
+    the parent's connections.
+    """
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.close_idle()
+
+
+def reset_pools():
+    """
+    Forget the pools inherited from the parent process, the child opens its own.
+    """
+    global _pools_lock
+    _pools.clear()
+    _pools_lock = threading.Lock()
+
+
+os.register_at_fork(before=close_pools, after_in_child=reset_pools)
@@ -0,0 +1,187 @@
+"""
+Per-endpoint request metrics in the Prometheus text format, served at `/metrics`.
+
+For every request the MetricsMiddleware records, labelled by the resolved view and
+action: the latency, the number and time of the SQL queries, the serializer time and
+the response size. Disabled unless METRICS_ENABLED is set, in which case the
+middleware removes itself from the chain and costs nothing.
+
+Under gunicorn set PROMETHEUS_MULTIPROC_DIR (an empty directory writable by the
+workers) so that each worker writes its samples there and the `/metrics` scrape
+aggregates all of them (see gunicorn.conf.py).
+"""
+
+import os
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import Http404, HttpResponse
+from prometheus_client import REGISTRY, CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Histogram, generate_latest
+from prometheus_client import multiprocess
+from rest_framework.serializers import BaseSerializer
+
+LABELS = ["view", "action", "method"]
+
+REQUESTS = Counter("bma_requests", "Requests served.", LABELS + ["status"])
+REQUEST_DURATION = Histogram("bma_request_duration_seconds", "Request latency.", LABELS)
+SQL_QUERIES = Histogram(
+    "bma_request_sql_queries", "SQL queries run by a request.", LABELS,
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 250, float("inf")),
+)
+SQL_DURATION = Histogram("bma_request_sql_duration_seconds", "Time spent in SQL queries by a request.", LABELS)
+SERIALIZER_DURATION = Histogram(
+    "bma_request_serializer_duration_seconds", "Time spent serializing the response data.", LABELS
+)
+RESPONSE_SIZE = Histogram(
+    "bma_response_size_bytes", "Response body size.", LABELS,
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, float("inf")),
+)
+
+# Metrics of the request being served. A context variable rather than a thread local so
+# that it follows the request into the threads of sync_to_async() (async views).
+current_request_metrics = ContextVar("current_request_metrics", default=None)
+
+
+class RequestMetrics:
+    __slots__ = ("queries", "sql_time", "serializer_time")
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_time = 0.0
+        self.serializer_time = 0.0
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    Database execute wrapper counting and timing the queries of the current request.
+    """
+    metrics = current_request_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.queries += 1
+        metrics.sql_time += time.perf_counter() - started
+
+
+def install_query_recorder(sender, connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def timed_serializer_data(data):
+    """
+    Wrap the `data` property of the serializers to time the serialization. Nested
+    serializers and list items don't go through `data`, so each top-level serializer
+    is timed once.
+    """
+    def get_data(self):
+        metrics = current_request_metrics.get()
+        if metrics is None or hasattr(self, "_data"):
+            return data.fget(self)
+        started = time.perf_counter()
+        try:
+            return data.fget(self)
+        finally:
+            metrics.serializer_time += time.perf_counter() - started
+
+    get_data.wrapped = data
+    return property(get_data)
+
+
+def install():
+    connection_created.connect(install_query_recorder, dispatch_uid="bma_metrics_query_recorder")
+    for connection in connections.all(initialized_only=True):
+        install_query_recorder(None, connection)
+    if not hasattr(BaseSerializer.data.fget, "wrapped"):
+        BaseSerializer.data = timed_serializer_data(BaseSerializer.data)
+
+
+def view_labels(request):
+    """
+    (view, action, method) labels of the view the request was routed to.
+    """
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "unresolved", "", request.method
+    func = match.func
+    view_class = getattr(func, "cls", None) or getattr(func, "view_class", None)
+    view = view_class.__name__ if view_class is not None else getattr(func, "__name__", "unknown")
+    actions = getattr(func, "actions", None)  # DRF viewsets
+    if actions:
+        action = actions.get(request.method.lower(), "")
+    else:
+        action = getattr(func, "view_initkwargs", {}).get("action") or request.method.lower()
+    return view, action, request.method
+
+
+class MetricsMiddleware:
+    """
+    Records the metrics of each request, must come first in MIDDLEWARE.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        install()
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        token = current_request_metrics.set(metrics)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_request_metrics.reset(token)
+        self.observe(request, response, metrics, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = current_request_metrics.set(metrics)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_request_metrics.reset(token)
+        self.observe(request, response, metrics, time.perf_counter() - started)
+        return response
+
+    @staticmethod
+    def observe(request, response, metrics, duration):
+        labels = view_labels(request)
+        REQUESTS.labels(*labels, response.status_code).inc()
+        REQUEST_DURATION.labels(*labels).observe(duration)
+        SQL_QUERIES.labels(*labels).observe(metrics.queries)
+        SQL_DURATION.labels(*labels).observe(metrics.sql_time)
+        SERIALIZER_DURATION.labels(*labels).observe(metrics.serializer_time)
+        if not response.streaming:
+            RESPONSE_SIZE.labels(*labels).observe(len(response.content))
+
+
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint, aggregating every worker's samples in multiprocess mode.
+    """
+    if not settings.METRICS_ENABLED:
+        raise Http404
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return HttpResponse(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
@@ -1,34 +1,63 @@
+from collections import namedtuple
+
 from rest_framework import permissions
 
+Roles = namedtuple("Roles", ["user_id", "is_admin", "is_active"])
+
+
+def get_roles(request):
+    """
+    Roles of the requested user, resolved once per request and shared by all the permission
+    classes (and the object-level checks) evaluated for it.
+    """
+    user = request.user
+    cached = getattr(request, "_roles", None)
+    if cached is not None and cached[0] is user:
+        return cached[1]
+    roles = Roles(
+        user_id=getattr(user, "id", None),
+        # Only superuser/admin can perform all actions
+        is_admin=bool(getattr(user, "is_superuser", False) or getattr(user, "is_admin", False)),
+        is_active=bool(getattr(user, "is_active", False)),
+    )
+    request._roles = (user, roles)
+    return roles
+
 
 class UserPermissions(permissions.BasePermission):
     """
     Custom permissions for all the users.
     1. Only Admin User can perform all the user operations.
-    2. Requested user can only get/update their self details.
+    2. Requested user can only get/update their self details (checked on the object, which
+       the view fetches once).
     3. User creation API will be called only once if the user doesn't exist.
     """
 
     def has_permission(self, request, view):
+        roles = get_roles(request)
         # User creation API will be called only once if the user doesn't exist
-        if (request.method == "POST" and (not request.user.id)):
+        if (request.method == "POST" and (not roles.user_id)):
             return True
-        elif not request.user.id:  # If the requested user doesn't exist
+        elif not roles.user_id:  # If the requested user doesn't exist
             return False
-        elif (
-                (hasattr(request.user, "is_superuser") and request.user.is_superuser)
-                    or
-                (hasattr(request.user, "is_admin") and request.user.is_admin)
-            ):  # Only superuser/admin can perform all actions w.r.t users View
+        elif roles.is_admin:  # Only superuser/admin can perform all actions w.r.t users View
+            return True
+        elif request.method in ["GET", "PUT", "PATCH"] and view.lookup_field in view.kwargs:
+            # Users can only see/update their self details, see has_object_permission()
+            return True
+        return False  # Returns False if request doesn't fit.
+
+    def has_object_permission(self, request, view, obj):
+        roles = get_roles(request)
+        if roles.is_admin:
             return True
-        elif (request.method in ["GET", "PUT", "PATCH"] and view and view.get_object()
-                and request.user.id == view.get_object().id):
+        elif request.method in ["GET", "PUT", "PATCH"] and roles.user_id == obj.id:
             # If Requested user tries to make themselves as Admin then return False
             if request.data.get("is_admin", False):
                 return False
             # Only the requested user can see their self details but not other user details
             return True
-        return False  # Returns False if request doesn't fit.
+        return False
 
 
 class IsAdminPermissions(permissions.BasePermission):
@@ -37,14 +66,7 @@ class IsAdminPermissions(permissions.BasePermission):
     """
 
     def has_permission(self, request, view):
-        # Only superuser/admin can perform all actions
-        if (
-                (hasattr(request.user, "is_superuser") and request.user.is_superuser)
-                    or
-                (hasattr(request.user, "is_admin") and request.user.is_admin)
-            ):
-            return True
-        return False
+        return get_roles(request).is_admin
 
 
 class ApartmentPermissions(permissions.BasePermission):
@@ -53,12 +75,7 @@ class ApartmentPermissions(permissions.BasePermission):
     """
 
     def has_permission(self, request, view):
-        # Only superuser/admin can perform all actions
-        if (
-                (hasattr(request.user, "is_superuser") and request.user.is_superuser)
-                    or
-                (hasattr(request.user, "is_admin") and request.user.is_admin)
-            ):
+        if get_roles(request).is_admin:
             return True
         elif (request.method == "GET"):  # Any user can get the apartments list
             return True
@@ -72,18 +89,11 @@ class ParkingPermissions(permissions.BasePermission):
     """
 
     def has_permission(self, request, view):
-        # Only superuser/admin can perform all actions
-        if (
-                (hasattr(request.user, "is_superuser") and request.user.is_superuser)
-                    or
-                (hasattr(request.user, "is_admin") and request.user.is_admin)
-            ):
+        roles = get_roles(request)
+        if roles.is_admin:
             return True
-        elif (
-                request.method == "PUT" or request.method == "PATCH"
-                    and
-                (hasattr(request.user, "is_active") and request.user.is_active)
-            ):  # Only active user can update their parking details
+        elif request.method in ["PUT", "PATCH"] and roles.is_active:
+            # Only active user can update their parking details
             return True
         elif (request.method == "GET"):  # Any user can get the parking list
             return True
@@ -94,9 +104,7 @@ class ActiveUserPermissions(permissions.BasePermission):
     """
     Only Active users can perform all the operations.
     """
-    
+
     def has_permission(self, request, view):
         # Only active user can perform all actions
-        if (hasattr(request.user, "is_active") and request.user.is_active):
-            return True
-        return False
+        return get_roles(request).is_active
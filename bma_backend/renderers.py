@@ -0,0 +1,80 @@
+"""
+JSON renderer and parser backed by orjson, the defaults of the API.
+
+Both produce and accept the same JSON as DRF's JSONRenderer and JSONParser (compact,
+UTF-8, no NaN). orjson's own encoding of datetimes is bypassed so that dates and times
+are encoded by DRF's JSONEncoder as before (datetimes with milliseconds and `Z`).
+Decimals are encoded as strings like the serializers' DecimalFields do (COERCE_DECIMAL_TO_STRING)
+and `Country` values as their code. Indented output (browsable API, `; indent=` media type
+parameter) and anything orjson cannot encode (e.g. integers above 64 bits) go through the
+stdlib renderer.
+"""
+
+import decimal
+
+import orjson
+from django.conf import settings
+from django_countries.fields import Country
+from rest_framework import renderers
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+
+ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+
+class ORJSONEncoder(JSONEncoder):
+
+    def default(self, obj):
+        if isinstance(obj, Country):
+            return obj.code
+        if isinstance(obj, decimal.Decimal) and api_settings.COERCE_DECIMAL_TO_STRING:
+            return str(obj)
+        return super().default(obj)
+
+
+class ORJSONRenderer(renderers.JSONRenderer):
+    """
+    JSONRenderer encoding with orjson.
+    """
+    encoder_class = ORJSONEncoder
+
+    def __init__(self):
+        self.encode_default = self.encoder_class().default
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if (
+                self.get_indent(accepted_media_type, renderer_context or {})
+                or self.ensure_ascii or not self.compact or not self.strict
+            ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=self.encode_default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Escaped by JSONRenderer, valid JSON but not valid JavaScript
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+        return ret
+
+
+class ORJSONParser(JSONParser):
+    """
+    JSONParser decoding with orjson.
+    """
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if not api_settings.STRICT_JSON:
+            return super().parse(stream, media_type, parser_context)
+        encoding = (parser_context or {}).get("encoding", settings.DEFAULT_CHARSET)
+        data = stream.read()
+        try:
+            if encoding.lower().replace("-", "") != "utf8":
+                data = data.decode(encoding)
+            return orjson.loads(data)
+        except ValueError as exc:  # Also orjson.JSONDecodeError and UnicodeDecodeError
+            raise ParseError(f"JSON parse error - {exc}")
@@ -0,0 +1,32 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Request being served. A context variable rather than a thread local so that it follows
+# the request into the threads of sync_to_async() (async views).
+current_request = ContextVar("current_request", default=None)
+
+
+@contextmanager
+def request_context(request):
+    """
+    Make the request the current one until the block exits.
+    """
+    token = current_request.set(request)
+    try:
+        yield request
+    finally:
+        current_request.reset(token)
+
+
+def get_current_user():
+    """
+    Authenticated user of the current request, None outside of a request or for anonymous users.
+
+    DRF authenticates in the view and then sets `user` on the Django request too, so this
+    also sees the users authenticated with the JWT.
+    """
+    request = current_request.get()
+    user = getattr(request, "user", None)
+    if user is None or not user.is_authenticated:
+        return None
+    return user
@@ -0,0 +1,123 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework import status
+from rest_framework.response import Response
+
+from bma_backend.permissions import get_roles
+
+
+def response_cache_generation_key(model):
+    return f"response-cache-generation:{model._meta.label_lower}"
+
+
+def get_response_cache_generations(models):
+    """
+    Current generation of each model, started from the current time when the model has none
+    (first use, or evicted) so that a generation is never reused.
+    """
+    keys = [response_cache_generation_key(model) for model in models]
+    generations = cache.get_many(keys)
+    for key in keys:
+        if key not in generations:
+            cache.add(key, time.time_ns(), timeout=None)  # Unless another request just did it
+            generations[key] = cache.get(key)
+    return tuple(generations[key] for key in keys)
+
+
+def invalidate_cached_responses(*models):
+    """
+    Bump the generation of the models, which makes the responses cached from their rows stale.
+
+    Bumped right away, for the reads of the current transaction, and again once it commits,
+    for the responses that concurrent requests cached from the rows before the commit.
+    """
+    def bump_generations():
+        for model in models:
+            key = response_cache_generation_key(model)
+            try:
+                cache.incr(key)
+            except ValueError:  # Not cached, or evicted: start from a generation never used before
+                cache.set(key, time.time_ns(), timeout=None)
+
+    bump_generations()
+    transaction.on_commit(bump_generations)
+
+
+class ResponseCacheMixin:
+    """
+    Read-through cache of the `response_cache_actions` responses (the serialized data, before
+    rendering), enabled by listing the models the responses are built from, e.g.
+
+        response_cache_models = [ApartmentDetails, BuildingDetails]
+
+    Responses are cached for RESPONSE_CACHE_TIMEOUT seconds, keyed by the URL, the sorted
+    query params, the media type and the roles of the caller (after the permission checks).
+    Each entry records the generations of the models it was built from, and any change of a
+    model (invalidate_cached_responses(), called on save, delete, bulk_create and update)
+    makes it stale. The validators (ETag, Last-Modified) of the response are kept with it.
+
+    Stale-while-revalidate: one request rebuilds a stale entry while the concurrent ones keep
+    getting the stale response, for at most RESPONSE_CACHE_STALE_TIMEOUT seconds (0 to never
+    serve stale responses). The `X-Cache` header tells a `HIT`, `STALE` or `MISS`.
+    """
+    response_cache_actions = ["list", "retrieve"]
+    response_cache_models = []
+    response_cache_headers = ["ETag", "Last-Modified"]  # Kept with the data
+
+    def get_response_cache_key(self, request):
+        roles = get_roles(request)
+        role = "admin" if roles.is_admin else "active" if roles.is_active else "user" if roles.user_id else "anonymous"
+        params = sorted(request.query_params.lists())
+        digest = hashlib.md5(
+            repr((request.build_absolute_uri(request.path), params, request.accepted_media_type)).encode()
+        ).hexdigest()
+        return f"response-cache:{self.__class__.__name__}:{self.action}:{role}:{digest}"
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        timeout = settings.RESPONSE_CACHE_TIMEOUT
+        if not timeout or not self.response_cache_models or self.action not in self.response_cache_actions:
+            return handler(request, *args, **kwargs)
+
+        key = self.get_response_cache_key(request)
+        # Read before the rows, an entry built from rows older than a change is never fresh
+        generations = get_response_cache_generations(self.response_cache_models)
+        entry = cache.get(key)
+        revalidate_key = None
+        if entry is not None:
+            if entry["generations"] == generations and entry["expires"] > time.time():
+                return self.cached_entry_response(entry, "HIT")
+            stale_timeout = settings.RESPONSE_CACHE_STALE_TIMEOUT
+            if stale_timeout:
+                revalidate_key = f"{key}:revalidate"
+                if not cache.add(revalidate_key, True, stale_timeout):
+                    return self.cached_entry_response(entry, "STALE")  # Another request rebuilds it
+
+        try:
+            response = handler(request, *args, **kwargs)
+            if response.status_code == status.HTTP_200_OK and not response.streaming:
+                cache.set(key, {
+                    "generations": generations,
+                    "expires": time.time() + timeout,
+                    "data": response.data,
+                    "headers": {
+                        name: response[name] for name in self.response_cache_headers if response.has_header(name)
+                    },
+                }, timeout + settings.RESPONSE_CACHE_STALE_TIMEOUT)
+        finally:
+            if revalidate_key is not None:
+                cache.delete(revalidate_key)
+        response["X-Cache"] = "MISS"
+        return response
+
+    def cached_entry_response(self, entry, state):
+        return Response(entry["data"], headers={**entry["headers"], "X-Cache": state})
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
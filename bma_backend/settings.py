@@ -25,9 +25,10 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 SECRET_KEY = 'django-insecure-s3$2$c2#2_^(q+dwp3lqtpcmlk26kajc_v+5!^lja978jke48-'
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+# Off unless opted in, as `entrypoint.sh dev` does for the development server
+DEBUG = os.getenv('DJANGO_DEBUG', 'False') == 'True'
 
-ALLOWED_HOSTS = []
+ALLOWED_HOSTS = [host for host in os.getenv('DJANGO_ALLOWED_HOSTS', '').split(',') if host]
 
 
 # Application definition
@@ -39,6 +40,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'api',
     'rest_framework',
     'corsheaders',
@@ -50,12 +52,14 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'bma_backend.metrics.MetricsMiddleware',  # First, to time the whole request
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'bma_backend.middleware.ChangeLogMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -86,15 +90,62 @@ WSGI_APPLICATION = 'bma_backend.wsgi.application'
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        # Django's PostgreSQL backend with an optional connection pool
+        'ENGINE': 'bma_backend.db.postgresql',
         'NAME': os.getenv('DB_NAME', 'postgres'),
         'USER': os.getenv('DB_USER', 'postgres'),
         'PASSWORD': os.getenv('DB_PASSWORD', 'postgres'),
         'HOST': os.getenv('DB_HOST', 'postgres'),
         'PORT': os.getenv('DB_PORT', '5432'),
+        # Seconds a thread keeps its connection open across requests (0: released after
+        # each request, back to the pool when it's enabled)
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 0)),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {},
     }
 }
 
+# Per process connection pool, see bma_backend.db.postgresql.pool.ConnectionPool
+#
+# Every gunicorn worker has a pool of its own, plus the connection holding its Snowflake
+# worker id lease (see api.utils.utils.SnowflakeGenerator), so a server opens up to
+#
+#     workers x (DB_POOL_MAX_SIZE + 1)
+#
+# connections, with workers = 2 x cores + 1 sync or cores uvicorn workers (gunicorn.conf.py).
+# Summed over the servers, it must stay under PostgreSQL's max_connections (100 by default)
+# minus superuser_reserved_connections and the other clients (migrations, cron jobs).
+# A sync worker serves one request at a time and uses a single connection. A uvicorn
+# worker runs the ORM calls of each of its concurrent requests in a thread of its own,
+# the ones beyond max_size wait for a free connection: raise it with the formula above.
+if os.getenv('DB_POOL', 'True') == 'True':
+    DATABASES['default']['OPTIONS']['pool'] = {
+        'min_size': int(os.getenv('DB_POOL_MIN_SIZE', 1)),
+        'max_size': int(os.getenv('DB_POOL_MAX_SIZE', 2)),
+        'timeout': float(os.getenv('DB_POOL_TIMEOUT', 10)),  # Seconds to wait for a free connection
+        'max_idle': float(os.getenv('DB_POOL_MAX_IDLE', 300)),  # Seconds before closing idle connections
+        'check_interval': float(os.getenv('DB_POOL_CHECK_INTERVAL', 30)),  # Idle seconds before a health check
+    }
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+# Shared by all the workers when REDIS_URL is set, otherwise local to each process
+
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -141,9 +192,18 @@ REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'rest_framework.authentication.SessionAuthentication',
         'rest_framework.authentication.BasicAuthentication',
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'bma_backend.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_SCHEMA_CLASS': 'rest_framework.schemas.coreapi.AutoSchema',
+    'DEFAULT_RENDERER_CLASSES': [
+        'bma_backend.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'bma_backend.renderers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
@@ -151,11 +211,40 @@ REST_FRAMEWORK = {
 
 # AUTH_USER_MODEL = 'api.UserData'
 
+# Seconds an authenticated user is cached for (see bma_backend.authentication.get_cached_user)
+AUTH_USER_CACHE_TIMEOUT = int(os.getenv('AUTH_USER_CACHE_TIMEOUT', 60))
+
+# Seconds the GET responses of the viewsets listing `response_cache_models` are cached for (0 to
+# not cache them), and seconds a stale response may be served while it is rebuilt (see
+# bma_backend.response_cache.ResponseCacheMixin)
+RESPONSE_CACHE_TIMEOUT = int(os.getenv('RESPONSE_CACHE_TIMEOUT', 60))
+RESPONSE_CACHE_STALE_TIMEOUT = int(os.getenv('RESPONSE_CACHE_STALE_TIMEOUT', 5))
+
+# Seconds the rows stay out of the `sync/` change feeds after they are modified, longer than
+# the write transactions last (see api.restful.viewsets.sync.SyncMixin)
+SYNC_SETTLE_SECONDS = int(os.getenv('SYNC_SETTLE_SECONDS', 5))
+
+# Record the field-level changes of the apartments, leases, tenants and parking spaces in the
+# change log (see api.models.change_log.ChangeLog)
+CHANGE_LOG_ENABLED = os.getenv('CHANGE_LOG_ENABLED', 'True') == 'True'
+
 AUTHENTICATION_BACKENDS = [
     'bma_backend.authentication.CustomAuthBackend',
     'django.contrib.auth.backends.ModelBackend',
 ]
 
+# Per-endpoint metrics served at /metrics in the Prometheus format (see bma_backend.metrics)
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'False') == 'True'
+
+# What to do when a request exceeds the query budget of its viewset action: log, raise or off
+# (see api.restful.viewsets.query_budget)
+QUERY_BUDGET_MODE = os.getenv('QUERY_BUDGET_MODE', 'log')
+
+# Requested by the server warm-up (bma_backend.warmup) before the workers accept traffic
+WARMUP_PATHS = [
+    '/api/apartments/?limit=1',
+]
+
 CORS_ORIGIN_WHITELIST = (
     'http://localhost:3000',
     'http://localhost:8000',
@@ -18,8 +18,11 @@ from django.contrib import admin
 from django.contrib.auth import views as auth_views
 from django.urls import include, path
 
+from bma_backend.metrics import metrics_view
+
 urlpatterns = [
     path("api/", include("api.urls")),
+    path("metrics", metrics_view, name="metrics"),
     path('admin/', admin.site.urls),
     path('accounts/', include('django.contrib.auth.urls')),
 ]
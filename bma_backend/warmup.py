@@ -0,0 +1,42 @@
+"""
+Warm-up run once before the server starts accepting traffic.
+
+With gunicorn's `preload_app` the warm-up runs in the master process, so every forked
+worker starts with the apps imported, the URL resolvers compiled, the ContentTypes
+cached and the lazily built state of the request path (DRF settings, filter forms,
+serializer fields...) initialised instead of paying for it on its first requests.
+"""
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import connections
+from django.test import Client
+from django.urls import URLResolver, get_resolver
+
+
+def compile_resolver(resolver):
+    """
+    Import the views of the URLconf, compile the URL regexes and build the reverse lookups.
+    """
+    resolver.reverse_dict  # Populates the resolver
+    for pattern in resolver.url_patterns:
+        pattern.pattern.regex  # Compiled lazily on first access
+        if isinstance(pattern, URLResolver):
+            compile_resolver(pattern)
+
+
+def warm_up():
+    compile_resolver(get_resolver())
+
+    # Cache the ContentTypes (used by the permissions and admin) with one query
+    ContentType.objects.get_for_models(*apps.get_models())
+
+    # Run the request path end to end once
+    host = next((host for host in settings.ALLOWED_HOSTS if "*" not in host), "localhost").lstrip(".")
+    client = Client(SERVER_NAME=host)
+    for path in getattr(settings, "WARMUP_PATHS", []):
+        client.get(path)
+
+    # Forked workers must not share the connection opened by the warm-up
+    connections.close_all()
@@ -1,18 +1,34 @@
 #!/bin/bash
+#
+# Usage: entrypoint.sh [serve|migrate|dev]
+#   serve    Production server: gunicorn with the settings of gunicorn.conf.py (default)
+#   migrate  One-shot step applying the database migrations, run before starting the servers
+#   dev      Development server with auto reload
 
-# wait for PSQL to server to start
-sleep 5
-echo "Django Configuration"
-
-# prepare init migration
-echo "Prepare init migration"
+set -e
 
 source /code/dev.env
-python3 /code/manage.py makemigrations
-
-# Migrate db, so we have the latest db schema
-echo "migrate db"
-python3 /code/manage.py migrate
+cd /code
 
-# Start development server on public ip interface, on port 8000
-python3 /code/manage.py runserver 0.0.0.0:8000
+case "${1:-serve}" in
+    migrate)
+        echo "Migrate db"
+        python3 manage.py migrate --noinput
+        ;;
+    serve)
+        # Set GUNICORN_WORKER_CLASS=uvicorn.workers.UvicornWorker to serve the ASGI application
+        if [[ "${GUNICORN_WORKER_CLASS}" == uvicorn* ]]; then
+            exec gunicorn bma_backend.asgi:application
+        fi
+        exec gunicorn bma_backend.wsgi:application
+        ;;
+    dev)
+        export DJANGO_DEBUG="${DJANGO_DEBUG:-True}"  # Only the development server runs with DEBUG
+        python3 manage.py migrate
+        exec python3 manage.py runserver 0.0.0.0:8000
+        ;;
+    *)
+        echo "Unknown command: $1 (expected serve, migrate or dev)" >&2
+        exit 1
+        ;;
+esac
@@ -0,0 +1,69 @@
+"""
+Gunicorn configuration of the production server, read from the working directory.
+
+    gunicorn bma_backend.wsgi:application
+    gunicorn bma_backend.asgi:application -k uvicorn.workers.UvicornWorker
+
+Every setting can be overridden with the environment variables below or on the command line.
+"""
+
+import multiprocessing
+import os
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+
+# Workers sized to the cores of the machine: (2 x cores) + 1 sync workers, or one
+# uvicorn (async) worker per core as each one serves many requests at once.
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "sync")
+workers = int(os.getenv(
+    "GUNICORN_WORKERS",
+    multiprocessing.cpu_count() if "uvicorn" in worker_class else multiprocessing.cpu_count() * 2 + 1
+))
+
+# Load the application once in the master and fork the workers from it
+preload_app = os.getenv("GUNICORN_PRELOAD", "True") == "True"
+
+# Recycle the workers after a number of requests to bound memory growth, with a jitter
+# so that they don't all restart at the same time
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", 1000))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", 100))
+
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 30))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", 5))
+
+accesslog = os.getenv("GUNICORN_ACCESSLOG", "-") or None  # Empty to disable
+loglevel = os.getenv("GUNICORN_LOGLEVEL", "info")
+
+warm_up_enabled = os.getenv("GUNICORN_WARMUP", "True") == "True"
+
+
+def on_starting(server):
+    # Start with an empty Prometheus multiprocess directory, samples of previous runs
+    # would be aggregated otherwise
+    multiproc_dir = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+    if multiproc_dir:
+        os.makedirs(multiproc_dir, exist_ok=True)
+        for name in os.listdir(multiproc_dir):
+            if name.endswith(".db"):
+                os.remove(os.path.join(multiproc_dir, name))
+
+    # Runs in the master once the preloaded application is imported, before the listening
+    # socket is opened and the workers are forked
+    if warm_up_enabled and server.cfg.preload_app:
+        from bma_backend.warmup import warm_up
+        warm_up()
+
+
+def post_worker_init(worker):
+    # Without preloading every worker imports the application and warms itself up
+    if warm_up_enabled and not worker.cfg.preload_app:
+        from bma_backend.warmup import warm_up
+        warm_up()
+
+
+def child_exit(server, worker):
+    # Merge the samples of the exited (e.g. recycled) worker into the aggregated ones
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)